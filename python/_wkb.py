@@ -0,0 +1,97 @@
+"""
+WKB字节组装辅助模块
+把连续存放的 (N, 2) 坐标数组按环/多边形偏移量组装为小端WKB，
+安装了Numba时组装循环编译为本地代码
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# WKB几何类型代码
+_WKB_POLYGON = 3
+_WKB_MULTIPOLYGON = 6
+
+def _put_uint32(buffer, pos, value):
+    """在 pos 处写入小端uint32，返回新的写入位置"""
+    for k in range(4):
+        buffer[pos + k] = (value >> (8 * k)) & 0xFF
+    return pos + 4
+
+def _put_header(buffer, pos, geom_type, count):
+    """写入字节序(小端) + 几何类型 + 子元素数量，返回新的写入位置"""
+    buffer[pos] = 1
+    pos = _put_uint32(buffer, pos + 1, geom_type)
+    return _put_uint32(buffer, pos, count)
+
+def _put_polygon(buffer, pos, coord_bytes, ring_offsets, first_ring, end_ring):
+    """写入由第 first_ring 到 end_ring - 1 个环组成的多边形，返回新的写入位置"""
+    pos = _put_header(buffer, pos, _WKB_POLYGON, end_ring - first_ring)
+    for ring in range(first_ring, end_ring):
+        start = ring_offsets[ring]
+        end = ring_offsets[ring + 1]
+        pos = _put_uint32(buffer, pos, end - start)
+        
+        # 每个点两个double，共16字节
+        nbytes = (end - start) * 16
+        buffer[pos:pos + nbytes] = coord_bytes[start * 16:end * 16]
+        pos += nbytes
+    return pos
+
+def _assemble_polygon(coord_bytes, ring_offsets):
+    """组装单个多边形的WKB"""
+    num_rings = len(ring_offsets) - 1
+    buffer = np.empty(9 + 4 * num_rings + ring_offsets[num_rings] * 16, dtype=np.uint8)
+    _put_polygon(buffer, 0, coord_bytes, ring_offsets, 0, num_rings)
+    return buffer
+
+def _assemble_multipolygon(coord_bytes, polygon_offsets, ring_offsets):
+    """组装多部分面的WKB"""
+    num_polygons = len(polygon_offsets) - 1
+    num_rings = polygon_offsets[num_polygons]
+    buffer = np.empty(9 + 9 * num_polygons + 4 * num_rings + ring_offsets[num_rings] * 16,
+                      dtype=np.uint8)
+    
+    pos = _put_header(buffer, 0, _WKB_MULTIPOLYGON, num_polygons)
+    for polygon in range(num_polygons):
+        pos = _put_polygon(buffer, pos, coord_bytes, ring_offsets,
+                           polygon_offsets[polygon], polygon_offsets[polygon + 1])
+    return buffer
+
+if HAS_NUMBA:
+    # 编译结果缓存到磁盘，重复运行时不再付出首次编译开销
+    _put_uint32 = njit(cache=True)(_put_uint32)
+    _put_header = njit(cache=True)(_put_header)
+    _put_polygon = njit(cache=True)(_put_polygon)
+    _assemble_polygon = njit(cache=True)(_assemble_polygon)
+    _assemble_multipolygon = njit(cache=True)(_assemble_multipolygon)
+
+def _coord_bytes(coords):
+    """(N, 2) 坐标数组的小端double字节视图"""
+    return np.ascontiguousarray(coords, dtype='<f8').reshape(-1).view(np.uint8)
+
+def polygon_wkb(rings_flat, ring_offsets):
+    """
+    组装多边形WKB，返回uint8数组
+
+    rings_flat: 所有环的坐标依次连接成的 (N, 2) 数组，外环在前
+    ring_offsets: 各环在 rings_flat 中的起始行，最后一项为总点数
+    """
+    return _assemble_polygon(_coord_bytes(rings_flat),
+                             np.asarray(ring_offsets, dtype=np.int64))
+
+def multipolygon_wkb(polys_flat, poly_offsets, ring_offsets):
+    """
+    组装多部分面WKB，返回uint8数组
+
+    polys_flat: 所有多边形所有环的坐标依次连接成的 (N, 2) 数组
+    poly_offsets: 各多边形的起始环号，最后一项为总环数
+    ring_offsets: 各环在 polys_flat 中的起始行，最后一项为总点数
+    """
+    return _assemble_multipolygon(_coord_bytes(polys_flat),
+                                  np.asarray(poly_offsets, dtype=np.int64),
+                                  np.asarray(ring_offsets, dtype=np.int64))
@@ -283,9 +283,13 @@ class GDALTestDataCleaner:
             
             if confirm == 'DELETE':
                 if self.test_output_dir.exists():
-                    # 计算目录大小
-                    total_size = sum(f.stat().st_size for f in self.test_output_dir.rglob('*') if f.is_file())
-                    file_count = len(list(self.test_output_dir.rglob('*')))
+                    # 计算目录大小（一次遍历同时统计项目数和文件大小）
+                    total_size = 0
+                    file_count = 0
+                    for item in self.test_output_dir.rglob('*'):
+                        file_count += 1
+                        if item.is_file():
+                            total_size += item.stat().st_size
                     
                     shutil.rmtree(self.test_output_dir)
                     
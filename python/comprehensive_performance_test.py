@@ -16,6 +16,14 @@ gdal.UseExceptions()
 ogr.UseExceptions()
 osr.UseExceptions()
 
+# 字段类型对应的类型化设置方法，其余类型使用通用的 SetField
+_TYPED_SETTERS = {
+    ogr.OFTInteger: 'SetFieldInteger64',
+    ogr.OFTInteger64: 'SetFieldInteger64',
+    ogr.OFTReal: 'SetFieldDouble',
+    ogr.OFTString: 'SetFieldString',
+}
+
 def comprehensive_performance_test():
     """全面性能对比测试"""
     print("Shapefile vs GeoPackage 全面性能对比测试")
@@ -243,6 +251,9 @@ def write_shapefile_optimized(file_path, test_data, srs, geom_type):
     else:
         create_polygon_fields(layer)
     
+    # 按属性字典的字段生成设置属性的函数
+    set_attributes = build_attribute_setter(layer.GetLayerDefn(), test_data[0][1] if test_data else ())
+    
     # 批量写入数据
     layer.StartTransaction()
     try:
@@ -250,9 +261,7 @@ def write_shapefile_optimized(file_path, test_data, srs, geom_type):
             feature = ogr.Feature(layer.GetLayerDefn())
             
             # 设置属性
-            for field_name, value in attributes.items():
-                if layer.GetLayerDefn().GetFieldIndex(field_name) >= 0:
-                    feature.SetField(field_name, value)
+            set_attributes(feature, attributes)
             
             feature.SetGeometry(geom)
             layer.CreateFeature(feature)
@@ -280,6 +289,9 @@ def write_geopackage_optimized(file_path, test_data, srs, geom_type):
     else:
         create_polygon_fields(layer)
     
+    # 按属性字典的字段生成设置属性的函数
+    set_attributes = build_attribute_setter(layer.GetLayerDefn(), test_data[0][1] if test_data else ())
+    
     # 批量写入数据
     layer.StartTransaction()
     try:
@@ -287,9 +299,7 @@ def write_geopackage_optimized(file_path, test_data, srs, geom_type):
             feature = ogr.Feature(layer.GetLayerDefn())
             
             # 设置属性
-            for field_name, value in attributes.items():
-                if layer.GetLayerDefn().GetFieldIndex(field_name) >= 0:
-                    feature.SetField(field_name, value)
+            set_attributes(feature, attributes)
             
             feature.SetGeometry(geom)
             layer.CreateFeature(feature)
@@ -302,6 +312,25 @@ def write_geopackage_optimized(file_path, test_data, srs, geom_type):
     
     datasource = None
 
+def build_attribute_setter(feature_defn, field_names):
+    """生成按固定字段顺序设置要素属性的函数 apply(feature, attributes)
+    
+    测试数据每条记录的字段相同，预先查好字段索引和类型，生成逐行调用类型化设置方法的代码，
+    写入循环中不再遍历属性字典、按字段名查找索引。图层中不存在的字段被跳过。
+    """
+    lines = ["def apply(feature, attributes):"]
+    for field_name in field_names:
+        field_index = feature_defn.GetFieldIndex(field_name)
+        if field_index < 0:
+            continue
+        setter = _TYPED_SETTERS.get(feature_defn.GetFieldDefn(field_index).GetType(), 'SetField')
+        lines.append(f"    feature.{setter}({field_index}, attributes[{field_name!r}])")
+    lines.append("    return feature")
+    
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace['apply']
+
 def create_point_fields(layer):
     """为点图层创建字段"""
     fields = [
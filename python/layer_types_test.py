@@ -8,6 +8,51 @@ import os
 import sys
 from osgeo import gdal, ogr, osr
 
+# 驱动查找和坐标系统构建在模块加载时完成一次，避免在各测试循环中重复
+_DRIVERS = {name: ogr.GetDriverByName(name) for name in (
+    "Memory", "ESRI Shapefile", "GeoJSON", "GPKG", "CSV", "KML", "GML", "SQLite")}
+
+_WGS84_SRS = osr.SpatialReference()
+_WGS84_SRS.ImportFromEPSG(4326)  # WGS84
+
+# GDAL/OGR支持的几何图形类型 (3D类型在模块加载时检查一次)
+_GEOMETRY_TYPES = (
+    (ogr.wkbPoint, "Point"),
+    (ogr.wkbLineString, "LineString"),
+    (ogr.wkbPolygon, "Polygon"),
+    (ogr.wkbMultiPoint, "MultiPoint"),
+    (ogr.wkbMultiLineString, "MultiLineString"),
+    (ogr.wkbMultiPolygon, "MultiPolygon"),
+    (ogr.wkbGeometryCollection, "GeometryCollection"),
+    (ogr.wkbNone, "None"),
+    (ogr.wkbUnknown, "Unknown"),
+)
+if hasattr(ogr, 'wkbPoint25D'):
+    _GEOMETRY_TYPES += (
+        (ogr.wkbPoint25D, "Point25D"),
+        (ogr.wkbLineString25D, "LineString25D"),
+        (ogr.wkbPolygon25D, "Polygon25D"),
+        (ogr.wkbMultiPoint25D, "MultiPoint25D"),
+        (ogr.wkbMultiLineString25D, "MultiLineString25D"),
+        (ogr.wkbMultiPolygon25D, "MultiPolygon25D"),
+        (ogr.wkbGeometryCollection25D, "GeometryCollection25D"),
+    )
+
+# create_test_layers 测试的输出格式和几何类型
+_TEST_FORMATS = (
+    ("ESRI Shapefile", "test_layers.shp"),
+    ("GeoJSON", "test_layers.geojson"),
+    ("GPKG", "test_layers.gpkg"),
+    ("Memory", ""),  # 内存格式
+)
+
+_LAYER_GEOMETRY_TYPES = (
+    (ogr.wkbPoint, "Point"),
+    (ogr.wkbLineString, "LineString"),
+    (ogr.wkbPolygon, "Polygon"),
+    (ogr.wkbMultiPoint, "MultiPoint"),
+)
+
 def check_gdal_version():
     """检查GDAL版本信息"""
     print(f"GDAL Version: {gdal.VersionInfo()}")
@@ -15,55 +60,31 @@ def check_gdal_version():
     print("-" * 50)
 
 def get_supported_drivers():
-    """获取所有支持的OGR驱动程序"""
-    print("支持的OGR驱动程序:")
+    """获取支持的OGR驱动程序数量
+    
+    完整的驱动列表只在设置了 GDAL_TEST_VERBOSE 环境变量时逐个枚举打印。
+    """
     driver_count = ogr.GetDriverCount()
-    drivers = []
     
-    for i in range(driver_count):
-        driver = ogr.GetDriver(i)
-        driver_name = driver.GetName()
-        drivers.append(driver_name)
-        print(f"{i+1:2d}. {driver_name}")
+    if os.environ.get("GDAL_TEST_VERBOSE"):
+        print("支持的OGR驱动程序:")
+        for i in range(driver_count):
+            print(f"{i+1:2d}. {ogr.GetDriver(i).GetName()}")
+        print()
     
-    print(f"\n总共支持 {driver_count} 种驱动程序")
+    print(f"总共支持 {driver_count} 种驱动程序")
     print("-" * 50)
-    return drivers
+    return driver_count
 
 def test_geometry_types():
     """测试不同的几何图形类型"""
     print("GDAL/OGR支持的几何图形类型:")
     
-    # 获取所有几何类型
-    geometry_types = [
-        (ogr.wkbPoint, "Point"),
-        (ogr.wkbLineString, "LineString"),
-        (ogr.wkbPolygon, "Polygon"),
-        (ogr.wkbMultiPoint, "MultiPoint"),
-        (ogr.wkbMultiLineString, "MultiLineString"),
-        (ogr.wkbMultiPolygon, "MultiPolygon"),
-        (ogr.wkbGeometryCollection, "GeometryCollection"),
-        (ogr.wkbNone, "None"),
-        (ogr.wkbUnknown, "Unknown"),
-    ]
-    
-    # 如果支持3D几何类型
-    if hasattr(ogr, 'wkbPoint25D'):
-        geometry_types.extend([
-            (ogr.wkbPoint25D, "Point25D"),
-            (ogr.wkbLineString25D, "LineString25D"),
-            (ogr.wkbPolygon25D, "Polygon25D"),
-            (ogr.wkbMultiPoint25D, "MultiPoint25D"),
-            (ogr.wkbMultiLineString25D, "MultiLineString25D"),
-            (ogr.wkbMultiPolygon25D, "MultiPolygon25D"),
-            (ogr.wkbGeometryCollection25D, "GeometryCollection25D"),
-        ])
-    
-    for geom_type, name in geometry_types:
+    for geom_type, name in _GEOMETRY_TYPES:
         print(f"  {geom_type:2d}: {name}")
     
     print("-" * 50)
-    return geometry_types
+    return _GEOMETRY_TYPES
 
 def create_test_layers():
     """创建不同类型的测试图层"""
@@ -73,33 +94,17 @@ def create_test_layers():
     
     print("创建测试图层:")
     
-    # 测试不同的输出格式
-    test_formats = [
-        ("ESRI Shapefile", "test_layers.shp"),
-        ("GeoJSON", "test_layers.geojson"),
-        ("GPKG", "test_layers.gpkg"),
-        ("Memory", ""),  # 内存格式
-    ]
-    
-    geometry_types = [
-        (ogr.wkbPoint, "Point"),
-        (ogr.wkbLineString, "LineString"),
-        (ogr.wkbPolygon, "Polygon"),
-        (ogr.wkbMultiPoint, "MultiPoint"),
-    ]
-    
-    # 创建坐标系统
-    srs = osr.SpatialReference()
-    srs.ImportFromEPSG(4326)  # WGS84
+    # 坐标系统
+    srs = _WGS84_SRS
     
     results = {}
     
-    for driver_name, filename in test_formats:
+    for driver_name, filename in _TEST_FORMATS:
         print(f"\n测试驱动: {driver_name}")
         
         try:
             # 获取驱动
-            driver = ogr.GetDriverByName(driver_name)
+            driver = _DRIVERS.get(driver_name)
             if not driver:
                 print(f"  错误: 无法获取驱动 {driver_name}")
                 continue
@@ -120,48 +125,61 @@ def create_test_layers():
             
             results[driver_name] = {}
             
-            # 为每种几何类型创建图层
-            for geom_type, geom_name in geometry_types:
-                layer_name = f"layer_{geom_name.lower()}"
-                
-                try:
-                    layer = datasource.CreateLayer(layer_name, srs, geom_type)
-                    if layer:
-                        # 添加字段
-                        field_defn = ogr.FieldDefn("id", ogr.OFTInteger)
-                        layer.CreateField(field_defn)
-                        
-                        field_defn = ogr.FieldDefn("name", ogr.OFTString)
-                        field_defn.SetWidth(50)
-                        layer.CreateField(field_defn)
-                        
-                        # 创建要素
-                        feature_defn = layer.GetLayerDefn()
-                        feature = ogr.Feature(feature_defn)
-                        feature.SetField("id", 1)
-                        feature.SetField("name", f"Test {geom_name}")
-                        
-                        # 创建几何体
-                        geom = create_test_geometry(geom_type)
-                        if geom:
-                            feature.SetGeometry(geom)
-                        
-                        # 添加要素到图层
-                        if layer.CreateFeature(feature) == 0:
-                            results[driver_name][geom_name] = "成功"
-                            print(f"  ✓ {geom_name} 图层创建成功")
+            # 支持事务的数据源 (如GPKG) 把所有图层的写入合并为一次提交
+            use_transaction = datasource.TestCapability(ogr.ODsCTransactions)
+            if use_transaction:
+                datasource.StartTransaction()
+            
+            try:
+                # 为每种几何类型创建图层
+                for geom_type, geom_name in _LAYER_GEOMETRY_TYPES:
+                    layer_name = f"layer_{geom_name.lower()}"
+                    
+                    try:
+                        layer = datasource.CreateLayer(layer_name, srs, geom_type)
+                        if layer:
+                            # 添加字段
+                            field_defn = ogr.FieldDefn("id", ogr.OFTInteger)
+                            layer.CreateField(field_defn)
+                            
+                            field_defn = ogr.FieldDefn("name", ogr.OFTString)
+                            field_defn.SetWidth(50)
+                            layer.CreateField(field_defn)
+                            
+                            # 创建要素
+                            feature_defn = layer.GetLayerDefn()
+                            feature = ogr.Feature(feature_defn)
+                            feature.SetField("id", 1)
+                            feature.SetField("name", f"Test {geom_name}")
+                            
+                            # 创建几何体
+                            geom = create_test_geometry(geom_type)
+                            if geom:
+                                feature.SetGeometry(geom)
+                            
+                            # 添加要素到图层
+                            if layer.CreateFeature(feature) == 0:
+                                results[driver_name][geom_name] = "成功"
+                                print(f"  ✓ {geom_name} 图层创建成功")
+                            else:
+                                results[driver_name][geom_name] = "创建要素失败"
+                                print(f"  ✗ {geom_name} 图层创建要素失败")
+                            
+                            feature = None
                         else:
-                            results[driver_name][geom_name] = "创建要素失败"
-                            print(f"  ✗ {geom_name} 图层创建要素失败")
-                        
-                        feature = None
-                    else:
-                        results[driver_name][geom_name] = "创建图层失败"
-                        print(f"  ✗ {geom_name} 图层创建失败")
+                            results[driver_name][geom_name] = "创建图层失败"
+                            print(f"  ✗ {geom_name} 图层创建失败")
+                    
+                    except Exception as e:
+                        results[driver_name][geom_name] = f"异常: {str(e)}"
+                        print(f"  ✗ {geom_name} 图层创建异常: {e}")
                 
-                except Exception as e:
-                    results[driver_name][geom_name] = f"异常: {str(e)}"
-                    print(f"  ✗ {geom_name} 图层创建异常: {e}")
+                if use_transaction:
+                    datasource.CommitTransaction()
+            except Exception:
+                if use_transaction:
+                    datasource.RollbackTransaction()
+                raise
             
             # 关闭数据源
             datasource = None
@@ -176,23 +194,24 @@ def create_test_geometry(geom_type):
     """根据几何类型创建测试几何体"""
     if geom_type == ogr.wkbPoint:
         geom = ogr.Geometry(ogr.wkbPoint)
-        geom.AddPoint(116.3974, 39.9093)  # 北京坐标
+        geom.AddPoint_2D(116.3974, 39.9093)  # 北京坐标
         return geom
     
     elif geom_type == ogr.wkbLineString:
         geom = ogr.Geometry(ogr.wkbLineString)
-        geom.AddPoint(116.3974, 39.9093)
-        geom.AddPoint(121.4737, 31.2304)  # 上海坐标
+        geom.AddPoint_2D(116.3974, 39.9093)
+        geom.AddPoint_2D(121.4737, 31.2304)  # 上海坐标
         return geom
     
     elif geom_type == ogr.wkbPolygon:
         # 创建一个矩形
         ring = ogr.Geometry(ogr.wkbLinearRing)
-        ring.AddPoint(116.0, 39.5)
-        ring.AddPoint(117.0, 39.5)
-        ring.AddPoint(117.0, 40.5)
-        ring.AddPoint(116.0, 40.5)
-        ring.AddPoint(116.0, 39.5)
+        # 先写入闭合点，一次分配5个点的存储，再按索引填写其余顶点
+        ring.SetPoint_2D(4, 116.0, 39.5)
+        ring.SetPoint_2D(0, 116.0, 39.5)
+        ring.SetPoint_2D(1, 117.0, 39.5)
+        ring.SetPoint_2D(2, 117.0, 40.5)
+        ring.SetPoint_2D(3, 116.0, 40.5)
         
         geom = ogr.Geometry(ogr.wkbPolygon)
         geom.AddGeometry(ring)
@@ -202,11 +221,11 @@ def create_test_geometry(geom_type):
         geom = ogr.Geometry(ogr.wkbMultiPoint)
         
         point1 = ogr.Geometry(ogr.wkbPoint)
-        point1.AddPoint(116.3974, 39.9093)
+        point1.AddPoint_2D(116.3974, 39.9093)
         geom.AddGeometry(point1)
         
         point2 = ogr.Geometry(ogr.wkbPoint)
-        point2.AddPoint(121.4737, 31.2304)
+        point2.AddPoint_2D(121.4737, 31.2304)
         geom.AddGeometry(point2)
         
         return geom
@@ -237,7 +256,7 @@ def main():
         check_gdal_version()
         
         # 获取支持的驱动程序
-        drivers = get_supported_drivers()
+        driver_count = get_supported_drivers()
         
         # 测试几何类型
         geometry_types = test_geometry_types()
@@ -6,13 +6,56 @@ GDAL图层类型测试程序（修正版）
 
 import os
 import sys
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from osgeo import gdal, ogr, osr
 
+try:
+    import numpy as np
+    import pyogrio.raw
+    HAS_PYOGRIO = True
+except ImportError:
+    HAS_PYOGRIO = False
+
 # 明确启用异常处理，避免GDAL 4.0兼容性警告
 gdal.UseExceptions()
 ogr.UseExceptions()
 osr.UseExceptions()
 
+# 驱动查找和坐标系统构建在模块加载时完成一次，避免在各测试循环中重复
+_DRIVERS = {name: ogr.GetDriverByName(name) for name in (
+    "Memory", "ESRI Shapefile", "GeoJSON", "GPKG", "CSV", "KML", "GML", "SQLite")}
+
+_WGS84_SRS = osr.SpatialReference()
+_WGS84_SRS.ImportFromEPSG(4326)  # WGS84
+
+# 支持的几何图形类型 (类型, 名称, 中文名)
+_GEOMETRY_TYPES = (
+    (ogr.wkbPoint, "Point", "点"),
+    (ogr.wkbLineString, "LineString", "线"),
+    (ogr.wkbPolygon, "Polygon", "多边形"),
+    (ogr.wkbMultiPoint, "MultiPoint", "多点"),
+    (ogr.wkbMultiLineString, "MultiLineString", "多线"),
+    (ogr.wkbMultiPolygon, "MultiPolygon", "多多边形"),
+)
+
+# 内存驱动测试的基本几何类型
+_BASIC_TYPES = _GEOMETRY_TYPES[:4]
+
+# 按驱动名查表的写入参数，替代各函数中的 driver_name 字符串分支
+# GPKG: 加大SQLite页缓存(MB)，空间索引在写入完成后一次性构建；
+# 不创建gpkg_ogr_contents表，省去每次插入时更新要素计数的触发器
+_CONFIG_OPTIONS = {
+    "GPKG": {"OGR_SQLITE_CACHE": "50", "GDAL_NUM_THREADS": "ALL_CPUS"},
+}
+_LAYER_CREATION_OPTIONS = {
+    "GPKG": ["SPATIAL_INDEX=NO"],
+}
+_DATASET_CREATION_OPTIONS = {
+    "GPKG": ["ADD_GPKG_OGR_CONTENTS=NO"],
+}
+
 def check_gdal_version():
     """检查GDAL版本信息"""
     print(f"GDAL Version: {gdal.VersionInfo()}")
@@ -28,16 +71,12 @@ def get_supported_drivers():
         "CSV", "KML", "GML", "SQLite"
     ]
     
-    available_drivers = []
-    driver_count = ogr.GetDriverCount()
-    
-    for i in range(driver_count):
-        driver = ogr.GetDriver(i)
-        driver_name = driver.GetName()
-        if driver_name in important_drivers:
-            available_drivers.append(driver_name)
-            print(f"  ✓ {driver_name}")
+    # 直接按名称探测 (模块加载时已查找)，无需遍历全部已注册驱动
+    available_drivers = [name for name in important_drivers if _DRIVERS.get(name) is not None]
+    for driver_name in available_drivers:
+        print(f"  ✓ {driver_name}")
     
+    driver_count = ogr.GetDriverCount()
     print(f"\n检查到 {len(available_drivers)}/{len(important_drivers)} 个重要驱动")
     print(f"总共支持 {driver_count} 种驱动程序")
     print("-" * 50)
@@ -47,42 +86,34 @@ def test_geometry_types():
     """测试不同的几何图形类型"""
     print("支持的几何图形类型:")
     
-    geometry_types = [
-        (ogr.wkbPoint, "Point", "点"),
-        (ogr.wkbLineString, "LineString", "线"),
-        (ogr.wkbPolygon, "Polygon", "多边形"),
-        (ogr.wkbMultiPoint, "MultiPoint", "多点"),
-        (ogr.wkbMultiLineString, "MultiLineString", "多线"),
-        (ogr.wkbMultiPolygon, "MultiPolygon", "多多边形"),
-    ]
-    
-    for geom_type, name, chinese_name in geometry_types:
+    for geom_type, name, chinese_name in _GEOMETRY_TYPES:
         print(f"  {geom_type:2d}: {name:15s} ({chinese_name})")
     
     print("-" * 50)
-    return geometry_types
+    return _GEOMETRY_TYPES
 
 def create_test_geometry(geom_type):
     """根据几何类型创建测试几何体"""
     if geom_type == ogr.wkbPoint:
         geom = ogr.Geometry(ogr.wkbPoint)
-        geom.AddPoint(116.3974, 39.9093)  # 北京坐标
+        geom.AddPoint_2D(116.3974, 39.9093)  # 北京坐标
         return geom
     
     elif geom_type == ogr.wkbLineString:
         geom = ogr.Geometry(ogr.wkbLineString)
-        geom.AddPoint(116.3974, 39.9093)  # 北京
-        geom.AddPoint(121.4737, 31.2304)  # 上海
+        geom.AddPoint_2D(116.3974, 39.9093)  # 北京
+        geom.AddPoint_2D(121.4737, 31.2304)  # 上海
         return geom
     
     elif geom_type == ogr.wkbPolygon:
         # 创建一个矩形
         ring = ogr.Geometry(ogr.wkbLinearRing)
-        ring.AddPoint(116.0, 39.5)
-        ring.AddPoint(117.0, 39.5)
-        ring.AddPoint(117.0, 40.5)
-        ring.AddPoint(116.0, 40.5)
-        ring.AddPoint(116.0, 39.5)  # 闭合
+        # 先写入闭合点，一次分配5个点的存储，再按索引填写其余顶点
+        ring.SetPoint_2D(4, 116.0, 39.5)  # 闭合
+        ring.SetPoint_2D(0, 116.0, 39.5)
+        ring.SetPoint_2D(1, 117.0, 39.5)
+        ring.SetPoint_2D(2, 117.0, 40.5)
+        ring.SetPoint_2D(3, 116.0, 40.5)
         
         geom = ogr.Geometry(ogr.wkbPolygon)
         geom.AddGeometry(ring)
@@ -92,11 +123,11 @@ def create_test_geometry(geom_type):
         geom = ogr.Geometry(ogr.wkbMultiPoint)
         
         point1 = ogr.Geometry(ogr.wkbPoint)
-        point1.AddPoint(116.3974, 39.9093)
+        point1.AddPoint_2D(116.3974, 39.9093)
         geom.AddGeometry(point1)
         
         point2 = ogr.Geometry(ogr.wkbPoint)
-        point2.AddPoint(121.4737, 31.2304)
+        point2.AddPoint_2D(121.4737, 31.2304)
         geom.AddGeometry(point2)
         
         return geom
@@ -105,13 +136,13 @@ def create_test_geometry(geom_type):
         geom = ogr.Geometry(ogr.wkbMultiLineString)
         
         line1 = ogr.Geometry(ogr.wkbLineString)
-        line1.AddPoint(116.0, 39.0)
-        line1.AddPoint(117.0, 40.0)
+        line1.AddPoint_2D(116.0, 39.0)
+        line1.AddPoint_2D(117.0, 40.0)
         geom.AddGeometry(line1)
         
         line2 = ogr.Geometry(ogr.wkbLineString)
-        line2.AddPoint(121.0, 31.0)
-        line2.AddPoint(122.0, 32.0)
+        line2.AddPoint_2D(121.0, 31.0)
+        line2.AddPoint_2D(122.0, 32.0)
         geom.AddGeometry(line2)
         
         return geom
@@ -121,11 +152,12 @@ def create_test_geometry(geom_type):
         
         # 创建第一个多边形
         ring1 = ogr.Geometry(ogr.wkbLinearRing)
-        ring1.AddPoint(116.0, 39.0)
-        ring1.AddPoint(117.0, 39.0)
-        ring1.AddPoint(117.0, 40.0)
-        ring1.AddPoint(116.0, 40.0)
-        ring1.AddPoint(116.0, 39.0)
+        # 先写入闭合点，一次分配5个点的存储，再按索引填写其余顶点
+        ring1.SetPoint_2D(4, 116.0, 39.0)
+        ring1.SetPoint_2D(0, 116.0, 39.0)
+        ring1.SetPoint_2D(1, 117.0, 39.0)
+        ring1.SetPoint_2D(2, 117.0, 40.0)
+        ring1.SetPoint_2D(3, 116.0, 40.0)
         
         poly1 = ogr.Geometry(ogr.wkbPolygon)
         poly1.AddGeometry(ring1)
@@ -140,12 +172,11 @@ def test_memory_driver():
     print("\n测试内存驱动:")
     
     try:
-        # 创建坐标系统
-        srs = osr.SpatialReference()
-        srs.ImportFromEPSG(4326)  # WGS84
+        # 坐标系统
+        srs = _WGS84_SRS
         
         # 获取驱动
-        driver = ogr.GetDriverByName("Memory")
+        driver = _DRIVERS.get("Memory")
         if driver is None:
             print("  ✗ 无法获取Memory驱动")
             return False
@@ -158,17 +189,10 @@ def test_memory_driver():
         
         print("  ✓ Memory数据源创建成功")
         
-        # 测试基本几何类型
-        basic_types = [
-            (ogr.wkbPoint, "Point", "点"),
-            (ogr.wkbLineString, "LineString", "线"),
-            (ogr.wkbPolygon, "Polygon", "多边形"),
-            (ogr.wkbMultiPoint, "MultiPoint", "多点"),
-        ]
-        
         success_count = 0
         
-        for geom_type, geom_name, chinese_name in basic_types:
+        # 测试基本几何类型
+        for geom_type, geom_name, chinese_name in _BASIC_TYPES:
             try:
                 layer_name = f"layer_{geom_name.lower()}"
                 layer = datasource.CreateLayer(layer_name, srs, geom_type)
@@ -220,6 +244,230 @@ def test_memory_driver():
         print(f"  ✗ Memory驱动测试失败: {e}")
         return False
 
+@contextmanager
+def _driver_config(driver_name):
+    """在当前线程上设置驱动专用的GDAL配置，结束后恢复原值
+    
+    各格式的转换在线程池中并行执行，配置只对当前线程生效，不影响其他驱动的线程和之后的测试。
+    """
+    config_options = _CONFIG_OPTIONS.get(driver_name, {})
+    previous_options = {key: gdal.GetThreadLocalConfigOption(key) for key in config_options}
+    for key, value in config_options.items():
+        gdal.SetThreadLocalConfigOption(key, value)
+    
+    try:
+        yield
+    finally:
+        # 恢复原有配置
+        for key, value in previous_options.items():
+            gdal.SetThreadLocalConfigOption(key, value)
+
+def _create_spatial_index(datasource, layer):
+    """为不带索引写入的GPKG图层一次性构建空间索引"""
+    result_set = datasource.ExecuteSQL(
+        f"SELECT CreateSpatialIndex('{layer.GetName()}', '{layer.GetGeometryColumn()}')")
+    if result_set is not None:
+        datasource.ReleaseResultSet(result_set)
+
+def write_points_ogr(driver, driver_name, file_path, test_points, messages):
+    """通过OGR逐要素写入测试点，返回成功写入的要素数，创建失败返回None
+    
+    输出信息追加到 messages 列表，由调用方统一打印。
+    """
+    with _driver_config(driver_name):
+        return _write_points_ogr(driver, driver_name, file_path, test_points, messages)
+
+def _write_points_ogr(driver, driver_name, file_path, test_points, messages):
+    """write_points_ogr 的实际写入过程 (配置项已由调用方设置)"""
+    layer_options = _LAYER_CREATION_OPTIONS.get(driver_name, [])
+    dataset_options = _DATASET_CREATION_OPTIONS.get(driver_name, [])
+    
+    # 创建数据源
+    datasource = driver.CreateDataSource(file_path, options=dataset_options)
+    if datasource is None:
+        messages.append(f"    ✗ 无法创建 {driver_name} 数据源")
+        return None
+    
+    # 坐标系统
+    srs = _WGS84_SRS
+    
+    # 创建一个点图层进行测试
+    layer = datasource.CreateLayer("test_points", srs, ogr.wkbPoint, options=layer_options)
+    if layer is None:
+        messages.append(f"    ✗ 无法创建图层")
+        datasource = None
+        return None
+    
+    # 添加字段
+    id_field = ogr.FieldDefn("id", ogr.OFTInteger)
+    layer.CreateField(id_field)
+    
+    name_field = ogr.FieldDefn("name", ogr.OFTString)
+    name_field.SetWidth(50)
+    layer.CreateField(name_field)
+    
+    city_field = ogr.FieldDefn("city", ogr.OFTString)
+    city_field.SetWidth(30)
+    layer.CreateField(city_field)
+    
+    feature_count = 0
+    
+    # 支持事务的数据源 (如GPKG) 把逐要素的隐式提交合并为一次提交
+    use_transaction = datasource.TestCapability(ogr.ODsCTransactions)
+    if use_transaction:
+        datasource.StartTransaction()
+    
+    # 要素和几何对象在循环外创建一次，逐行覆盖字段和坐标后复用
+    feature_defn = layer.GetLayerDefn()
+    feature = ogr.Feature(feature_defn)
+    point = ogr.Geometry(ogr.wkbPoint)
+    
+    # 字段索引只解析一次，循环内按整数索引设置字段
+    id_index = feature_defn.GetFieldIndex("id")
+    name_index = feature_defn.GetFieldIndex("name")
+    city_index = feature_defn.GetFieldIndex("city")
+    
+    try:
+        for point_id, name, city, lon, lat in test_points:
+            # 设置要素属性
+            feature.SetField(id_index, point_id)
+            feature.SetField(name_index, name)
+            feature.SetField(city_index, city)
+            
+            # 更新几何体坐标 (SetGeometry会复制几何体)
+            point.SetPoint_2D(0, lon, lat)
+            feature.SetGeometry(point)
+            
+            # 添加要素 (重置FID，让驱动分配新的FID)
+            feature.SetFID(-1)
+            result = layer.CreateFeature(feature)
+            if result == 0:
+                feature_count += 1
+            else:
+                messages.append(f"    警告: 要素 {name} 创建失败")
+        
+        # 清理
+        feature = None
+        
+        if use_transaction:
+            datasource.CommitTransaction()
+    except Exception:
+        if use_transaction:
+            datasource.RollbackTransaction()
+        raise
+    
+    if "SPATIAL_INDEX=NO" in layer_options:
+        _create_spatial_index(datasource, layer)
+    
+    # 关闭数据源
+    datasource = None
+    return feature_count
+
+def write_points_pyogrio(driver_name, file_path, test_points):
+    """通过pyogrio按列一次写入所有测试点，返回写入的要素数
+    
+    pyogrio使用其自带的GDAL库，本模块的GDAL配置项对它不生效，图层按pyogrio的默认选项创建。
+    """
+    point_ids, names, cities, lons, lats = zip(*test_points)
+    
+    geometry = np.array([struct.pack('<BIdd', 1, ogr.wkbPoint, lon, lat)
+                         for lon, lat in zip(lons, lats)], dtype=object)
+    field_data = [
+        np.array(point_ids, dtype=np.int32),
+        np.array(names, dtype=object),
+        np.array(cities, dtype=object),
+    ]
+    
+    dataset_options = dict(option.split("=", 1)
+                           for option in _DATASET_CREATION_OPTIONS.get(driver_name, ())) or None
+    pyogrio.raw.write(file_path, geometry, field_data, ["id", "name", "city"],
+                      layer="test_points", driver=driver_name,
+                      geometry_type="Point", crs="EPSG:4326",
+                      dataset_options=dataset_options)
+    return len(test_points)
+
+def translate_points(driver_name, staging_path, file_path):
+    """把内存暂存数据集中的测试点转换输出为目标格式，返回写入的要素数
+    
+    VectorTranslate在GDAL内部批量复制要素，Python侧不再逐要素构建。
+    驱动专用的配置、数据集和图层创建选项都作用在目标文件上；
+    GPKG不建索引写入，转换完成后再一次性构建空间索引。
+    """
+    source = gdal.OpenEx(staging_path, gdal.OF_VECTOR)
+    
+    dataset_options = _DATASET_CREATION_OPTIONS.get(driver_name, [])
+    layer_options = _LAYER_CREATION_OPTIONS.get(driver_name, [])
+    with _driver_config(driver_name):
+        target = gdal.VectorTranslate(file_path, source, format=driver_name,
+                                      datasetCreationOptions=dataset_options,
+                                      layerCreationOptions=layer_options)
+        layer = target.GetLayer(0)
+        if "SPATIAL_INDEX=NO" in layer_options:
+            _create_spatial_index(target, layer)
+        feature_count = layer.GetFeatureCount()
+        
+        # 在配置恢复前关闭目标文件，落盘时仍使用驱动专用配置
+        layer = None
+        target = None
+    
+    source = None
+    return feature_count
+
+def _remove_shapefile(driver, file_path):
+    """由驱动删除Shapefile及所有附属文件 (含.qix/.sbn/.sbx等索引文件)"""
+    if os.path.exists(file_path):
+        driver.DeleteDataSource(file_path)
+
+def _remove_single_file(driver, file_path):
+    """单文件格式直接删除，文件不存在时抛出FileNotFoundError"""
+    os.unlink(file_path)
+
+# 删除旧输出的处理函数，未列出的驱动按单文件格式处理
+_REMOVE_HANDLERS = {
+    "ESRI Shapefile": _remove_shapefile,
+}
+
+def _write_one_driver(driver_name, filename, description, output_dir, test_points, staging_path):
+    """测试单个文件驱动，返回 (是否成功, 输出信息列表)
+    
+    在工作线程中运行：每个线程只使用自己创建的数据源句柄，
+    共享的只有模块加载时查找好的驱动对象。
+    """
+    messages = [f"  测试 {driver_name} ({description}):"]
+    
+    try:
+        # 获取驱动
+        driver = _DRIVERS.get(driver_name)
+        if driver is None:
+            messages.append(f"    ✗ 无法获取 {driver_name} 驱动")
+            return False, messages
+        
+        # 创建文件路径
+        file_path = os.path.join(output_dir, filename)
+        
+        # 如果文件存在，先删除 (按驱动查表选择删除方式，不存在时忽略)
+        try:
+            _REMOVE_HANDLERS.get(driver_name, _remove_single_file)(driver, file_path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            messages.append(f"    警告: 删除旧文件失败: {e}")
+        
+        # 写入测试数据 (从内存暂存数据集转换)
+        feature_count = translate_points(driver_name, staging_path, file_path)
+        
+        if feature_count == len(test_points):
+            messages.append(f"    ✓ {driver_name} 测试成功，创建了 {feature_count} 个要素")
+            messages.append(f"    文件保存为: {file_path}")
+            return True, messages
+        
+        messages.append(f"    ✗ {driver_name} 部分失败，只创建了 {feature_count}/{len(test_points)} 个要素")
+        return False, messages
+        
+    except Exception as e:
+        messages.append(f"    ✗ {driver_name} 测试失败: {e}")
+        return False, messages
+
 def test_file_drivers():
     """测试文件驱动"""
     print("\n测试文件驱动:")
@@ -238,108 +486,52 @@ def test_file_drivers():
         ("ESRI Shapefile", "test_point.shp", "Shapefile文件"),
     ]
     
-    success_drivers = []
+    # 创建测试数据
+    test_points = [
+        (1, "天安门", "北京", 116.3974, 39.9093),
+        (2, "外滩", "上海", 121.4737, 31.2304),
+        (3, "小蛮腰", "广州", 113.3333, 23.1333),
+    ]
     
-    for driver_name, filename, description in test_formats:
-        try:
-            print(f"  测试 {driver_name} ({description}):")
-            
-            # 获取驱动
-            driver = ogr.GetDriverByName(driver_name)
-            if driver is None:
-                print(f"    ✗ 无法获取 {driver_name} 驱动")
-                continue
-            
-            # 创建文件路径
-            file_path = os.path.join(output_dir, filename)
-            
-            # 如果文件存在，先删除
-            if os.path.exists(file_path):
-                try:
-                    if driver_name == "ESRI Shapefile":
-                        # Shapefile需要删除多个相关文件
-                        base_name = os.path.splitext(file_path)[0]
-                        for ext in ['.shp', '.shx', '.dbf', '.prj', '.cpg']:
-                            related_file = base_name + ext
-                            if os.path.exists(related_file):
-                                os.remove(related_file)
-                    else:
-                        os.remove(file_path)
-                except Exception as e:
-                    print(f"    警告: 删除旧文件失败: {e}")
-            
-            # 创建数据源
-            datasource = driver.CreateDataSource(file_path)
-            if datasource is None:
-                print(f"    ✗ 无法创建 {driver_name} 数据源")
-                continue
-            
-            # 创建坐标系统
-            srs = osr.SpatialReference()
-            srs.ImportFromEPSG(4326)
-            
-            # 创建一个点图层进行测试
-            layer = datasource.CreateLayer("test_points", srs, ogr.wkbPoint)
-            if layer is None:
-                print(f"    ✗ 无法创建图层")
-                datasource = None
-                continue
-            
-            # 添加字段
-            id_field = ogr.FieldDefn("id", ogr.OFTInteger)
-            layer.CreateField(id_field)
-            
-            name_field = ogr.FieldDefn("name", ogr.OFTString)
-            name_field.SetWidth(50)
-            layer.CreateField(name_field)
-            
-            city_field = ogr.FieldDefn("city", ogr.OFTString)
-            city_field.SetWidth(30)
-            layer.CreateField(city_field)
-            
-            # 创建测试数据
-            test_points = [
-                (1, "天安门", "北京", 116.3974, 39.9093),
-                (2, "外滩", "上海", 121.4737, 31.2304),
-                (3, "小蛮腰", "广州", 113.3333, 23.1333),
+    # 测试点只通过OGR构建一次，暂存在内存文件系统中，各格式再由GDAL转换输出。
+    # 使用/vsimem/下的GPKG而不是Memory驱动：每个工作线程需要打开自己的只读句柄
+    staging_path = "/vsimem/test_points_staging.gpkg"
+    messages = []
+    if write_points_ogr(_DRIVERS["GPKG"], "GPKG", staging_path, test_points, messages) is None:
+        print("\n".join(messages))
+        return []
+    
+    # 各格式写入不同的文件，互不依赖，使用线程池并行测试
+    try:
+        with ThreadPoolExecutor(max_workers=len(test_formats)) as executor:
+            futures = [
+                executor.submit(_write_one_driver, driver_name, filename, description,
+                                output_dir, test_points, staging_path)
+                for driver_name, filename, description in test_formats
             ]
-            
-            feature_count = 0
-            for point_id, name, city, lon, lat in test_points:
-                # 创建要素
-                feature_defn = layer.GetLayerDefn()
-                feature = ogr.Feature(feature_defn)
-                feature.SetField("id", point_id)
-                feature.SetField("name", name)
-                feature.SetField("city", city)
-                
-                # 创建几何体
-                point = ogr.Geometry(ogr.wkbPoint)
-                point.AddPoint(lon, lat)
-                feature.SetGeometry(point)
-                
-                # 添加要素
-                result = layer.CreateFeature(feature)
-                if result == 0:
-                    feature_count += 1
-                else:
-                    print(f"    警告: 要素 {name} 创建失败")
-                
-                # 清理
-                feature = None
-            
-            if feature_count == len(test_points):
-                print(f"    ✓ {driver_name} 测试成功，创建了 {feature_count} 个要素")
-                success_drivers.append(driver_name)
-                print(f"    文件保存为: {file_path}")
-            else:
-                print(f"    ✗ {driver_name} 部分失败，只创建了 {feature_count}/{len(test_points)} 个要素")
-            
-            # 关闭数据源
-            datasource = None
-            
-        except Exception as e:
-            print(f"    ✗ {driver_name} 测试失败: {e}")
+    finally:
+        gdal.Unlink(staging_path)
+    
+    # 按格式顺序输出结果
+    success_drivers = []
+    for (driver_name, _, _), future in zip(test_formats, futures):
+        success, messages = future.result()
+        print("\n".join(messages))
+        if success:
+            success_drivers.append(driver_name)
+    
+    # pyogrio使用其自带的GDAL库，验证的不是上面检查过的osgeo驱动；
+    # 只作为额外的参考写入单独列出，不计入驱动测试结果
+    if HAS_PYOGRIO:
+        print(f"\n  pyogrio按列批量写入 (自带GDAL {pyogrio.__gdal_version_string__}，仅供参考):")
+        for driver_name, filename, _ in test_formats:
+            base_name, ext = os.path.splitext(filename)
+            file_path = os.path.join(output_dir, f"{base_name}_pyogrio{ext}")
+            try:
+                feature_count = write_points_pyogrio(driver_name, file_path, test_points)
+                print(f"    ✓ {driver_name}: {feature_count} 个要素 -> {file_path}")
+            except Exception as e:
+                print(f"    ✗ {driver_name}: {e}")
     
     return success_drivers
 
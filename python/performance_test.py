@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Shapefile vs GeoPackage 读写效率对比测试
-测试不同数据量下两种格式的性能差异
+测试不同数据量下两种格式的性能差异，并以 FlatGeobuf 作为顺序写入的基线
 """
 
 import os
@@ -9,19 +9,106 @@ import sys
 import time
 import random
 import math
+import hashlib
+import inspect
+import itertools
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
 from osgeo import gdal, ogr, osr
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import pyogrio.raw
+    HAS_PYOGRIO = True
+except ImportError:
+    HAS_PYOGRIO = False
+
 # 明确启用异常处理，避免GDAL 4.0兼容性警告
 gdal.UseExceptions()
 ogr.UseExceptions()
 osr.UseExceptions()
 
-def performance_test():
-    """性能对比测试主函数"""
+# GeoPackage写入时的SQLite配置：加大页缓存(MB)，日志放在内存中，不等待每次落盘。
+# 不使用WAL：journal_mode=WAL会持久记录在文件头中，只读打开时还需要-shm文件，
+# GeoPackage规范不建议这样分发；单写入者的基准测试中内存日志加synchronous=OFF也更快
+_GPKG_WRITE_OPTIONS = {
+    'OGR_SQLITE_CACHE': '256',
+    'OGR_SQLITE_JOURNAL': 'MEMORY',
+    'OGR_SQLITE_SYNCHRONOUS': 'OFF',
+}
+
+if HAS_NUMPY:
+    # 正方形多边形环相对中心点的单位偏移 (闭合)
+    _SQUARE_OFFSETS = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1], [-1, -1]], dtype=np.float64)
+    
+    # 点的小端WKB记录布局 (紧凑排列，共21字节)
+    _POINT_WKB_DTYPE = np.dtype([
+        ('byte_order', 'u1'),
+        ('geom_type', '<u4'),
+        ('x', '<f8'),
+        ('y', '<f8'),
+    ])
+    
+    # 单环5点多边形的小端WKB记录布局 (紧凑排列，共93字节)
+    _POLYGON_WKB_DTYPE = np.dtype([
+        ('byte_order', 'u1'),
+        ('geom_type', '<u4'),
+        ('num_rings', '<u4'),
+        ('num_points', '<u4'),
+        ('coords', '<f8', (5, 2)),
+    ])
+
+# 测试数据的属性字段、对应的 FeatureTable 列及按列写入时的数据类型
+_FIELD_COLUMNS = (
+    ('id', 'ids', 'int32'),
+    ('name', 'names', 'object'),
+    ('category', 'categories', 'object'),
+    ('value', 'values', 'float64'),
+    ('population', 'populations', 'int32'),
+    ('desc', 'descs', 'object'),
+)
+
+# 参与测试的格式：(结果键前缀, 显示名称, 驱动名, 文件后缀, 图层创建选项)
+# GPKG 不建索引写入，写完后一次性构建R树；FlatGeobuf 是只追加的二进制格式，
+# 分别测试不建/建空间索引，把顺序写入和索引构建两部分开销分开
+_BENCHMARK_FORMATS = (
+    ('shapefile', 'Shapefile', 'ESRI Shapefile', '.shp', []),
+    ('geopackage', 'GeoPackage', 'GPKG', '.gpkg', ['SPATIAL_INDEX=NO']),
+    ('flatgeobuf', 'FlatGeobuf', 'FlatGeobuf', '.fgb', ['SPATIAL_INDEX=NO']),
+    ('flatgeobuf_indexed', 'FlatGeobuf(索引)', 'FlatGeobuf', '.indexed.fgb', ['SPATIAL_INDEX=YES']),
+)
+
+# pyogrio可用时单独增加一行按列写入的对比。pyogrio使用其自带的GDAL库，与osgeo不是同一个库：
+# 上面的GPKG配置项不会生效，因此不替换osgeo写入，只作为额外的参考行
+_PYOGRIO_FORMAT_KEY = 'geopackage_pyogrio'
+if HAS_PYOGRIO:
+    _BENCHMARK_FORMATS += (
+        (_PYOGRIO_FORMAT_KEY, 'GPKG(pyogrio)', 'GPKG', '.pyogrio.gpkg', []),
+    )
+
+# 压缩存储对比：同一份数据以ZSTD列压缩写入GeoParquet，只测量文件大小 (需要GDAL的Parquet驱动)
+_PARQUET_CREATION_OPTIONS = ['COMPRESSION=ZSTD']
+
+def performance_test(max_workers=1):
+    """性能对比测试主函数
+    
+    各 (几何类型, 数据量) 测试相互独立，写入不同的文件，max_workers 大于1时用进程池并行执行。
+    默认逐个执行：同时运行的测试会争用磁盘和CPU，记录的读写耗时不再可比；
+    只需快速跑通时才显式传入更大的 max_workers。
+    """
     print("Shapefile vs GeoPackage 性能对比测试")
     print("=" * 60)
     print(f"测试时间: {time.strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"GDAL版本: {gdal.VersionInfo('RELEASE_NAME')}")
+    if HAS_PYOGRIO:
+        print(f"pyogrio自带GDAL版本: {pyogrio.__gdal_version_string__} (仅用于 GPKG(pyogrio) 一行)")
     
     output_dir = "/Users/fangchaoning/Code/gdal/TryGDAL/python/test_output/performance_test"
     if not os.path.exists(output_dir):
@@ -46,6 +133,12 @@ def performance_test():
         }
     ]
     
+    max_workers = max(1, max_workers)
+    
+    tasks = [(geom_test, size) for geom_test in geometry_tests for size in test_sizes]
+    cell_results = run_benchmark_cells(output_dir, tasks, max_workers)
+    
+    # 按几何类型和数据量顺序输出结果
     results = {}
     
     for geom_test in geometry_tests:
@@ -57,31 +150,11 @@ def performance_test():
         geom_results = {}
         
         for size in test_sizes:
-            print(f"\n数据量: {size:,} 个要素")
-            print("-" * 40)
-            
-            # 生成测试数据
-            print("生成测试数据...")
-            test_data = geom_test['create_func'](size)
-            
-            # 测试写入性能
-            write_results = test_write_performance(output_dir, geom_test, test_data, size)
-            
-            # 测试读取性能
-            read_results = test_read_performance(output_dir, geom_test, size)
-            
-            # 测试文件大小
-            size_results = test_file_size(output_dir, geom_test, size)
-            
-            # 汇总结果
-            geom_results[size] = {
-                'write': write_results,
-                'read': read_results,
-                'size': size_results
-            }
+            cell = cell_results[(geom_test['name'], size)]
+            geom_results[size] = cell
             
             # 显示本轮结果
-            print_round_results(size, write_results, read_results, size_results)
+            print_round_results(size, cell['write'], cell['read'], cell['size'])
         
         results[geom_test['name']] = geom_results
     
@@ -90,54 +163,264 @@ def performance_test():
     
     return results
 
+def run_benchmark_cells(output_dir, tasks, max_workers):
+    """执行 (几何类型, 数据量) 测试任务，返回 {(几何类型名, 数据量): 结果字典}"""
+    if max_workers <= 1:
+        return {(geom_test['name'], size): run_benchmark_cell(output_dir, geom_test, size)
+                for geom_test, size in tasks}
+    
+    print(f"\n使用 {max_workers} 个进程并行执行 {len(tasks)} 个测试...")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            (geom_test['name'], size): executor.submit(run_benchmark_cell, output_dir, geom_test, size)
+            for geom_test, size in tasks
+        }
+    return {key: future.result() for key, future in futures.items()}
+
+def run_benchmark_cell(output_dir, geom_test, size):
+    """运行单个 (几何类型, 数据量) 的写入、读取和文件大小测试
+    
+    可在工作进程中运行：模块导入时已调用 UseExceptions()，每个进程独立生效。
+    """
+    print(f"\n{geom_test['name']} 数据量: {size:,} 个要素")
+    
+    # 生成测试数据 (优先读取缓存)
+    test_data = load_or_create_test_data(os.path.join(output_dir, "_cache"), geom_test, size)
+    
+    # 测试写入性能
+    write_results = test_write_performance(output_dir, geom_test, test_data, size)
+    
+    # 测试读取性能
+    read_results = test_read_performance(output_dir, geom_test, size)
+    
+    # 测试文件大小
+    size_results = test_file_size(output_dir, geom_test, size)
+    size_results['parquet_size'] = test_parquet_size(output_dir, geom_test, test_data, size)
+    
+    return {
+        'write': write_results,
+        'read': read_results,
+        'size': size_results
+    }
+
+@dataclass
+class FeatureTable:
+    """按列存储的测试数据：每个属性一列，几何体为连续的WKB缓冲区加偏移量
+    
+    第i个要素的几何体为 wkb_buffer[wkb_offsets[i]:wkb_offsets[i + 1]]。
+    """
+    ids: list
+    names: list
+    categories: list
+    values: list
+    populations: list
+    descs: list
+    wkb_buffer: bytes
+    wkb_offsets: list
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def save(self, path):
+        """保存为NumPy的.npz文件
+        
+        先写入同目录下的临时文件再替换到 path，写入中断 (Ctrl-C、磁盘已满) 时不会留下不完整的文件。
+        """
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f,
+                         ids=np.asarray(self.ids, dtype=np.int64),
+                         names=np.asarray(self.names),
+                         categories=np.asarray(self.categories),
+                         values=np.asarray(self.values, dtype=np.float64),
+                         populations=np.asarray(self.populations, dtype=np.int64),
+                         descs=np.asarray(self.descs),
+                         wkb_buffer=np.frombuffer(self.wkb_buffer, dtype=np.uint8),
+                         wkb_offsets=np.asarray(self.wkb_offsets, dtype=np.int64))
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+    
+    @classmethod
+    def load(cls, path):
+        """从 save 写出的.npz文件读取"""
+        with np.load(path, allow_pickle=False) as cached:
+            return cls(cached['ids'].tolist(),
+                       cached['names'].tolist(),
+                       cached['categories'].tolist(),
+                       cached['values'].tolist(),
+                       cached['populations'].tolist(),
+                       cached['descs'].tolist(),
+                       cached['wkb_buffer'].tobytes(),
+                       cached['wkb_offsets'].tolist())
+    
+    def iter_wkb(self):
+        """按顺序逐个返回各要素的WKB"""
+        buffer = self.wkb_buffer
+        offsets = self.wkb_offsets
+        return (buffer[start:end] for start, end in zip(offsets, offsets[1:]))
+
+def load_or_create_test_data(cache_dir, geom_test, count):
+    """读取缓存的测试数据，不存在时生成并写入缓存
+    
+    生成使用按 (几何类型, 数据量) 固定的随机种子，缓存内容与重新生成的结果一致，
+    重复运行时跳过生成。缓存文件名包含生成代码的摘要 (见 test_data_cache_tag)，
+    生成函数修改后不会读到旧数据。缓存需要NumPy，没有NumPy时每次直接生成。
+    """
+    if not HAS_NUMPY:
+        return geom_test['create_func'](count)
+    
+    cache_tag = test_data_cache_tag(geom_test['create_func'])
+    if cache_tag is None:
+        return geom_test['create_func'](count)
+    
+    cache_path = os.path.join(cache_dir, f"{geom_test['name'].lower()}_{count}_{cache_tag}.npz")
+    try:
+        return FeatureTable.load(cache_path)
+    except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+        # 缓存不存在或已损坏 (如旧版本中断写入留下的文件)，重新生成并覆盖
+        pass
+    
+    test_data = geom_test['create_func'](count)
+    os.makedirs(cache_dir, exist_ok=True)
+    test_data.save(cache_path)
+    return test_data
+
+def test_data_cache_tag(create_func):
+    """由生成函数和 pack_wkbs 的源码及NumPy版本 (随机数流可能随版本变化) 计算缓存标记
+    
+    源码不可用时返回None，此时不使用缓存。
+    """
+    try:
+        source = inspect.getsource(create_func) + inspect.getsource(pack_wkbs)
+    except (OSError, TypeError):
+        return None
+    return hashlib.blake2b((source + np.__version__).encode('utf-8'), digest_size=6).hexdigest()
+
+def pack_wkbs(wkbs):
+    """把WKB列表拼接为连续缓冲区，返回 (缓冲区, 偏移量列表)"""
+    offsets = [0]
+    offsets.extend(itertools.accumulate(len(wkb) for wkb in wkbs))
+    return b"".join(wkbs), offsets
+
 def create_test_points(count):
-    """生成测试点数据"""
+    """生成测试点数据，返回按列存储的 FeatureTable"""
     print(f"  生成 {count:,} 个随机点...")
     
     # 北京市范围 (116.0-117.0, 39.4-40.6)
     min_lon, max_lon = 116.0, 117.0
     min_lat, max_lat = 39.4, 40.6
     
-    test_data = []
+    ids = list(range(1, count + 1))
+    names = [f'Point_{i}' for i in ids]
+    descs = [f'Test point {i}' for i in ids]
+    
+    if HAS_NUMPY:
+        # 坐标和随机属性由NumPy一次生成 (固定种子，结果可复现)
+        rng = np.random.default_rng([0, count])
+        lons = rng.uniform(min_lon, max_lon, count)
+        lats = rng.uniform(min_lat, max_lat, count)
+        categories = np.array(['A', 'B', 'C', 'D'])[rng.integers(0, 4, count)].tolist()
+        values = rng.uniform(0, 1000, count).tolist()
+        populations = rng.integers(10, 1001, count).tolist()
+        
+        # 所有点的WKB记录按列填入一个结构化数组，整体即为连续的WKB缓冲区
+        records = np.empty(count, dtype=_POINT_WKB_DTYPE)
+        records['byte_order'] = 1
+        records['geom_type'] = ogr.wkbPoint
+        records['x'] = lons
+        records['y'] = lats
+        record_size = _POINT_WKB_DTYPE.itemsize
+        
+        return FeatureTable(ids, names, categories, values, populations, descs,
+                            records.tobytes(), list(range(0, record_size * count + 1, record_size)))
+    
+    rng = random.Random(f"point-{count}")
+    categories = []
+    values = []
+    populations = []
+    wkbs = []
+    
+    # 循环内用到的方法和常量预先绑定为局部变量，避免每次迭代重复查找全局名和属性
+    uniform, choice, randint = rng.uniform, rng.choice, rng.randint
+    Geometry, wkbPoint = ogr.Geometry, ogr.wkbPoint
     
     for i in range(count):
-        lon = random.uniform(min_lon, max_lon)
-        lat = random.uniform(min_lat, max_lat)
+        lon = uniform(min_lon, max_lon)
+        lat = uniform(min_lat, max_lat)
         
-        point = ogr.Geometry(ogr.wkbPoint)
+        point = Geometry(wkbPoint)
         point.AddPoint(lon, lat)
+        wkbs.append(point.ExportToWkb())
         
         # 生成属性数据
-        attributes = {
-            'id': i + 1,
-            'name': f'Point_{i+1}',
-            'category': random.choice(['A', 'B', 'C', 'D']),
-            'value': random.uniform(0, 1000),
-            'population': random.randint(10, 1000),
-            'desc': f'Test point {i+1}'
-        }
-        
-        test_data.append((point, attributes))
+        categories.append(choice(['A', 'B', 'C', 'D']))
+        values.append(uniform(0, 1000))
+        populations.append(randint(10, 1000))
     
-    return test_data
+    wkb_buffer, wkb_offsets = pack_wkbs(wkbs)
+    return FeatureTable(ids, names, categories, values, populations, descs,
+                        wkb_buffer, wkb_offsets)
 
 def create_test_polygons(count):
-    """生成测试多边形数据"""
+    """生成测试多边形数据，返回按列存储的 FeatureTable"""
     print(f"  生成 {count:,} 个随机多边形...")
     
     # 北京市范围
     min_lon, max_lon = 116.0, 117.0  
     min_lat, max_lat = 39.4, 40.6
     
-    test_data = []
+    ids = list(range(1, count + 1))
+    names = [f'Polygon_{i}' for i in ids]
+    descs = [f'Polygon {i}' for i in ids]
+    
+    if HAS_NUMPY:
+        # 中心点和半径由NumPy一次生成 (固定种子)，(count, 5, 2) 的正方形环坐标整体计算
+        rng = np.random.default_rng([1, count])
+        centers = rng.uniform([min_lon + 0.01, min_lat + 0.01],
+                              [max_lon - 0.01, max_lat - 0.01], (count, 2))
+        radii = rng.uniform(0.001, 0.005, count)
+        rings = centers[:, np.newaxis, :] + radii[:, np.newaxis, np.newaxis] * _SQUARE_OFFSETS
+        
+        # 所有多边形的WKB记录一次写入连续缓冲区: 字节序 + 类型 + 环数 + 点数 + 5个坐标
+        records = np.empty(count, dtype=_POLYGON_WKB_DTYPE)
+        records['byte_order'] = 1
+        records['geom_type'] = ogr.wkbPolygon
+        records['num_rings'] = 1
+        records['num_points'] = 5
+        records['coords'] = rings
+        record_size = _POLYGON_WKB_DTYPE.itemsize
+        
+        # 正方形面积可直接由半径计算，不需要逐个调用GetArea
+        areas = ((2 * radii) ** 2).tolist()
+        categories = np.array(['Urban', 'Rural', 'Industrial', 'Residential'])[rng.integers(0, 4, count)].tolist()
+        populations = rng.integers(100, 10001, count).tolist()
+        
+        return FeatureTable(ids, names, categories, areas, populations, descs,
+                            records.tobytes(), list(range(0, record_size * count + 1, record_size)))
+    
+    rng = random.Random(f"polygon-{count}")
+    categories = []
+    areas = []
+    populations = []
+    wkbs = []
+    
+    # 循环内用到的方法和常量预先绑定为局部变量
+    uniform, choice, randint = rng.uniform, rng.choice, rng.randint
+    Geometry, wkbLinearRing, wkbPolygon = ogr.Geometry, ogr.wkbLinearRing, ogr.wkbPolygon
     
     for i in range(count):
         # 生成随机中心点
-        center_lon = random.uniform(min_lon + 0.01, max_lon - 0.01)
-        center_lat = random.uniform(min_lat + 0.01, max_lat - 0.01)
+        center_lon = uniform(min_lon + 0.01, max_lon - 0.01)
+        center_lat = uniform(min_lat + 0.01, max_lat - 0.01)
         
         # 生成随机半径（创建正方形）
-        radius = random.uniform(0.001, 0.005)
+        radius = uniform(0.001, 0.005)
         
         # 创建正方形多边形
         coords = [
@@ -149,28 +432,23 @@ def create_test_polygons(count):
         ]
         
         # 创建线性环
-        ring = ogr.Geometry(ogr.wkbLinearRing)
+        ring = Geometry(wkbLinearRing)
         for lon, lat in coords:
             ring.AddPoint(lon, lat)
         
         # 创建多边形
-        polygon = ogr.Geometry(ogr.wkbPolygon)
+        polygon = Geometry(wkbPolygon)
         polygon.AddGeometry(ring)
+        wkbs.append(polygon.ExportToWkb())
         
         # 生成属性数据
-        area = polygon.GetArea()
-        attributes = {
-            'id': i + 1,
-            'name': f'Polygon_{i+1}',
-            'category': random.choice(['Urban', 'Rural', 'Industrial', 'Residential']),
-            'value': area,
-            'population': random.randint(100, 10000),
-            'desc': f'Polygon {i+1}'
-        }
-        
-        test_data.append((polygon, attributes))
+        areas.append(polygon.GetArea())
+        categories.append(choice(['Urban', 'Rural', 'Industrial', 'Residential']))
+        populations.append(randint(100, 10000))
     
-    return test_data
+    wkb_buffer, wkb_offsets = pack_wkbs(wkbs)
+    return FeatureTable(ids, names, categories, areas, populations, descs,
+                        wkb_buffer, wkb_offsets)
 
 def test_write_performance(output_dir, geom_test, test_data, count):
     """测试写入性能"""
@@ -181,58 +459,33 @@ def test_write_performance(output_dir, geom_test, test_data, count):
     srs.ImportFromEPSG(4326)
     
     geom_type = ogr.wkbPoint if geom_test['name'] == 'Point' else ogr.wkbPolygon
+    base_name = f"{geom_test['name'].lower()}_{count}"
     
-    # 测试 Shapefile 写入
-    print("  测试 Shapefile 写入性能...")
-    shp_filename = f"{geom_test['name'].lower()}_{count}.shp"
-    shp_path = os.path.join(output_dir, shp_filename)
-    
-    start_time = time.time()
-    write_shapefile(shp_path, test_data, srs, geom_type)
-    shp_write_time = time.time() - start_time
-    
-    results['shapefile_write'] = shp_write_time
-    
-    # 测试 GeoPackage 写入
-    print("  测试 GeoPackage 写入性能...")
-    gpkg_filename = f"{geom_test['name'].lower()}_{count}.gpkg"
-    gpkg_path = os.path.join(output_dir, gpkg_filename)
-    
-    start_time = time.time()
-    write_geopackage(gpkg_path, test_data, srs, geom_type)
-    gpkg_write_time = time.time() - start_time
-    
-    results['geopackage_write'] = gpkg_write_time
+    for key, label, driver_name, suffix, create_opts in _BENCHMARK_FORMATS:
+        print(f"  测试 {label} 写入性能...")
+        file_path = os.path.join(output_dir, base_name + suffix)
+        
+        writer = write_format_pyogrio if key == _PYOGRIO_FORMAT_KEY else write_format
+        
+        start_time = time.time()
+        writer(driver_name, file_path, test_data, srs, geom_type, create_opts)
+        results[f'{key}_write'] = time.time() - start_time
     
     return results
 
 def test_read_performance(output_dir, geom_test, count):
     """测试读取性能"""
     results = {}
+    base_name = f"{geom_test['name'].lower()}_{count}"
     
-    # 测试 Shapefile 读取
-    print("  测试 Shapefile 读取性能...")
-    shp_filename = f"{geom_test['name'].lower()}_{count}.shp"
-    shp_path = os.path.join(output_dir, shp_filename)
-    
-    start_time = time.time()
-    shp_feature_count = read_file(shp_path)
-    shp_read_time = time.time() - start_time
-    
-    results['shapefile_read'] = shp_read_time
-    results['shapefile_features'] = shp_feature_count
-    
-    # 测试 GeoPackage 读取
-    print("  测试 GeoPackage 读取性能...")
-    gpkg_filename = f"{geom_test['name'].lower()}_{count}.gpkg"
-    gpkg_path = os.path.join(output_dir, gpkg_filename)
-    
-    start_time = time.time()
-    gpkg_feature_count = read_file(gpkg_path)
-    gpkg_read_time = time.time() - start_time
-    
-    results['geopackage_read'] = gpkg_read_time
-    results['geopackage_features'] = gpkg_feature_count
+    for key, label, _, suffix, _ in _BENCHMARK_FORMATS:
+        print(f"  测试 {label} 读取性能...")
+        file_path = os.path.join(output_dir, base_name + suffix)
+        
+        start_time = time.time()
+        feature_count = read_file(file_path)
+        results[f'{key}_read'] = time.time() - start_time
+        results[f'{key}_features'] = feature_count
     
     return results
 
@@ -240,98 +493,174 @@ def test_file_size(output_dir, geom_test, count):
     """测试文件大小"""
     results = {}
     
-    # Shapefile 文件大小（包含所有相关文件）
-    shp_base = os.path.join(output_dir, f"{geom_test['name'].lower()}_{count}")
-    shp_total_size = 0
-    
-    for ext in ['.shp', '.shx', '.dbf', '.prj', '.cpg']:
-        file_path = shp_base + ext
-        if os.path.exists(file_path):
-            shp_total_size += os.path.getsize(file_path)
-    
-    results['shapefile_size'] = shp_total_size
+    # 一次 scandir 收集该测试的所有文件大小，避免每个扩展名 exists + getsize 两次系统调用
+    base_name = f"{geom_test['name'].lower()}_{count}"
+    sizes = {entry.name: entry.stat().st_size for entry in os.scandir(output_dir)
+             if entry.name.startswith(base_name + ".")}
     
-    # GeoPackage 文件大小
-    gpkg_path = os.path.join(output_dir, f"{geom_test['name'].lower()}_{count}.gpkg")
-    gpkg_size = os.path.getsize(gpkg_path) if os.path.exists(gpkg_path) else 0
-    
-    results['geopackage_size'] = gpkg_size
+    for key, _, driver_name, suffix, _ in _BENCHMARK_FORMATS:
+        if driver_name == "ESRI Shapefile":
+            # Shapefile 文件大小（包含所有相关文件）
+            results[f'{key}_size'] = sum(sizes.get(base_name + ext, 0)
+                                         for ext in ['.shp', '.shx', '.dbf', '.prj', '.cpg'])
+        else:
+            results[f'{key}_size'] = sizes.get(base_name + suffix, 0)
     
     return results
 
-def write_shapefile(file_path, test_data, srs, geom_type):
-    """写入Shapefile"""
-    # 删除现有文件
-    base_name = os.path.splitext(file_path)[0]
-    for ext in ['.shp', '.shx', '.dbf', '.prj', '.cpg']:
-        related_file = base_name + ext
-        if os.path.exists(related_file):
-            os.remove(related_file)
-    
-    # 创建驱动和数据源
-    driver = ogr.GetDriverByName("ESRI Shapefile")
-    datasource = driver.CreateDataSource(file_path)
-    
-    # 创建图层
-    layer = datasource.CreateLayer("layer", srs, geom_type)
+def test_parquet_size(output_dir, geom_test, test_data, count):
+    """把测试数据写为ZSTD压缩的GeoParquet并返回文件大小，Parquet驱动不可用或写入失败时返回None
     
-    # 添加字段
-    create_fields(layer)
+    驱动检查和写入都通过osgeo (write_format) 进行，与其他格式使用同一个GDAL库。
+    """
+    if ogr.GetDriverByName("Parquet") is None:
+        return None
     
-    # 添加要素
-    for geom, attributes in test_data:
-        feature_defn = layer.GetLayerDefn()
-        feature = ogr.Feature(feature_defn)
-        
-        # 设置属性
-        for field_name, value in attributes.items():
-            feature.SetField(field_name, value)
-        
-        # 设置几何
-        feature.SetGeometry(geom)
-        
-        # 创建要素
-        layer.CreateFeature(feature)
-        feature = None
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(4326)
+    geom_type = ogr.wkbPoint if geom_test['name'] == 'Point' else ogr.wkbPolygon
     
-    # 关闭数据源
-    datasource = None
+    file_path = os.path.join(output_dir, f"{geom_test['name'].lower()}_{count}.parquet")
+    try:
+        write_format("Parquet", file_path, test_data, srs, geom_type, _PARQUET_CREATION_OPTIONS)
+        return os.stat(file_path).st_size
+    except (RuntimeError, OSError) as e:
+        print(f"  ⚠️ Parquet写入失败，跳过压缩大小测试: {e}")
+        return None
 
-def write_geopackage(file_path, test_data, srs, geom_type):
-    """写入GeoPackage"""
-    # 删除现有文件
-    if os.path.exists(file_path):
-        os.remove(file_path)
-    
-    # 创建驱动和数据源
-    driver = ogr.GetDriverByName("GPKG")
-    datasource = driver.CreateDataSource(file_path)
+def write_format(driver_name, file_path, test_data, srs, geom_type, create_opts):
+    """用指定驱动写入测试数据，create_opts 为图层创建选项
     
-    # 创建图层
-    layer = datasource.CreateLayer("layer", srs, geom_type)
+    GPKG 以 SPATIAL_INDEX=NO 创建时，批量写入完成后再一次性构建空间索引，避免逐行更新R树。
+    """
+    remove_existing(driver_name, file_path)
     
-    # 添加字段
-    create_fields(layer)
+    previous_options = {}
+    if driver_name == "GPKG":
+        previous_options = {key: gdal.GetConfigOption(key) for key in _GPKG_WRITE_OPTIONS}
+        for key, value in _GPKG_WRITE_OPTIONS.items():
+            gdal.SetConfigOption(key, value)
     
-    # 添加要素
-    for geom, attributes in test_data:
-        feature_defn = layer.GetLayerDefn()
-        feature = ogr.Feature(feature_defn)
+    try:
+        # 创建驱动和数据源
+        driver = ogr.GetDriverByName(driver_name)
+        datasource = driver.CreateDataSource(file_path)
+        
+        # 创建图层
+        layer = datasource.CreateLayer("layer", srs, geom_type, options=create_opts)
         
-        # 设置属性
-        for field_name, value in attributes.items():
-            feature.SetField(field_name, value)
+        # 添加字段
+        create_fields(layer)
         
-        # 设置几何
-        feature.SetGeometry(geom)
+        # 添加要素
+        write_features(layer, test_data)
         
-        # 创建要素
-        layer.CreateFeature(feature)
-        feature = None
+        # 关闭数据源
+        datasource = None
+        
+        if driver_name == "GPKG" and "SPATIAL_INDEX=NO" in create_opts:
+            create_gpkg_spatial_index(file_path)
+    finally:
+        # 恢复原有配置
+        for key, value in previous_options.items():
+            gdal.SetConfigOption(key, value)
+
+def write_format_pyogrio(driver_name, file_path, test_data, srs, geom_type, create_opts):
+    """用pyogrio (其自带的GDAL库) 写入测试数据，参数与 write_format 相同"""
+    remove_existing(driver_name, file_path)
+    write_features_pyogrio(file_path, driver_name, test_data, srs, geom_type, create_opts)
+
+def remove_existing(driver_name, file_path):
+    """删除上一次测试留下的文件 (Shapefile包括各附属文件)"""
+    base_name, ext = os.path.splitext(file_path)
+    extensions = ['.shp', '.shx', '.dbf', '.prj', '.cpg'] if driver_name == "ESRI Shapefile" else [ext]
+    for related_ext in extensions:
+        try:
+            os.remove(base_name + related_ext)
+        except FileNotFoundError:
+            pass
+
+def create_gpkg_spatial_index(file_path):
+    """为不带索引写入的GeoPackage图层一次性构建空间索引"""
+    datasource = ogr.Open(file_path, 1)
+    layer = datasource.GetLayer(0)
+    
+    result_set = datasource.ExecuteSQL(
+        f"SELECT CreateSpatialIndex('{layer.GetName()}', '{layer.GetGeometryColumn()}')")
+    if result_set is not None:
+        datasource.ReleaseResultSet(result_set)
     
-    # 关闭数据源
     datasource = None
 
+def write_features_pyogrio(file_path, driver_name, test_data, srs, geom_type, create_opts=()):
+    """通过pyogrio按列一次写入全部测试数据
+    
+    几何体和各属性列整理为数组后由GDAL批量写入 (支持事务的格式自动在事务中写入)，
+    Python侧不再逐要素调用OGR。
+    """
+    geometry = np.fromiter(test_data.iter_wkb(), dtype=object, count=len(test_data))
+    field_data = [np.asarray(getattr(test_data, column), dtype=dtype)
+                  for _, column, dtype in _FIELD_COLUMNS]
+    
+    pyogrio.raw.write(file_path, geometry, field_data, [name for name, _, _ in _FIELD_COLUMNS],
+                      layer="layer", driver=driver_name,
+                      geometry_type=ogr.GeometryTypeToName(geom_type),
+                      crs=srs.ExportToWkt(),
+                      layer_options=dict(option.split('=', 1) for option in create_opts))
+
+def write_features(layer, test_data):
+    """在一个事务内把测试数据写入图层
+    
+    GPKG把所有要素合并为一次SQLite提交；Shapefile图层不支持事务，
+    StartTransaction/CommitTransaction为空操作。
+    """
+    # 图层定义和字段索引在循环外获取一次，循环内按索引调用类型化的设置方法
+    feature_defn = layer.GetLayerDefn()
+    id_index = feature_defn.GetFieldIndex('id')
+    name_index = feature_defn.GetFieldIndex('name')
+    category_index = feature_defn.GetFieldIndex('category')
+    value_index = feature_defn.GetFieldIndex('value')
+    population_index = feature_defn.GetFieldIndex('population')
+    desc_index = feature_defn.GetFieldIndex('desc')
+    
+    # 要素对象只创建一次 (CreateFeature会复制要素内容)，每条记录重置FID后覆盖字段和几何
+    feature = ogr.Feature(feature_defn)
+    
+    # 循环内调用的绑定方法预先取出为局部变量，避免每个要素重复查找属性
+    set_fid = feature.SetFID
+    set_integer = feature.SetFieldInteger64
+    set_string = feature.SetFieldString
+    set_double = feature.SetFieldDouble
+    set_geometry = feature.SetGeometryDirectly
+    geometry_from_wkb = ogr.CreateGeometryFromWkb
+    create_feature = layer.CreateFeature
+    
+    layer.StartTransaction()
+    try:
+        for feature_id, name, category, value, population, desc, wkb in zip(
+                test_data.ids, test_data.names, test_data.categories, test_data.values,
+                test_data.populations, test_data.descs, test_data.iter_wkb()):
+            set_fid(-1)
+            
+            # 设置属性
+            set_integer(id_index, feature_id)
+            set_string(name_index, name)
+            set_string(category_index, category)
+            set_double(value_index, value)
+            set_integer(population_index, population)
+            set_string(desc_index, desc)
+            
+            # 设置几何 (由WKB构建，要素直接接管几何体，不再复制)
+            set_geometry(geometry_from_wkb(wkb))
+            
+            # 创建要素
+            create_feature(feature)
+        
+        layer.CommitTransaction()
+    except Exception:
+        layer.RollbackTransaction()
+        raise
+
 def create_fields(layer):
     """创建字段定义"""
     # ID字段
@@ -375,6 +704,15 @@ def read_file(file_path):
     if not layer:
         return 0
     
+    # 只读取name字段和几何，其余字段由驱动跳过解析
+    layer.SetIgnoredFields([name for name, _, _ in _FIELD_COLUMNS if name != 'name'])
+    
+    # 优先通过Arrow批量接口按列读取
+    feature_count = read_layer_arrow(layer)
+    if feature_count is not None:
+        datasource = None
+        return feature_count
+    
     feature_count = 0
     
     # 遍历所有要素（模拟实际使用场景）
@@ -384,12 +722,48 @@ def read_file(file_path):
         _ = feature.GetField("name")
         geom = feature.GetGeometryRef()
         if geom:
-            _ = geom.GetArea() if geom.GetGeometryName() in ['POLYGON', 'MULTIPOLYGON'] else geom.GetX()
+            _ = touch_geometry(geom)
         feature_count += 1
     
     datasource = None
     return feature_count
 
+def read_layer_arrow(layer):
+    """通过Arrow批量接口读取图层 (GDAL >= 3.6，需要NumPy)
+    
+    每批返回数万个要素的列数据，避免逐要素读取要素和属性的SWIG调用。
+    几何体与逐要素读取做同样的访问 (见 touch_geometry)，两条路径的读取时间含义相同。
+    不支持时返回None，由调用方回退到逐要素读取。
+    """
+    if not hasattr(layer, 'GetArrowStreamAsNumPy'):
+        return None
+    
+    # 几何列名为空时 (如Shapefile) Arrow流使用默认列名 wkb_geometry
+    geometry_name = layer.GetGeometryColumn() or 'wkb_geometry'
+    geometry_from_wkb = ogr.CreateGeometryFromWkb
+    
+    try:
+        stream = layer.GetArrowStreamAsNumPy(
+            options=['INCLUDE_FID=NO', 'MAX_FEATURES_IN_BATCH=65536'])
+        
+        feature_count = 0
+        for batch in stream:
+            # 模拟访问属性数据 (按列访问，几何为WKB列)
+            names = batch['name']
+            for wkb in batch[geometry_name]:
+                if wkb is not None:
+                    touch_geometry(geometry_from_wkb(wkb))
+            feature_count += len(names)
+        return feature_count
+        
+    except (ImportError, RuntimeError):
+        layer.ResetReading()
+        return None
+
+def touch_geometry(geom):
+    """模拟访问几何数据：面计算面积，其他 (点) 取X坐标"""
+    return geom.GetArea() if geom.GetGeometryName() in ('POLYGON', 'MULTIPOLYGON') else geom.GetX()
+
 def print_round_results(count, write_results, read_results, size_results):
     """打印单轮测试结果"""
     print(f"\n  结果汇总 ({count:,} 要素):")
@@ -400,8 +774,8 @@ def print_round_results(count, write_results, read_results, size_results):
     write_ratio = shp_write / gpkg_write if gpkg_write > 0 else 0
     
     print(f"    写入时间:")
-    print(f"      Shapefile:   {shp_write:.3f}秒")
-    print(f"      GeoPackage:  {gpkg_write:.3f}秒")
+    for key, label, _, _, _ in _BENCHMARK_FORMATS:
+        print(f"      {label + ':':<13}{write_results[f'{key}_write']:.3f}秒")
     print(f"      性能比:      {write_ratio:.2f}x (Shapefile/GeoPackage)")
     
     # 读取性能
@@ -410,8 +784,8 @@ def print_round_results(count, write_results, read_results, size_results):
     read_ratio = shp_read / gpkg_read if gpkg_read > 0 else 0
     
     print(f"    读取时间:")
-    print(f"      Shapefile:   {shp_read:.3f}秒")
-    print(f"      GeoPackage:  {gpkg_read:.3f}秒")
+    for key, label, _, _, _ in _BENCHMARK_FORMATS:
+        print(f"      {label + ':':<13}{read_results[f'{key}_read']:.3f}秒")
     print(f"      性能比:      {read_ratio:.2f}x (Shapefile/GeoPackage)")
     
     # 文件大小
@@ -420,8 +794,10 @@ def print_round_results(count, write_results, read_results, size_results):
     size_ratio = shp_size / gpkg_size if gpkg_size > 0 else 0
     
     print(f"    文件大小:")
-    print(f"      Shapefile:   {format_file_size(shp_size)}")
-    print(f"      GeoPackage:  {format_file_size(gpkg_size)}")
+    for key, label, _, _, _ in _BENCHMARK_FORMATS:
+        print(f"      {label + ':':<13}{format_file_size(size_results[f'{key}_size'])}")
+    if size_results.get('parquet_size') is not None:
+        print(f"      {'Parquet(ZSTD):':<13}{format_file_size(size_results['parquet_size'])}")
     print(f"      大小比:      {size_ratio:.2f}x (Shapefile/GeoPackage)")
 
 def format_file_size(size_bytes):
@@ -436,44 +812,60 @@ def format_file_size(size_bytes):
         return f"{size_bytes / (1024 * 1024 * 1024):.1f} GB"
 
 def generate_performance_report(results, output_dir):
-    """生成性能测试报告"""
+    """生成性能测试报告 (整篇报告拼成字符串后一次写入)"""
     report_path = os.path.join(output_dir, "performance_report.md")
+    labels = [label for _, label, _, _, _ in _BENCHMARK_FORMATS]
     
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write("# Shapefile vs GeoPackage 性能对比报告\n\n")
-        f.write(f"测试时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"GDAL版本: {gdal.VersionInfo('RELEASE_NAME')}\n\n")
+    lines = [
+        "# Shapefile vs GeoPackage 性能对比报告",
+        "",
+        f"测试时间: {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"GDAL版本: {gdal.VersionInfo('RELEASE_NAME')}",
+    ]
+    if HAS_PYOGRIO:
+        lines.append(f"pyogrio自带GDAL版本: {pyogrio.__gdal_version_string__} (仅用于 GPKG(pyogrio) 一列)")
+    lines.append("")
+    
+    for geom_type, geom_results in results.items():
+        lines.append(f"## {geom_type} 几何类型测试结果")
+        lines.append("")
         
-        for geom_type, geom_results in results.items():
-            f.write(f"## {geom_type} 几何类型测试结果\n\n")
-            
-            # 创建表格
-            f.write("| 要素数量 | 写入时间(秒) |  | 读取时间(秒) |  | 文件大小 |  |\n")
-            f.write("|---------|-------------|--|-------------|--|----------|--|\n")
-            f.write("|         | Shapefile | GeoPackage | Shapefile | GeoPackage | Shapefile | GeoPackage |\n")
-            
-            for count, data in geom_results.items():
-                write_data = data['write']
-                read_data = data['read']
-                size_data = data['size']
-                
-                f.write(f"| {count:,} |")
-                f.write(f" {write_data['shapefile_write']:.3f} |")
-                f.write(f" {write_data['geopackage_write']:.3f} |")
-                f.write(f" {read_data['shapefile_read']:.3f} |")
-                f.write(f" {read_data['geopackage_read']:.3f} |")
-                f.write(f" {format_file_size(size_data['shapefile_size'])} |")
-                f.write(f" {format_file_size(size_data['geopackage_size'])} |\n")
+        # 创建表格
+        lines.append("| 要素数量 |" + " 写入时间(秒) |" + "  |" * (len(labels) - 1)
+                     + " 读取时间(秒) |" + "  |" * (len(labels) - 1)
+                     + " 文件大小 |" + "  |" * len(labels))
+        lines.append("|---------|" + "---|" * (3 * len(labels) + 1))
+        lines.append("|         | " + " | ".join(labels * 3) + " | Parquet(ZSTD) |")
+        
+        for count, data in geom_results.items():
+            write_data = data['write']
+            read_data = data['read']
+            size_data = data['size']
             
-            f.write("\n")
-        
-        # 添加总结
-        f.write("## 总结\n\n")
-        f.write("### 性能特点\n\n")
-        f.write("1. **写入性能**: \n")
-        f.write("2. **读取性能**: \n") 
-        f.write("3. **文件大小**: \n")
-        f.write("4. **适用场景**: \n\n")
+            cells = ([f"{write_data[f'{key}_write']:.3f}" for key, _, _, _, _ in _BENCHMARK_FORMATS]
+                     + [f"{read_data[f'{key}_read']:.3f}" for key, _, _, _, _ in _BENCHMARK_FORMATS]
+                     + [format_file_size(size_data[f'{key}_size']) for key, _, _, _, _ in _BENCHMARK_FORMATS]
+                     + [format_file_size(size_data['parquet_size'])
+                        if size_data.get('parquet_size') is not None else "-"])
+            lines.append(f"| {count:,} | " + " | ".join(cells) + " |")
+        
+        lines.append("")
+    
+    # 添加总结
+    lines.extend([
+        "## 总结",
+        "",
+        "### 性能特点",
+        "",
+        "1. **写入性能**: ",
+        "2. **读取性能**: ",
+        "3. **文件大小**: ",
+        "4. **适用场景**: ",
+        "",
+    ])
+    
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
     
     print(f"\n性能测试报告已生成: {report_path}")
 
@@ -8,6 +8,8 @@ import os
 import sys
 import time
 import random
+import ctypes
+from collections import namedtuple
 from osgeo import gdal, ogr, osr
 
 # 明确启用异常处理，避免GDAL 4.0兼容性警告
@@ -15,6 +17,50 @@ gdal.UseExceptions()
 ogr.UseExceptions()
 osr.UseExceptions()
 
+# GeoPackage写入时的SQLite配置：加大页缓存(MB)，日志放在内存中，不等待每次落盘。
+# 不使用WAL：journal_mode=WAL会持久记录在文件头中，只读打开时还需要-shm文件，
+# GeoPackage规范不建议这样分发；单写入者的基准测试中内存日志加synchronous=OFF也更快
+_GPKG_WRITE_OPTIONS = {
+    'OGR_SQLITE_CACHE': '256',
+    'OGR_SQLITE_JOURNAL': 'MEMORY',
+    'OGR_SQLITE_SYNCHRONOUS': 'OFF',
+}
+
+# 测试点的属性记录，用namedtuple代替每个要素一个字典
+Attrs = namedtuple('Attrs', 'id name category value')
+
+def load_ogr_c_api():
+    """通过ctypes加载OGR C API，不可用时返回None
+    
+    直接打开osgeo的扩展模块，由动态链接器在其依赖中解析符号，
+    保证与osgeo使用同一个GDAL库 (Windows的.pyd不导出这些符号，会回退)。
+    """
+    try:
+        from osgeo import _ogr
+        lib = ctypes.CDLL(_ogr.__file__)
+        
+        lib.OGR_L_ResetReading.argtypes = [ctypes.c_void_p]
+        lib.OGR_L_ResetReading.restype = None
+        lib.OGR_L_GetNextFeature.argtypes = [ctypes.c_void_p]
+        lib.OGR_L_GetNextFeature.restype = ctypes.c_void_p
+        lib.OGR_F_GetFieldAsString.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.OGR_F_GetFieldAsString.restype = ctypes.c_char_p
+        lib.OGR_F_GetFieldAsDouble.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.OGR_F_GetFieldAsDouble.restype = ctypes.c_double
+        lib.OGR_F_GetGeometryRef.argtypes = [ctypes.c_void_p]
+        lib.OGR_F_GetGeometryRef.restype = ctypes.c_void_p
+        lib.OGR_G_GetX.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.OGR_G_GetX.restype = ctypes.c_double
+        lib.OGR_G_GetY.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.OGR_G_GetY.restype = ctypes.c_double
+        lib.OGR_F_Destroy.argtypes = [ctypes.c_void_p]
+        lib.OGR_F_Destroy.restype = None
+        return lib
+    except (ImportError, OSError, AttributeError):
+        return None
+
+_OGR_C_API = load_ogr_c_api()
+
 def quick_performance_test():
     """快速性能对比测试"""
     print("Shapefile vs GeoPackage 快速性能测试")
@@ -69,12 +115,12 @@ def generate_points(count):
         point.AddPoint(lon, lat)
         
         # 简化的属性数据
-        attributes = {
-            'id': i + 1,
-            'name': f'Point_{i+1}',
-            'category': random.choice(['A', 'B', 'C']),
-            'value': round(random.uniform(0, 1000), 2)
-        }
+        attributes = Attrs(
+            id=i + 1,
+            name=f'Point_{i+1}',
+            category=random.choice(['A', 'B', 'C']),
+            value=round(random.uniform(0, 1000), 2)
+        )
         
         test_data.append((point, attributes))
     
@@ -97,9 +143,11 @@ def test_formats(output_dir, test_data, size):
     shp_write_time = time.time() - start_time
     
     start_time = time.time()
-    shp_count = read_file_simple(shp_path)
+    read_file_simple(shp_path)
     shp_read_time = time.time() - start_time
     
+    shp_count = count_file(shp_path)
+    
     shp_size = get_shapefile_size(shp_path)
     
     # 测试 GeoPackage
@@ -111,10 +159,15 @@ def test_formats(output_dir, test_data, size):
     gpkg_write_time = time.time() - start_time
     
     start_time = time.time()
-    gpkg_count = read_file_simple(gpkg_path)
+    read_file_simple(gpkg_path)
     gpkg_read_time = time.time() - start_time
     
-    gpkg_size = os.path.getsize(gpkg_path) if os.path.exists(gpkg_path) else 0
+    gpkg_count = count_file(gpkg_path)
+    
+    try:
+        gpkg_size = os.stat(gpkg_path).st_size
+    except FileNotFoundError:
+        gpkg_size = 0
     
     results = {
         'shapefile': {
@@ -138,9 +191,10 @@ def write_shapefile_simple(file_path, test_data, srs):
     # 删除现有文件
     base_name = os.path.splitext(file_path)[0]
     for ext in ['.shp', '.shx', '.dbf', '.prj']:
-        related_file = base_name + ext
-        if os.path.exists(related_file):
-            os.remove(related_file)
+        try:
+            os.remove(base_name + ext)
+        except FileNotFoundError:
+            pass
     
     # 创建驱动和数据源
     driver = ogr.GetDriverByName("ESRI Shapefile")
@@ -164,61 +218,107 @@ def write_shapefile_simple(file_path, test_data, srs):
     layer.CreateField(val_field)
     
     # 添加要素
-    for geom, attributes in test_data:
-        feature = ogr.Feature(layer.GetLayerDefn())
-        
-        feature.SetField("id", attributes['id'])
-        feature.SetField("name", attributes['name'])
-        feature.SetField("category", attributes['category'])
-        feature.SetField("value", attributes['value'])
-        feature.SetGeometry(geom)
-        
-        layer.CreateFeature(feature)
-        feature = None
+    write_points_simple(layer, test_data)
     
     datasource = None
 
 def write_geopackage_simple(file_path, test_data, srs):
     """写入GeoPackage（简化版）"""
     # 删除现有文件
-    if os.path.exists(file_path):
+    try:
         os.remove(file_path)
+    except FileNotFoundError:
+        pass
     
-    # 创建驱动和数据源
-    driver = ogr.GetDriverByName("GPKG")
-    datasource = driver.CreateDataSource(file_path)
-    layer = datasource.CreateLayer("points", srs, ogr.wkbPoint)
-    
-    # 添加字段
-    id_field = ogr.FieldDefn("id", ogr.OFTInteger)
-    layer.CreateField(id_field)
-    
-    name_field = ogr.FieldDefn("name", ogr.OFTString)
-    name_field.SetWidth(20)
-    layer.CreateField(name_field)
-    
-    cat_field = ogr.FieldDefn("category", ogr.OFTString)
-    cat_field.SetWidth(10)
-    layer.CreateField(cat_field)
-    
-    val_field = ogr.FieldDefn("value", ogr.OFTReal)
-    val_field.SetPrecision(2)
-    layer.CreateField(val_field)
+    previous_options = {key: gdal.GetConfigOption(key) for key in _GPKG_WRITE_OPTIONS}
+    for key, value in _GPKG_WRITE_OPTIONS.items():
+        gdal.SetConfigOption(key, value)
     
-    # 添加要素
-    for geom, attributes in test_data:
-        feature = ogr.Feature(layer.GetLayerDefn())
+    try:
+        # 创建驱动和数据源
+        driver = ogr.GetDriverByName("GPKG")
+        datasource = driver.CreateDataSource(file_path)
+        # 空间索引在批量插入完成后一次性构建，避免逐行更新R树
+        layer = datasource.CreateLayer("points", srs, ogr.wkbPoint, options=["SPATIAL_INDEX=NO"])
+        
+        # 添加字段
+        id_field = ogr.FieldDefn("id", ogr.OFTInteger)
+        layer.CreateField(id_field)
+        
+        name_field = ogr.FieldDefn("name", ogr.OFTString)
+        name_field.SetWidth(20)
+        layer.CreateField(name_field)
+        
+        cat_field = ogr.FieldDefn("category", ogr.OFTString)
+        cat_field.SetWidth(10)
+        layer.CreateField(cat_field)
         
-        feature.SetField("id", attributes['id'])
-        feature.SetField("name", attributes['name'])
-        feature.SetField("category", attributes['category'])
-        feature.SetField("value", attributes['value'])
-        feature.SetGeometry(geom)
+        val_field = ogr.FieldDefn("value", ogr.OFTReal)
+        val_field.SetPrecision(2)
+        layer.CreateField(val_field)
         
-        layer.CreateFeature(feature)
-        feature = None
+        # 添加要素
+        write_points_simple(layer, test_data)
+        
+        # 构建空间索引
+        result_set = datasource.ExecuteSQL(
+            f"SELECT CreateSpatialIndex('{layer.GetName()}', '{layer.GetGeometryColumn()}')")
+        if result_set is not None:
+            datasource.ReleaseResultSet(result_set)
+        
+        datasource = None
+    finally:
+        # 恢复原有配置
+        for key, value in previous_options.items():
+            gdal.SetConfigOption(key, value)
+
+def write_points_simple(layer, test_data):
+    """在一个事务内把测试点写入图层 (Shapefile图层的事务调用为空操作)"""
+    # 图层定义和字段索引在循环外获取一次，循环内按索引调用类型化的设置方法
+    feature_defn = layer.GetLayerDefn()
+    id_index = feature_defn.GetFieldIndex("id")
+    name_index = feature_defn.GetFieldIndex("name")
+    category_index = feature_defn.GetFieldIndex("category")
+    value_index = feature_defn.GetFieldIndex("value")
+    
+    # 要素对象只创建一次 (CreateFeature会复制要素内容)，每条记录重置FID后覆盖字段和几何
+    feature = ogr.Feature(feature_defn)
+    
+    layer.StartTransaction()
+    try:
+        for geom, attributes in test_data:
+            feature.SetFID(-1)
+            
+            feature.SetFieldInteger64(id_index, attributes.id)
+            feature.SetFieldString(name_index, attributes.name)
+            feature.SetFieldString(category_index, attributes.category)
+            feature.SetFieldDouble(value_index, attributes.value)
+            feature.SetGeometry(geom)
+            
+            layer.CreateFeature(feature)
+        
+        layer.CommitTransaction()
+    except Exception:
+        layer.RollbackTransaction()
+        raise
+
+def count_file(file_path):
+    """返回文件要素数量（用于验证，不遍历要素）"""
+    if not os.path.exists(file_path):
+        return 0
+    
+    datasource = ogr.Open(file_path, 0)
+    if not datasource:
+        return 0
     
+    layer = datasource.GetLayer(0)
+    if not layer:
+        return 0
+    
+    # Shapefile 由 SHX 记录数、GeoPackage 由 gpkg_ogr_contents 直接得到数量
+    feature_count = layer.GetFeatureCount(1)
     datasource = None
+    return feature_count
 
 def read_file_simple(file_path):
     """读取文件并返回要素数量"""
@@ -233,6 +333,16 @@ def read_file_simple(file_path):
     if not layer:
         return 0
     
+    feature_defn = layer.GetLayerDefn()
+    name_index = feature_defn.GetFieldIndex("name")
+    value_index = feature_defn.GetFieldIndex("value")
+    
+    # 优先直接调用OGR C API遍历，绕过SWIG包装的要素和几何对象
+    if _OGR_C_API is not None:
+        feature_count = read_layer_c_api(layer, name_index, value_index)
+        datasource = None
+        return feature_count
+    
     feature_count = 0
     layer.ResetReading()
     
@@ -250,15 +360,39 @@ def read_file_simple(file_path):
     datasource = None
     return feature_count
 
+def read_layer_c_api(layer, name_index, value_index):
+    """通过OGR C API遍历图层并模拟数据访问，返回要素数量"""
+    lib = _OGR_C_API
+    layer_handle = int(layer.this)
+    
+    feature_count = 0
+    lib.OGR_L_ResetReading(layer_handle)
+    
+    feature = lib.OGR_L_GetNextFeature(layer_handle)
+    while feature:
+        # 模拟数据访问
+        _ = lib.OGR_F_GetFieldAsString(feature, name_index)
+        _ = lib.OGR_F_GetFieldAsDouble(feature, value_index)
+        geom = lib.OGR_F_GetGeometryRef(feature)
+        if geom:
+            _ = lib.OGR_G_GetX(geom, 0)
+            _ = lib.OGR_G_GetY(geom, 0)
+        lib.OGR_F_Destroy(feature)
+        feature_count += 1
+        feature = lib.OGR_L_GetNextFeature(layer_handle)
+    
+    return feature_count
+
 def get_shapefile_size(shp_path):
     """获取Shapefile总大小"""
     base_name = os.path.splitext(shp_path)[0]
     total_size = 0
     
     for ext in ['.shp', '.shx', '.dbf', '.prj']:
-        file_path = base_name + ext
-        if os.path.exists(file_path):
-            total_size += os.path.getsize(file_path)
+        try:
+            total_size += os.stat(base_name + ext).st_size
+        except FileNotFoundError:
+            pass
     
     return total_size
 
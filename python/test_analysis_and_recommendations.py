@@ -4,212 +4,211 @@ GDAL大规模线要素性能测试：问题分析和改进建议
 针对1万到100万线要素的测试方案评估
 """
 
+import io
 import platform
 import sys
+import types
+
+# 分析报告中的静态内容，在模块加载时构建一次
+
+_LIMITATIONS = (
+    "单平台测试 - 仅在macOS上测试，不能代表所有部署环境",
+    "硬件依赖 - 结果强烈依赖于特定的SSD/内存/CPU配置", 
+    "Python GIL限制 - 无法测试真正的多线程GDAL性能",
+    "内存瓶颈 - 100万×100点的数据可能导致内存不足",
+    "磁盘I/O瓶颈 - 可能测试的是存储性能而非GDAL性能",
+    "缺乏并发测试 - 实际应用中往往需要并发读写",
+    "测试数据单一 - 只测试规则线要素，缺乏复杂几何形状",
+    "缺乏长期测试 - 没有测试长时间运行的稳定性"
+)
+
+_PLATFORM_USAGE = types.MappingProxyType({
+    "桌面GIS开发": (("Windows", "75%"), ("macOS", "20%"), ("Linux", "5%")),
+    "GIS服务器部署": (("Linux", "80%"), ("Windows", "15%"), ("macOS", "5%")), 
+    "云GIS服务": (("Linux", "90%"), ("Windows", "8%"), ("macOS", "2%")),
+    "HPC地理计算": (("Linux", "95%"), ("Windows", "3%"), ("macOS", "2%"))
+})
+
+_TEST_MATRIX = (
+    ("macOS", "开发环境", "SSD + 统一内存", "适合原型和开发测试"),
+    ("Linux", "服务器环境", "多核 + 大内存", "生产部署性能基准"),
+    ("Windows", "桌面环境", "企业硬件", "最终用户体验测试"),
+    ("容器环境", "云部署", "标准化配置", "可重复性和一致性测试")
+)
+
+_TEST_LAYERS = (
+    types.MappingProxyType({
+        "层级": "快速验证层",
+        "数据量": "1万-10万要素",
+        "目的": "功能验证和基础性能基线",
+        "平台": "所有平台",
+        "时间": "15分钟内"
+    }),
+    types.MappingProxyType({
+        "层级": "压力测试层", 
+        "数据量": "10万-50万要素",
+        "目的": "内存和I/O压力测试",
+        "平台": "Linux服务器",
+        "时间": "1-2小时"
+    }),
+    types.MappingProxyType({
+        "层级": "极限测试层",
+        "数据量": "50万-100万要素",
+        "目的": "系统极限和优化验证",
+        "平台": "高性能Linux",
+        "时间": "4-8小时"
+    })
+)
+
+_DATA_VARIATIONS = (
+    "复杂度变化：简单线(2点) → 普通线(100点) → 复杂线(1000点)",
+    "几何类型：直线、曲线、闭合线、多部分线",
+    "属性复杂度：少字段简单属性 → 多字段复杂属性 → 大文本字段",
+    "空间分布：密集分布 → 稀疏分布 → 聚类分布",
+    "坐标系统：地理坐标(WGS84) → 投影坐标 → 自定义坐标系"
+)
+
+_TECHNICAL_IMPROVEMENTS = (
+    ("Python GIL限制", (
+        "使用多进程而非多线程",
+        "实现C++版本的性能测试",
+        "使用异步I/O (asyncio)",
+        "考虑使用PyPy提升性能"
+    )),
+    ("内存限制", (
+        "实现流式处理（分批读写）",
+        "使用内存映射文件",
+        "实现数据压缩",
+        "添加内存使用监控"
+    )),
+    ("I/O瓶颈", (
+        "测试不同存储类型（RAM盘、SSD、HDD、网络存储）",
+        "优化事务批处理大小",
+        "实现异步I/O操作",
+        "测试不同文件系统的性能"
+    )),
+    ("测试可重复性", (
+        "使用Docker容器化测试环境",
+        "标准化硬件配置",
+        "固定随机种子",
+        "详细记录环境信息"
+    ))
+)
+
+_PRIORITIES = (
+    ("高优先级", (
+        "在Linux服务器上重复当前测试",
+        "实现分层测试策略（快速→压力→极限）",
+        "添加内存和I/O监控",
+        "实现流式处理以处理大数据集"
+    )),
+    ("中优先级", (
+        "在Windows环境测试桌面场景",
+        "实现多进程并行测试",
+        "添加不同几何复杂度的测试",
+        "建立标准测试数据集"
+    )),
+    ("低优先级", (
+        "容器化测试环境",
+        "C++版本性能测试",
+        "云环境性能测试",
+        "长期稳定性测试"
+    ))
+)
+
+_CONCLUSIONS = (
+    "✓ 当前方案适合macOS开发环境的功能验证",
+    "⚠ 需要在Linux服务器环境建立性能基线",
+    "⚠ 需要实现分层测试以应对不同数据规模",
+    "⚠ 需要优化内存使用以支持百万级要素测试",
+    "⚠ 需要跨平台测试以确保结果的普适性"
+)
 
 def analyze_current_test_limitations():
-    """分析当前测试方案的局限性"""
-    
-    print("GDAL大规模线要素性能测试分析")
-    print("=" * 60)
-    print("测试需求：1万-100万线要素，每个要素100个点，步长10万")
-    print("=" * 60)
+    """分析当前测试方案的局限性 (输出先写入缓冲区，结束时一次写到标准输出)"""
+    out = io.StringIO()
+    try:
+        _write_limitations_analysis(out)
+    finally:
+        sys.stdout.write(out.getvalue())
+
+def _write_limitations_analysis(out):
+    """把分析内容写入 out"""
+    print("GDAL大规模线要素性能测试分析", file=out)
+    print("=" * 60, file=out)
+    print("测试需求：1万-100万线要素，每个要素100个点，步长10万", file=out)
+    print("=" * 60, file=out)
     
     # 当前平台信息
     current_os = platform.system()
     if current_os == "Darwin":
         current_os = "macOS"
     
-    print(f"\n当前测试环境: {current_os} {platform.machine()}")
-    
-    print(f"\n1. 当前测试方案的局限性:")
-    print("=" * 40)
-    
-    limitations = [
-        "单平台测试 - 仅在macOS上测试，不能代表所有部署环境",
-        "硬件依赖 - 结果强烈依赖于特定的SSD/内存/CPU配置", 
-        "Python GIL限制 - 无法测试真正的多线程GDAL性能",
-        "内存瓶颈 - 100万×100点的数据可能导致内存不足",
-        "磁盘I/O瓶颈 - 可能测试的是存储性能而非GDAL性能",
-        "缺乏并发测试 - 实际应用中往往需要并发读写",
-        "测试数据单一 - 只测试规则线要素，缺乏复杂几何形状",
-        "缺乏长期测试 - 没有测试长时间运行的稳定性"
-    ]
-    
-    for i, limitation in enumerate(limitations, 1):
-        print(f"  {i}. {limitation}")
-    
-    print(f"\n2. 跨平台代表性分析:")
-    print("=" * 40)
-    
-    platform_usage = {
-        "桌面GIS开发": {"Windows": "75%", "macOS": "20%", "Linux": "5%"},
-        "GIS服务器部署": {"Linux": "80%", "Windows": "15%", "macOS": "5%"}, 
-        "云GIS服务": {"Linux": "90%", "Windows": "8%", "macOS": "2%"},
-        "HPC地理计算": {"Linux": "95%", "Windows": "3%", "macOS": "2%"}
-    }
-    
-    for scenario, platforms in platform_usage.items():
-        print(f"\n  {scenario}:")
-        for platform_name, percentage in platforms.items():
+    print(f"\n当前测试环境: {current_os} {platform.machine()}", file=out)
+    
+    print(f"\n1. 当前测试方案的局限性:", file=out)
+    print("=" * 40, file=out)
+    
+    for i, limitation in enumerate(_LIMITATIONS, 1):
+        print(f"  {i}. {limitation}", file=out)
+    
+    print(f"\n2. 跨平台代表性分析:", file=out)
+    print("=" * 40, file=out)
+    
+    for scenario, platforms in _PLATFORM_USAGE.items():
+        print(f"\n  {scenario}:", file=out)
+        for platform_name, percentage in platforms:
             marker = "✓" if platform_name.lower() == current_os.lower() else " "
-            print(f"    {marker} {platform_name}: {percentage}")
-    
-    print(f"\n3. 测试方案改进建议:")
-    print("=" * 40)
-    
-    print(f"\n  A. 跨平台测试矩阵:")
-    test_matrix = [
-        ("macOS", "开发环境", "SSD + 统一内存", "适合原型和开发测试"),
-        ("Linux", "服务器环境", "多核 + 大内存", "生产部署性能基准"),
-        ("Windows", "桌面环境", "企业硬件", "最终用户体验测试"),
-        ("容器环境", "云部署", "标准化配置", "可重复性和一致性测试")
-    ]
-    
-    for platform_type, env_type, hw_config, purpose in test_matrix:
-        print(f"    • {platform_type:12} | {env_type:8} | {hw_config:15} | {purpose}")
-    
-    print(f"\n  B. 分层测试策略:")
-    
-    test_layers = [
-        {
-            "层级": "快速验证层",
-            "数据量": "1万-10万要素",
-            "目的": "功能验证和基础性能基线",
-            "平台": "所有平台",
-            "时间": "15分钟内"
-        },
-        {
-            "层级": "压力测试层", 
-            "数据量": "10万-50万要素",
-            "目的": "内存和I/O压力测试",
-            "平台": "Linux服务器",
-            "时间": "1-2小时"
-        },
-        {
-            "层级": "极限测试层",
-            "数据量": "50万-100万要素",
-            "目的": "系统极限和优化验证",
-            "平台": "高性能Linux",
-            "时间": "4-8小时"
-        }
-    ]
-    
-    for layer in test_layers:
-        print(f"\n    {layer['层级']}:")
-        print(f"      数据量: {layer['数据量']}")
-        print(f"      目的: {layer['目的']}")
-        print(f"      推荐平台: {layer['平台']}")
-        print(f"      预计时间: {layer['时间']}")
-    
-    print(f"\n  C. 测试数据多样化:")
-    
-    data_variations = [
-        "复杂度变化：简单线(2点) → 普通线(100点) → 复杂线(1000点)",
-        "几何类型：直线、曲线、闭合线、多部分线",
-        "属性复杂度：少字段简单属性 → 多字段复杂属性 → 大文本字段",
-        "空间分布：密集分布 → 稀疏分布 → 聚类分布",
-        "坐标系统：地理坐标(WGS84) → 投影坐标 → 自定义坐标系"
-    ]
-    
-    for variation in data_variations:
-        print(f"    • {variation}")
-    
-    print(f"\n4. 技术改进建议:")
-    print("=" * 40)
-    
-    technical_improvements = [
-        {
-            "问题": "Python GIL限制",
-            "解决方案": [
-                "使用多进程而非多线程",
-                "实现C++版本的性能测试",
-                "使用异步I/O (asyncio)",
-                "考虑使用PyPy提升性能"
-            ]
-        },
-        {
-            "问题": "内存限制",
-            "解决方案": [
-                "实现流式处理（分批读写）",
-                "使用内存映射文件",
-                "实现数据压缩",
-                "添加内存使用监控"
-            ]
-        },
-        {
-            "问题": "I/O瓶颈",
-            "解决方案": [
-                "测试不同存储类型（RAM盘、SSD、HDD、网络存储）",
-                "优化事务批处理大小",
-                "实现异步I/O操作",
-                "测试不同文件系统的性能"
-            ]
-        },
-        {
-            "问题": "测试可重复性",
-            "解决方案": [
-                "使用Docker容器化测试环境",
-                "标准化硬件配置",
-                "固定随机种子",
-                "详细记录环境信息"
-            ]
-        }
-    ]
-    
-    for improvement in technical_improvements:
-        print(f"\n  {improvement['问题']}:")
-        for solution in improvement['解决方案']:
-            print(f"    → {solution}")
-    
-    print(f"\n5. 实施优先级建议:")
-    print("=" * 40)
-    
-    priorities = [
-        ("高优先级", [
-            "在Linux服务器上重复当前测试",
-            "实现分层测试策略（快速→压力→极限）",
-            "添加内存和I/O监控",
-            "实现流式处理以处理大数据集"
-        ]),
-        ("中优先级", [
-            "在Windows环境测试桌面场景",
-            "实现多进程并行测试",
-            "添加不同几何复杂度的测试",
-            "建立标准测试数据集"
-        ]),
-        ("低优先级", [
-            "容器化测试环境",
-            "C++版本性能测试",
-            "云环境性能测试",
-            "长期稳定性测试"
-        ])
-    ]
-    
-    for priority_level, tasks in priorities:
-        print(f"\n  {priority_level}:")
+            print(f"    {marker} {platform_name}: {percentage}", file=out)
+    
+    print(f"\n3. 测试方案改进建议:", file=out)
+    print("=" * 40, file=out)
+    
+    print(f"\n  A. 跨平台测试矩阵:", file=out)
+    for platform_type, env_type, hw_config, purpose in _TEST_MATRIX:
+        print(f"    • {platform_type:12} | {env_type:8} | {hw_config:15} | {purpose}", file=out)
+    
+    print(f"\n  B. 分层测试策略:", file=out)
+    
+    for layer in _TEST_LAYERS:
+        print(f"\n    {layer['层级']}:", file=out)
+        print(f"      数据量: {layer['数据量']}", file=out)
+        print(f"      目的: {layer['目的']}", file=out)
+        print(f"      推荐平台: {layer['平台']}", file=out)
+        print(f"      预计时间: {layer['时间']}", file=out)
+    
+    print(f"\n  C. 测试数据多样化:", file=out)
+    
+    for variation in _DATA_VARIATIONS:
+        print(f"    • {variation}", file=out)
+    
+    print(f"\n4. 技术改进建议:", file=out)
+    print("=" * 40, file=out)
+    
+    for problem, solutions in _TECHNICAL_IMPROVEMENTS:
+        print(f"\n  {problem}:", file=out)
+        for solution in solutions:
+            print(f"    → {solution}", file=out)
+    
+    print(f"\n5. 实施优先级建议:", file=out)
+    print("=" * 40, file=out)
+    
+    for priority_level, tasks in _PRIORITIES:
+        print(f"\n  {priority_level}:", file=out)
         for task in tasks:
-            print(f"    • {task}")
-    
-    print(f"\n6. 结论和建议:")
-    print("=" * 40)
-    
-    conclusions = [
-        "✓ 当前方案适合macOS开发环境的功能验证",
-        "⚠ 需要在Linux服务器环境建立性能基线",
-        "⚠ 需要实现分层测试以应对不同数据规模",
-        "⚠ 需要优化内存使用以支持百万级要素测试",
-        "⚠ 需要跨平台测试以确保结果的普适性"
-    ]
-    
-    for conclusion in conclusions:
-        print(f"  {conclusion}")
-    
-    print(f"\n推荐下一步行动:")
-    print(f"  1. 立即：在Linux环境重复当前测试，建立跨平台对比")
-    print(f"  2. 本周：实现分层测试和内存优化")  
-    print(f"  3. 下周：添加Windows测试和并发场景")
-    print(f"  4. 长期：建立自动化跨平台测试流水线")
+            print(f"    • {task}", file=out)
+    
+    print(f"\n6. 结论和建议:", file=out)
+    print("=" * 40, file=out)
+    
+    for conclusion in _CONCLUSIONS:
+        print(f"  {conclusion}", file=out)
+    
+    print(f"\n推荐下一步行动:", file=out)
+    print(f"  1. 立即：在Linux环境重复当前测试，建立跨平台对比", file=out)
+    print(f"  2. 本周：实现分层测试和内存优化", file=out)
+    print(f"  3. 下周：添加Windows测试和并发场景", file=out)
+    print(f"  4. 长期：建立自动化跨平台测试流水线", file=out)
 
 def main():
     """主函数"""
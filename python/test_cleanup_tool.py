@@ -6,12 +6,37 @@
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # 添加项目根目录到Python路径
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+# 并发创建文件的线程数：同一目录中的创建操作在目录inode上串行，更多线程只会增加竞争
+_CREATE_WORKERS = 8
+
+# 测试文件头的固定部分，预先编码为字节
+_HEADER_PREFIX = b"Test file: "
+_HEADER_SUFFIX = b"\nCreated for cleanup testing\n"
+
+def _make_one(filename, payload_size):
+    """创建一个测试文件，成功返回文件大小，失败返回异常"""
+    # 写入文件头后用 ftruncate 扩展到目标大小，不在内存中构造填充内容
+    header = _HEADER_PREFIX + filename.encode() + _HEADER_SUFFIX
+    target_size = len(header) + payload_size
+    
+    try:
+        fd = os.open(filename, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, header)
+            os.ftruncate(fd, target_size)
+        finally:
+            os.close(fd)
+        return target_size
+    except Exception as e:
+        return e
+
 def create_test_files():
     """创建一些测试文件用于测试清理功能"""
     print("🔧 创建测试文件...")
@@ -28,21 +53,19 @@ def create_test_files():
         "temp_data.tmp"
     ]
     
+    # 各文件大小不同（第i个文件填充 i KB）；open/write/close 会释放GIL，用线程池并发创建
+    payload_sizes = [1024 * (i + 1) for i in range(len(test_files))]
+    with ThreadPoolExecutor(max_workers=_CREATE_WORKERS) as executor:
+        results = list(executor.map(_make_one, test_files, payload_sizes))
+    
     created_files = []
     
-    for filename in test_files:
-        file_path = Path(filename)
-        try:
-            # 创建测试内容
-            content = f"Test file: {filename}\nCreated for cleanup testing\n"
-            content += "A" * (1024 * (len(created_files) + 1))  # 不同大小的文件
-            
-            file_path.write_text(content)
-            created_files.append(file_path)
-            print(f"  ✅ 创建: {filename} ({len(content)} bytes)")
-            
-        except Exception as e:
-            print(f"  ❌ 创建失败: {filename} - {e}")
+    for filename, result in zip(test_files, results):
+        if isinstance(result, Exception):
+            print(f"  ❌ 创建失败: {filename} - {result}")
+        else:
+            created_files.append(Path(filename))
+            print(f"  ✅ 创建: {filename} ({result} bytes)")
     
     return created_files
 
@@ -72,8 +95,7 @@ def test_cleanup_functions():
         found_files = TestDataCleaner.scan_test_files(current_dir, data_patterns)
         
         print(f"  找到数据文件: {len(found_files)} 个")
-        for file_path in found_files:
-            size = TestDataCleaner.get_file_size(file_path)
+        for file_path, size in found_files:
             print(f"    📄 {file_path.name} ({TestDataCleaner.format_size(size)})")
         
         # 3. 测试清理选项（演示模式）
@@ -119,19 +141,20 @@ def main():
         
         # 3. 最终清理剩余文件
         print(f"\n🧹 最终清理...")
-        remaining_files = []
+        # 直接尝试删除，已被清理的文件报 FileNotFoundError，不再逐个 exists() 检查
+        messages = []
         for file_path in created_files:
-            if file_path.exists():
-                remaining_files.append(file_path)
+            try:
+                file_path.unlink()
+                messages.append(f"    ✅ 已删除: {file_path.name}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                messages.append(f"    ❌ 删除失败: {file_path.name} - {e}")
         
-        if remaining_files:
-            print(f"  发现 {len(remaining_files)} 个剩余文件:")
-            for file_path in remaining_files:
-                try:
-                    file_path.unlink()
-                    print(f"    ✅ 已删除: {file_path.name}")
-                except Exception as e:
-                    print(f"    ❌ 删除失败: {file_path.name} - {e}")
+        if messages:
+            print(f"  发现 {len(messages)} 个剩余文件:")
+            print("\n".join(messages))
         else:
             print(f"  所有测试文件已清理完成")
         
@@ -4,9 +4,38 @@ GDAL测试数据清理模块
 """
 
 import os
+import sys
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Iterable, List, Tuple, Optional
+
+# 文件大小单位及对应的二进制位移
+_UNIT_TABLE = (("B", 0), ("KB", 10), ("MB", 20), ("GB", 30), ("TB", 40))
+
+# 测试数据文件扩展名
+_DATA_EXTS = frozenset({
+    '.shp', '.shx', '.dbf', '.prj', '.cpg',  # Shapefile
+    '.gpkg',                                 # GeoPackage
+    '.geojson',                              # GeoJSON
+    '.kml', '.kmz',                          # KML
+    '.gml',                                  # GML
+    '.tmp', '.temp',                         # 临时文件
+})
+
+# 报告文件扩展名
+_REPORT_EXTS = frozenset({'.md', '.txt', '.log'})
+
+def _unlink_one(file_path: Path, size: int, description: str) -> Tuple[bool, int, str]:
+    """删除单个文件，返回 (是否删除, 释放的字节数, 输出信息)；文件已不存在时不输出信息"""
+    try:
+        file_path.unlink()
+        return True, size, f"  ✅ 已删除 {description}: {file_path.name}\n"
+    except FileNotFoundError:
+        return False, 0, ""
+    except Exception as e:
+        return False, 0, f"  ❌ 删除 {description} 失败: {file_path.name} - {e}\n"
 
 class TestDataCleaner:
     """测试数据清理器（简化版）"""
@@ -14,42 +43,64 @@ class TestDataCleaner:
     @staticmethod
     def format_size(size_bytes: int) -> str:
         """格式化文件大小"""
-        if size_bytes < 1024:
-            return f"{size_bytes} B"
-        elif size_bytes < 1024 * 1024:
-            return f"{size_bytes / 1024:.1f} KB"
-        elif size_bytes < 1024 * 1024 * 1024:
-            return f"{size_bytes / (1024 * 1024):.1f} MB"
-        else:
-            return f"{size_bytes / (1024 * 1024 * 1024):.1f} GB"
+        # 由二进制位数直接得到单位：每10位 (1024倍) 进一级
+        index = min(max(size_bytes.bit_length() - 1, 0) // 10, len(_UNIT_TABLE) - 1)
+        unit, shift = _UNIT_TABLE[index]
+        if shift == 0:
+            return f"{size_bytes} {unit}"
+        return f"{size_bytes / (1 << shift):.1f} {unit}"
     
     @staticmethod
     def get_file_size(file_path: Path) -> int:
-        """获取文件大小"""
+        """获取文件大小，文件不存在或无法访问时返回0"""
         try:
-            return file_path.stat().st_size if file_path.exists() else 0
-        except:
+            return os.stat(file_path).st_size
+        except OSError:
             return 0
     
     @staticmethod
-    def delete_files(file_paths: List[Path], description: str = "文件") -> Tuple[int, int]:
+    def get_directory_stats(dir_path: Path) -> Tuple[int, int]:
+        """
+        统计目录（包括子目录）中的文件
+        返回: (文件数, 总字节数)
+        
+        用 os.scandir 遍历，每个文件只 stat 一次
+        """
+        file_count = 0
+        total_size = 0
+        
+        stack = [str(dir_path)]
+        while stack:
+            current_dir = stack.pop()
+            with os.scandir(current_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        file_count += 1
+                        total_size += entry.stat(follow_symlinks=False).st_size
+        
+        return file_count, total_size
+    
+    @staticmethod
+    def delete_files(file_paths: List[Tuple[Path, int]], description: str = "文件") -> Tuple[int, int]:
         """
         删除文件列表
+        file_paths: scan_test_files 返回的 (文件路径, 文件大小) 列表
         返回: (删除数量, 释放的字节数)
         """
-        deleted_count = 0
-        total_size_freed = 0
+        # unlink 是阻塞的系统调用且会释放GIL，用线程池并发删除；输出在删除完成后按原顺序一次写出
+        max_workers = min(32, (os.cpu_count() or 4) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_unlink_one,
+                                        (file_path for file_path, _ in file_paths),
+                                        (size for _, size in file_paths),
+                                        repeat(description)))
         
-        for file_path in file_paths:
-            try:
-                if file_path.exists():
-                    size = TestDataCleaner.get_file_size(file_path)
-                    file_path.unlink()
-                    deleted_count += 1
-                    total_size_freed += size
-                    print(f"  ✅ 已删除 {description}: {file_path.name}")
-            except Exception as e:
-                print(f"  ❌ 删除 {description} 失败: {file_path.name} - {e}")
+        deleted_count = sum(1 for deleted, _, _ in results if deleted)
+        total_size_freed = sum(size for _, size, _ in results)
+        
+        sys.stdout.writelines(message for _, _, message in results if message)
         
         return deleted_count, total_size_freed
     
@@ -62,43 +113,79 @@ class TestDataCleaner:
         if not dir_path.exists():
             return 0, 0
         
-        # 计算总大小
+        if not hasattr(os, 'fwalk'):
+            # Windows 没有 os.fwalk：先统计再用 rmtree 删除
+            file_count, total_size = TestDataCleaner.get_directory_stats(dir_path)
+            
+            try:
+                shutil.rmtree(dir_path)
+                print(f"  ✅ 已删除 {description}: {dir_path.name}")
+                return file_count, total_size
+            except Exception as e:
+                print(f"  ❌ 删除 {description} 失败: {dir_path.name} - {e}")
+                return 0, 0
+        
+        # 自底向上遍历一次，基于目录文件描述符统计并删除，不再单独做统计遍历
         file_count = 0
         total_size = 0
         
-        for file_path in dir_path.rglob('*'):
-            if file_path.is_file():
-                file_count += 1
-                total_size += TestDataCleaner.get_file_size(file_path)
-        
         try:
-            shutil.rmtree(dir_path)
+            for _, dirs, files, root_fd in os.fwalk(str(dir_path), topdown=False):
+                for name in files:
+                    total_size += os.stat(name, dir_fd=root_fd, follow_symlinks=False).st_size
+                    os.unlink(name, dir_fd=root_fd)
+                    file_count += 1
+                for name in dirs:
+                    try:
+                        os.rmdir(name, dir_fd=root_fd)
+                    except NotADirectoryError:
+                        # 指向目录的符号链接
+                        os.unlink(name, dir_fd=root_fd)
+            os.rmdir(dir_path)
             print(f"  ✅ 已删除 {description}: {dir_path.name}")
-            return file_count, total_size
         except Exception as e:
             print(f"  ❌ 删除 {description} 失败: {dir_path.name} - {e}")
-            return 0, 0
+        
+        return file_count, total_size
     
     @staticmethod
-    def scan_test_files(base_dir: Path, patterns: List[str]) -> List[Path]:
+    def scan_test_files(base_dir: Path, patterns: Iterable[str]) -> List[Tuple[Path, int]]:
         """
-        扫描测试文件
-        patterns: 文件模式列表，如 ['*.shp', '*.gpkg']
+        扫描测试文件（包括子目录）
+        patterns: 文件模式或扩展名，如 ['*.shp', '*.gpkg'] 或 {'.shp', '.gpkg'}
+        返回: (文件路径, 文件大小) 列表
+        
+        只遍历一次目录树 (包括隐藏目录)，按扩展名区分大小写匹配，与原先的 glob 模式一致，
+        不会额外匹配 NOTES.TXT 之类大写扩展名的文件。
+        文件大小在扫描时取得，之后的统计和删除不再重复 stat
         """
         found_files = []
+        extensions = tuple(frozenset(pattern.lstrip('*') for pattern in patterns))
         
-        if not base_dir.exists():
-            return found_files
-        
-        for pattern in patterns:
-            found_files.extend(base_dir.glob(pattern))
-            # 也搜索子目录
-            found_files.extend(base_dir.glob(f"**/{pattern}"))
+        stack = [str(base_dir)]
+        while stack:
+            current_dir = stack.pop()
+            try:
+                entries = os.scandir(current_dir)
+            except FileNotFoundError:
+                # 基础目录不存在，或子目录在扫描过程中已被删除
+                continue
+            
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(extensions):
+                        try:
+                            size = entry.stat(follow_symlinks=False).st_size
+                        except FileNotFoundError:
+                            continue
+                        found_files.append((Path(entry.path), size))
         
         return found_files
     
     @staticmethod
-    def offer_simple_cleanup(files_to_clean: List[Path], 
+    def offer_simple_cleanup(files_to_clean: List[Tuple[Path, int]], 
                            description: str = "测试文件",
                            auto_confirm: bool = False) -> bool:
         """
@@ -110,15 +197,14 @@ class TestDataCleaner:
             return False
         
         # 计算总大小
-        total_size = sum(TestDataCleaner.get_file_size(f) for f in files_to_clean)
+        total_size = sum(size for _, size in files_to_clean)
         
         print(f"\n🧹 发现 {len(files_to_clean)} 个{description}")
         print(f"📊 总大小: {TestDataCleaner.format_size(total_size)}")
         
         # 显示前几个文件
         print(f"📄 文件列表 (显示前5个):")
-        for i, file_path in enumerate(files_to_clean[:5]):
-            size = TestDataCleaner.get_file_size(file_path)
+        for i, (file_path, size) in enumerate(files_to_clean[:5]):
             print(f"  {i+1}. {file_path.name} ({TestDataCleaner.format_size(size)})")
         
         if len(files_to_clean) > 5:
@@ -164,25 +250,11 @@ def cleanup_gdal_test_data(base_dir: Optional[Path] = None,
     if base_dir is None:
         base_dir = Path.cwd()
     
-    # 数据文件模式
-    data_patterns = [
-        '*.shp', '*.shx', '*.dbf', '*.prj', '*.cpg',  # Shapefile
-        '*.gpkg',                                      # GeoPackage  
-        '*.geojson',                                   # GeoJSON
-        '*.kml', '*.kmz',                             # KML
-        '*.gml',                                      # GML
-        '*.tmp', '*.temp'                             # 临时文件
-    ]
-    
-    # 报告文件模式
-    report_patterns = ['*.md', '*.txt', '*.log']
-    
-    patterns = data_patterns
-    if include_reports:
-        patterns.extend(report_patterns)
+    # 需要清理的文件扩展名
+    extensions = _DATA_EXTS | _REPORT_EXTS if include_reports else _DATA_EXTS
     
     # 扫描文件
-    test_files = TestDataCleaner.scan_test_files(base_dir, patterns)
+    test_files = TestDataCleaner.scan_test_files(base_dir, extensions)
     
     # 提供清理选项
     description = "测试数据文件"
@@ -212,13 +284,7 @@ def cleanup_test_output_directory(output_dir: Path,
         return False
     
     # 计算目录信息
-    file_count = 0
-    total_size = 0
-    
-    for file_path in output_dir.rglob('*'):
-        if file_path.is_file():
-            file_count += 1
-            total_size += TestDataCleaner.get_file_size(file_path)
+    file_count, total_size = TestDataCleaner.get_directory_stats(output_dir)
     
     if file_count == 0:
         print(f"📁 目录为空: {output_dir}")
@@ -4,9 +4,42 @@
 展示如何正确配置GDAL以避免警告
 """
 
+import struct
+
 # 导入我们的GDAL配置模块
 from gdal_config import configure_gdal, get_gdal_info
 
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# 逐要素写入时每个事务包含的要素数，限制大批量写入时的日志增长
+_TRANSACTION_BATCH_SIZE = 50_000
+
+# 测试点数据 (名称, 经度, 纬度)
+_TEST_POINTS = [
+    ("测试点", 116.3974, 39.9093),
+]
+
+def write_points_arrow(layer, points):
+    """通过Arrow批量接口按列写入点要素 (GDAL 3.8+)
+    
+    名称和WKB几何各作为一列一次传入，不再为每个要素创建 ogr.Feature / ogr.Geometry
+    """
+    schema = pa.schema([
+        pa.field("name", pa.string()),
+        pa.field("wkb_geometry", pa.binary(), metadata={"ARROW:extension:name": "ogc.wkb"}),
+    ])
+    batch = pa.record_batch([
+        pa.array([name for name, _, _ in points], type=pa.string()),
+        # 小端WKB点: 字节序(1) + 类型(1=Point) + x + y
+        pa.array([struct.pack('<BIdd', 1, 1, x, y) for _, x, y in points], type=pa.binary()),
+    ], schema=schema)
+    
+    layer.WriteArrow(batch, options=["GEOMETRY_NAME=wkb_geometry"])
+
 def test_with_proper_config():
     """使用正确配置的测试"""
     print("GDAL正确配置测试")
@@ -37,24 +70,47 @@ def test_with_proper_config():
     field_defn = ogr.FieldDefn("name", ogr.OFTString)
     layer.CreateField(field_defn)
     
-    # 创建要素
-    feature_defn = layer.GetLayerDefn()
-    feature = ogr.Feature(feature_defn)
-    feature.SetField("name", "测试点")
-    
-    # 创建几何体
-    point = ogr.Geometry(ogr.wkbPoint)
-    point.AddPoint(116.3974, 39.9093)
-    feature.SetGeometry(point)
-    
-    # 添加要素
-    layer.CreateFeature(feature)
+    # 创建要素：支持Arrow批量写入时按列一次写入，否则逐要素创建
+    if HAS_PYARROW and hasattr(layer, "WriteArrow"):
+        write_points_arrow(layer, _TEST_POINTS)
+    else:
+        feature_defn = layer.GetLayerDefn()
+        name_index = feature_defn.GetFieldIndex("name")
+        
+        # 要素和点几何各只创建一次，每条记录重置FID并更新字段和坐标后写入 (CreateFeature会复制内容)
+        feature = ogr.Feature(feature_defn)
+        point = ogr.Geometry(ogr.wkbPoint)
+        point.AddPoint(0, 0)
+        
+        # 在事务中批量写入 (GPKG等SQLite驱动每批只提交一次；不支持事务的图层为空操作)
+        layer.StartTransaction()
+        try:
+            for i, (name, x, y) in enumerate(_TEST_POINTS, 1):
+                feature.SetFID(-1)
+                feature.SetField(name_index, name)
+                
+                # 更新几何体坐标
+                point.SetPoint(0, x, y)
+                feature.SetGeometry(point)
+                
+                # 添加要素
+                layer.CreateFeature(feature)
+                
+                if i % _TRANSACTION_BATCH_SIZE == 0:
+                    layer.CommitTransaction()
+                    layer.StartTransaction()
+            
+            layer.CommitTransaction()
+        except Exception:
+            layer.RollbackTransaction()
+            raise
+        
+        feature = None
     
     print(f"✓ 成功创建图层，包含 {layer.GetFeatureCount()} 个要素")
     print("✓ 没有警告信息输出")
     
     # 清理
-    feature = None
     datasource = None
 
 if __name__ == "__main__":
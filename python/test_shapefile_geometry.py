@@ -4,17 +4,141 @@ Shapefile几何类型支持测试程序
 专门测试Shapefile格式支持的几何类型，特别是多部分面
 """
 
+import io
 import os
 import sys
+import glob
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, wraps
+from itertools import repeat
 from osgeo import gdal, ogr, osr
 
+try:
+    import numpy as np
+    from _wkb import polygon_wkb, multipolygon_wkb
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
 # 明确启用异常处理，避免GDAL 4.0兼容性警告
 gdal.UseExceptions()
 ogr.UseExceptions()
 osr.UseExceptions()
 
-def test_shapefile_geometry_support():
-    """测试Shapefile支持的几何类型"""
+# 各几何类型对应的Shapefile形状类型 (SHPT图层创建选项)，创建图层时直接指定，不再由驱动按几何类型推断
+# Shapefile的线/面类型本身即可存多部分几何；几何集合没有对应形状类型，不传该选项
+_SHPT_BY_GEOM_TYPE = {
+    ogr.wkbPoint: 'POINT',
+    ogr.wkbMultiPoint: 'MULTIPOINT',
+    ogr.wkbLineString: 'ARC',
+    ogr.wkbMultiLineString: 'ARC',
+    ogr.wkbPolygon: 'POLYGON',
+    ogr.wkbMultiPolygon: 'POLYGON',
+}
+
+# 设置了 GDAL_TEST_BENCHMARK 环境变量时按吞吐量测试运行，只写 .shp/.shx/.dbf：
+# 不传坐标系统 (不写 .prj)，编码置空 (不写 .cpg)，DBF更新日期固定 (不取当前日期)
+_BENCHMARK_LAYER_OPTIONS = ['ENCODING=', 'DBF_DATE_LAST_UPDATE=1980-01-01']
+
+def _coords(values):
+    """坐标表: 有NumPy时为 (N, 2) 的小端float64数组，否则为元组"""
+    if HAS_NUMPY:
+        return np.array(values, dtype='<f8')
+    return tuple(values)
+
+def _shoelace(coords):
+    """闭合环的面积 (鞋带公式)，坐标先平移到首点附近以减小大经纬度值的舍入误差"""
+    if HAS_NUMPY:
+        x = coords[:, 0] - coords[0, 0]
+        y = coords[:, 1] - coords[0, 1]
+        return 0.5 * abs(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]))
+    x0, y0 = coords[0]
+    twice_area = 0.0
+    for (xa, ya), (xb, yb) in zip(coords, coords[1:]):
+        twice_area += (xa - x0) * (yb - y0) - (xb - x0) * (ya - y0)
+    return 0.5 * abs(twice_area)
+
+def _polygon_area(rings):
+    """多边形面积: 外环面积减去各内环（洞）面积"""
+    return _shoelace(rings[0]) - sum(_shoelace(ring) for ring in rings[1:])
+
+# 测试数据：坐标按几何体存为 (N, 2) 坐标表，名称和描述为并列的列表
+
+# 北京市主要地标
+_LANDMARK_COORDS = _coords([(116.3974, 39.9093), (116.4074, 39.9042), (116.3683, 39.9150), (116.4167, 39.9167)])
+_LANDMARK_NAMES = ["天安门", "故宫", "西单", "王府井"]
+_LANDMARK_DESCS = ["北京市中心，国家象征", "明清两代皇宫", "繁华商业区", "著名商业街"]
+
+# 北京地铁站群
+_STATION_GROUP_COORDS = [
+    _coords([(116.4619, 39.9078), (116.4639, 39.9088), (116.4599, 39.9068)]),
+    _coords([(116.3683, 39.9150), (116.3693, 39.9160), (116.3673, 39.9140)]),
+]
+_STATION_GROUP_NAMES = ["国贸站群", "西单站群"]
+_STATION_GROUP_DESCS = ["国贸商圈地铁站", "西单商圈地铁站"]
+
+# 北京主要道路
+_ROAD_COORDS = [
+    _coords([(116.3200, 39.9093), (116.3974, 39.9093), (116.4800, 39.9093)]),
+    _coords([(116.4270, 39.8800), (116.4470, 39.9093), (116.4270, 39.9400)]),
+]
+_ROAD_NAMES = ["长安街", "二环路东段"]
+_ROAD_DESCS = ["北京最重要的东西向道路", "北京二环路东部"]
+
+# 复杂道路系统（每个系统为多条线）
+_ROAD_SYSTEM_COORDS = [
+    [
+        _coords([(116.3500, 39.8500), (116.4500, 39.8500), (116.5000, 39.9000)]),  # 主路
+        _coords([(116.4500, 39.8500), (116.4600, 39.8600)]),  # 匝道
+    ],
+]
+_ROAD_SYSTEM_NAMES = ["三环路系统"]
+_ROAD_SYSTEM_DESCS = ["北京三环路及匝道"]
+
+# 北京市区域（每个多边形为环列表，外环在前，洞依次在后）
+_AREA_RINGS = [
+    [
+        _coords([(116.3914, 39.9031), (116.4014, 39.9031), (116.4014, 39.9131), (116.3914, 39.9131), (116.3914, 39.9031)]),
+    ],
+    [
+        _coords([(116.3850, 39.9050), (116.4200, 39.9050), (116.4200, 39.9250), (116.3850, 39.9250), (116.3850, 39.9050)]),
+        _coords([(116.4000, 39.9100), (116.4100, 39.9100), (116.4100, 39.9200), (116.4000, 39.9200), (116.4000, 39.9100)]),  # 内廷
+    ],
+]
+_AREA_NAMES = ["天安门广场", "故宫"]
+_AREA_DESCS = ["世界最大的城市广场", "紫禁城，含内廷"]
+# 面积由坐标表直接算出，写入时不再逐个调用 GetArea()
+_AREA_AREAS = [_polygon_area(rings) for rings in _AREA_RINGS]
+
+# 多部分区域（这是测试的重点）：每个要素为多边形列表，每个多边形为环列表
+_MULTI_AREA_POLYGONS = [
+    [
+        # 燕园主校区
+        [_coords([(116.2950, 39.9950), (116.3150, 39.9950), (116.3150, 40.0050), (116.2950, 40.0050), (116.2950, 39.9950)])],
+        # 医学部校区
+        [_coords([(116.3550, 39.9850), (116.3650, 39.9850), (116.3650, 39.9950), (116.3550, 39.9950), (116.3550, 39.9850)])],
+    ],
+    [
+        # 主湖
+        [_coords([(116.4800, 39.9400), (116.4900, 39.9400), (116.4900, 39.9500), (116.4800, 39.9500), (116.4800, 39.9400)])],
+        # 小湖1
+        [_coords([(116.4850, 39.9350), (116.4880, 39.9350), (116.4880, 39.9380), (116.4850, 39.9380), (116.4850, 39.9350)])],
+        # 小湖2
+        [_coords([(116.4920, 39.9420), (116.4950, 39.9420), (116.4950, 39.9450), (116.4920, 39.9450), (116.4920, 39.9420)])],
+    ],
+]
+_MULTI_AREA_NAMES = ["北京大学校区", "朝阳公园水系"]
+_MULTI_AREA_DESCS = ["北京大学的多个校区（主校区+分校区）", "朝阳公园内的多个独立湖泊"]
+_MULTI_AREA_AREAS = [sum(_polygon_area(rings) for rings in polygons)
+                     for polygons in _MULTI_AREA_POLYGONS]
+
+def test_shapefile_geometry_support(max_workers=1):
+    """测试Shapefile支持的几何类型
+    
+    max_workers 为并行进程数，默认为1，在当前进程依次执行并逐个输出结果；
+    每个测试只写入几个要素，启动工作进程的开销远大于测试本身，一般不需要并行。
+    """
     print("Shapefile几何类型支持测试")
     print("=" * 60)
     
@@ -22,10 +146,6 @@ def test_shapefile_geometry_support():
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
-    # 创建坐标系统
-    srs = osr.SpatialReference()
-    srs.ImportFromEPSG(4326)  # WGS84
-    
     # 定义要测试的几何类型
     geometry_tests = [
         {
@@ -70,6 +190,7 @@ def test_shapefile_geometry_support():
             'chinese': '多边形',
             'filename': 'polygons.shp',
             'create_func': create_test_polygon,
+            'areas': _AREA_AREAS,
             'shapefile_support': True,
             'description': '单个多边形（可包含洞）'
         },
@@ -79,6 +200,7 @@ def test_shapefile_geometry_support():
             'chinese': '多部分面',
             'filename': 'multipolygons.shp',
             'create_func': create_test_multipolygon,
+            'areas': _MULTI_AREA_AREAS,
             'shapefile_support': True,
             'description': '多个多边形的集合（多部分面）'
         },
@@ -104,122 +226,27 @@ def test_shapefile_geometry_support():
     
     results = {}
     
-    for geom_test in geometry_tests:
-        geom_type = geom_test['type']
-        geom_name = geom_test['name']
-        chinese_name = geom_test['chinese']
-        filename = geom_test['filename']
-        create_func = geom_test['create_func']
-        expected_support = geom_test['shapefile_support']
-        description = geom_test['description']
-        
-        print(f"\n测试 {geom_name} ({chinese_name}):")
-        print(f"  描述: {description}")
-        print(f"  预期支持: {'是' if expected_support else '否'}")
-        
-        try:
-            # 创建文件路径
-            file_path = os.path.join(output_dir, filename)
-            
-            # 删除现有文件
-            if os.path.exists(file_path):
-                # 删除所有相关文件
-                base_name = os.path.splitext(file_path)[0]
-                for ext in ['.shp', '.shx', '.dbf', '.prj', '.cpg']:
-                    related_file = base_name + ext
-                    if os.path.exists(related_file):
-                        os.remove(related_file)
-            
-            # 创建数据源
-            datasource = driver.CreateDataSource(file_path)
-            if datasource is None:
-                print(f"  ✗ 无法创建Shapefile数据源")
-                results[geom_name] = False
-                continue
-            
-            # 创建图层
-            layer = datasource.CreateLayer("layer", srs, geom_type)
-            if layer is None:
-                print(f"  ✗ 无法创建 {geom_name} 图层")
-                results[geom_name] = False
-                datasource = None
-                continue
-            
-            # 添加属性字段
-            id_field = ogr.FieldDefn("id", ogr.OFTInteger)
-            layer.CreateField(id_field)
-            
-            name_field = ogr.FieldDefn("name", ogr.OFTString)
-            name_field.SetWidth(50)
-            layer.CreateField(name_field)
-            
-            type_field = ogr.FieldDefn("geom_type", ogr.OFTString)
-            type_field.SetWidth(30)
-            layer.CreateField(type_field)
-            
-            area_field = ogr.FieldDefn("area", ogr.OFTReal)
-            area_field.SetPrecision(2)
-            layer.CreateField(area_field)
-            
-            # 创建多个要素进行测试
-            feature_count = 0
-            test_data = create_func()
-            
-            for i, (geom, name, description_text) in enumerate(test_data):
-                # 创建要素
-                feature_defn = layer.GetLayerDefn()
-                feature = ogr.Feature(feature_defn)
-                feature.SetField("id", i + 1)
-                feature.SetField("name", name)
-                feature.SetField("geom_type", geom_name)
-                
-                # 计算面积（如果是面几何）
-                if geom_type in [ogr.wkbPolygon, ogr.wkbMultiPolygon]:
-                    area = geom.GetArea() if geom else 0.0
-                    feature.SetField("area", area)
-                else:
-                    feature.SetField("area", 0.0)
-                
-                if geom is not None:
-                    feature.SetGeometry(geom)
-                
-                # 添加要素
-                result = layer.CreateFeature(feature)
-                if result == 0:
-                    feature_count += 1
-                else:
-                    print(f"    警告: 要素 {name} 创建失败")
-                
-                # 清理
-                feature = None
-            
-            if feature_count > 0:
-                print(f"  ✓ {geom_name} 支持成功，创建了 {feature_count} 个要素")
-                print(f"  文件: {filename}")
-                results[geom_name] = True
-                
-                # 验证文件大小
-                if os.path.exists(file_path):
-                    file_size = os.path.getsize(file_path)
-                    print(f"  文件大小: {file_size} bytes")
-            else:
-                print(f"  ✗ {geom_name} 无法创建要素")
-                results[geom_name] = False
-            
-            # 关闭数据源
-            datasource = None
-            
-        except Exception as e:
-            print(f"  ✗ {geom_name} 测试异常: {e}")
-            results[geom_name] = False
+    # 各几何类型的测试写入不同文件、相互独立，max_workers 大于1时用进程池并行执行；
+    # 每个测试的输出在工作进程内缓冲，按原顺序写到标准输出
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    try:
+        run = executor.map if executor is not None else map
+        outcomes = run(_run_geometry_test, repeat(output_dir), geometry_tests)
+        for geom_test, (ok, text) in zip(geometry_tests, outcomes):
+            sys.stdout.write(text)
+            results[geom_test['name']] = ok
+    finally:
+        if executor is not None:
+            executor.shutdown()
     
     # 输出结果摘要
     print("\n" + "=" * 60)
     print("Shapefile几何类型支持摘要")
     print("=" * 60)
     
-    print(f"{'几何类型':18s} {'中文名':10s} {'预期':6s} {'实际':6s} {'状态':6s}")
-    print("-" * 60)
+    # 行格式只解析一次，表头和各行共用，整张表拼好后一次输出
+    fmt = "{:18s} {:10s} {:6s} {:6s} {:6s}\n".format
+    table = [fmt('几何类型', '中文名', '预期', '实际', '状态'), "-" * 60 + "\n"]
     
     for geom_test in geometry_tests:
         geom_name = geom_test['name']
@@ -235,240 +262,303 @@ def test_shapefile_geometry_support():
         else:
             status = "⚠️"
         
-        print(f"{geom_name:18s} {chinese_name:10s} {expected_str:6s} {actual_str:6s} {status:6s}")
+        table.append(fmt(geom_name, chinese_name, expected_str, actual_str, status))
+    
+    print("".join(table), end="")
     
     print(f"\n测试文件保存在: {output_dir}")
     return results
 
-def create_test_point():
-    """创建测试点数据"""
-    test_data = []
+@lru_cache(maxsize=None)
+def _wgs84_srs():
+    """WGS84坐标系统: 每个进程只构建一次，该进程内所有图层直接共用同一对象"""
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(4326)  # WGS84
+    # 测试数据按 经度, 纬度 顺序给出，固定为传统GIS轴序，写入时无需按EPSG轴序交换坐标
+    srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+    return srs
+
+def _run_geometry_test(output_dir, geom_test):
+    """运行单个几何类型测试，返回 (是否成功, 输出文本)
+    
+    可在工作进程中运行：模块导入时已调用 UseExceptions()，每个进程独立生效；
+    OGR驱动和坐标系统在各进程内单独获取。
+    """
+    out = io.StringIO()
+    ok = _write_geometry_test(out, output_dir, geom_test)
+    return ok, out.getvalue()
+
+def _write_geometry_test(out, output_dir, geom_test):
+    """写入一种几何类型的测试文件，过程信息写入 out，返回是否成功"""
+    driver = ogr.GetDriverByName("ESRI Shapefile")
+    srs = _wgs84_srs()
     
-    # 北京市主要地标
-    locations = [
-        (116.3974, 39.9093, "天安门", "北京市中心，国家象征"),
-        (116.4074, 39.9042, "故宫", "明清两代皇宫"),
-        (116.3683, 39.9150, "西单", "繁华商业区"),
-        (116.4167, 39.9167, "王府井", "著名商业街")
-    ]
+    geom_type = geom_test['type']
+    geom_name = geom_test['name']
+    chinese_name = geom_test['chinese']
+    filename = geom_test['filename']
+    create_func = geom_test['create_func']
+    expected_support = geom_test['shapefile_support']
+    description = geom_test['description']
     
-    for lon, lat, name, desc in locations:
-        point = ogr.Geometry(ogr.wkbPoint)
-        point.AddPoint(lon, lat)
-        test_data.append((point, name, desc))
+    print(f"\n测试 {geom_name} ({chinese_name}):", file=out)
+    print(f"  描述: {description}", file=out)
+    print(f"  预期支持: {'是' if expected_support else '否'}", file=out)
     
-    return test_data
+    try:
+        # 创建文件路径
+        file_path = os.path.join(output_dir, filename)
+        
+        # 删除现有文件: 一次目录匹配找出所有相关文件，直接删除不再逐个stat
+        base_name = os.path.splitext(file_path)[0]
+        for related_file in glob.iglob(glob.escape(base_name) + '.*'):
+            try:
+                os.unlink(related_file)
+            except OSError:
+                pass
+        
+        # 创建数据源
+        datasource = driver.CreateDataSource(file_path)
+        if datasource is None:
+            print(f"  ✗ 无法创建Shapefile数据源", file=out)
+            return False
+        
+        # 创建图层
+        shpt = _SHPT_BY_GEOM_TYPE.get(geom_type)
+        layer_options = [f"SHPT={shpt}"] if shpt else []
+        layer_srs = srs
+        if os.environ.get("GDAL_TEST_BENCHMARK"):
+            layer_options += _BENCHMARK_LAYER_OPTIONS
+            layer_srs = None
+        layer = datasource.CreateLayer("layer", layer_srs, geom_type, options=layer_options)
+        if layer is None:
+            print(f"  ✗ 无法创建 {geom_name} 图层", file=out)
+            datasource = None
+            return False
+        
+        # 添加属性字段
+        # 数值字段也预先给定宽度，DBF记录长度在写第一条记录前即确定
+        id_field = ogr.FieldDefn("id", ogr.OFTInteger)
+        id_field.SetWidth(9)
+        layer.CreateField(id_field)
+        
+        name_field = ogr.FieldDefn("name", ogr.OFTString)
+        name_field.SetWidth(50)
+        layer.CreateField(name_field)
+        
+        type_field = ogr.FieldDefn("geom_type", ogr.OFTString)
+        type_field.SetWidth(30)
+        layer.CreateField(type_field)
+        
+        area_field = ogr.FieldDefn("area", ogr.OFTReal)
+        area_field.SetWidth(18)
+        area_field.SetPrecision(2)
+        layer.CreateField(area_field)
+        
+        # 创建多个要素进行测试
+        feature_count = 0
+        test_data = create_func()
+        
+        # 在一个事务内写入全部要素 (Shapefile图层的事务调用为空操作，支持事务的驱动只提交一次)
+        feature_defn = layer.GetLayerDefn()
+        
+        # 字段索引只解析一次，循环内按索引赋值
+        idx_id = feature_defn.GetFieldIndex("id")
+        idx_name = feature_defn.GetFieldIndex("name")
+        idx_geom_type = feature_defn.GetFieldIndex("geom_type")
+        idx_area = feature_defn.GetFieldIndex("area")
+        # 面几何的面积预先由坐标表算好，其余类型为 None
+        areas = geom_test.get('areas')
+        
+        # 要素对象只创建一次 (CreateFeature会复制要素内容)，每条记录重置FID后覆盖字段和几何
+        feature = ogr.Feature(feature_defn)
+        
+        # 同一图层内几何类型名不变，随复用的要素保留，只需设置一次
+        feature.SetField(idx_geom_type, geom_name)
+        if areas is None:
+            feature.SetField(idx_area, 0.0)
+        
+        layer.StartTransaction()
+        try:
+            for i, (geom, name, description_text) in enumerate(test_data):
+                feature.SetFID(ogr.NullFID)
+                feature.SetField(idx_id, i + 1)
+                feature.SetField(idx_name, name)
+                
+                # 面积（如果是面几何）
+                if areas is not None:
+                    feature.SetField(idx_area, areas[i])
+                
+                # 测试几何体写入后不再使用，由要素直接接管，不再复制
+                if geom is not None:
+                    feature.SetGeometryDirectly(geom)
+                else:
+                    feature.SetGeometry(None)
+                
+                # 添加要素
+                result = layer.CreateFeature(feature)
+                if result == 0:
+                    feature_count += 1
+                else:
+                    print(f"    警告: 要素 {name} 创建失败", file=out)
+            
+            layer.CommitTransaction()
+        except Exception:
+            layer.RollbackTransaction()
+            raise
+        finally:
+            # 清理
+            feature = None
+        
+        if feature_count > 0:
+            print(f"  ✓ {geom_name} 支持成功，创建了 {feature_count} 个要素", file=out)
+            print(f"  文件: {filename}", file=out)
+            ok = True
+            
+            # 验证文件大小: 一次stat同时判断存在性和取大小
+            try:
+                file_size = os.stat(file_path).st_size
+            except OSError:
+                file_size = None
+            if file_size is not None:
+                print(f"  文件大小: {file_size} bytes", file=out)
+        else:
+            print(f"  ✗ {geom_name} 无法创建要素", file=out)
+            ok = False
+        
+        # 关闭数据源
+        datasource = None
+        
+    except Exception as e:
+        print(f"  ✗ {geom_name} 测试异常: {e}", file=out)
+        ok = False
+    
+    return ok
+
+def _coords_bytes(coords):
+    """坐标表的小端double字节序列"""
+    if HAS_NUMPY:
+        return np.ascontiguousarray(coords, dtype='<f8').tobytes()
+    flat = [value for coord in coords for value in coord]
+    return struct.pack(f'<{len(flat)}d', *flat)
+
+def _point_wkb(lon, lat):
+    """小端WKB点: 字节序 + 类型 + x + y"""
+    return struct.pack('<BIdd', 1, ogr.wkbPoint, lon, lat)
+
+def _linestring_wkb(coords):
+    """小端WKB线: 字节序 + 类型 + 点数 + 坐标"""
+    return struct.pack('<BII', 1, ogr.wkbLineString, len(coords)) + _coords_bytes(coords)
+
+def _polygon_wkb(rings):
+    """小端WKB多边形: 字节序 + 类型 + 环数，之后每个环为点数 + 坐标 (第一个环为外环)"""
+    parts = [struct.pack('<BII', 1, ogr.wkbPolygon, len(rings))]
+    for ring in rings:
+        parts.append(struct.pack('<I', len(ring)))
+        parts.append(_coords_bytes(ring))
+    return b"".join(parts)
 
+def _ring_offsets(rings):
+    """各环在连接后坐标数组中的起始行，最后一项为总点数 (传入多边形列表时为各多边形的起始环号)"""
+    offsets = [0]
+    for ring in rings:
+        offsets.append(offsets[-1] + len(ring))
+    return offsets
+
+def _collection_wkb(geom_type, part_wkbs):
+    """小端WKB多部分几何/几何集合: 字节序 + 类型 + 子几何数 + 各子几何的WKB"""
+    return struct.pack('<BII', 1, geom_type, len(part_wkbs)) + b"".join(part_wkbs)
+
+def _from_cached_wkb(build_records):
+    """
+    把返回 (WKB, 名称, 描述) 列表的构建函数包装为测试数据函数
+    WKB只构建一次并缓存，每次调用都由缓存的WKB新建几何体
+    (几何体写入要素时由 SetGeometryDirectly 接管，不能跨调用复用)
+    """
+    cached_records = lru_cache(maxsize=None)(lambda: tuple(build_records()))
+    
+    @wraps(build_records)
+    def create():
+        return [(ogr.CreateGeometryFromWkb(wkb), name, desc) for wkb, name, desc in cached_records()]
+    return create
+
+@_from_cached_wkb
+def create_test_point():
+    """创建测试点数据"""
+    return [(_point_wkb(lon, lat), name, desc)
+            for (lon, lat), name, desc in zip(_LANDMARK_COORDS, _LANDMARK_NAMES, _LANDMARK_DESCS)]
+
+@_from_cached_wkb
 def create_test_multipoint():
     """创建测试多点数据"""
     test_data = []
     
-    # 北京地铁站群
-    station_groups = [
-        {
-            'name': '国贸站群',
-            'desc': '国贸商圈地铁站',
-            'stations': [(116.4619, 39.9078), (116.4639, 39.9088), (116.4599, 39.9068)]
-        },
-        {
-            'name': '西单站群', 
-            'desc': '西单商圈地铁站',
-            'stations': [(116.3683, 39.9150), (116.3693, 39.9160), (116.3673, 39.9140)]
-        }
-    ]
-    
-    for group in station_groups:
-        multipoint = ogr.Geometry(ogr.wkbMultiPoint)
-        for lon, lat in group['stations']:
-            point = ogr.Geometry(ogr.wkbPoint)
-            point.AddPoint(lon, lat)
-            multipoint.AddGeometry(point)
-        test_data.append((multipoint, group['name'], group['desc']))
+    for stations, name, desc in zip(_STATION_GROUP_COORDS, _STATION_GROUP_NAMES, _STATION_GROUP_DESCS):
+        wkb = _collection_wkb(ogr.wkbMultiPoint, [_point_wkb(lon, lat) for lon, lat in stations])
+        test_data.append((wkb, name, desc))
     
     return test_data
 
+@_from_cached_wkb
 def create_test_linestring():
     """创建测试线数据"""
-    test_data = []
-    
-    # 北京主要道路
-    roads = [
-        {
-            'name': '长安街',
-            'desc': '北京最重要的东西向道路',
-            'coords': [(116.3200, 39.9093), (116.3974, 39.9093), (116.4800, 39.9093)]
-        },
-        {
-            'name': '二环路东段',
-            'desc': '北京二环路东部',
-            'coords': [(116.4270, 39.8800), (116.4470, 39.9093), (116.4270, 39.9400)]
-        }
-    ]
-    
-    for road in roads:
-        line = ogr.Geometry(ogr.wkbLineString)
-        for lon, lat in road['coords']:
-            line.AddPoint(lon, lat)
-        test_data.append((line, road['name'], road['desc']))
-    
-    return test_data
+    return [(_linestring_wkb(coords), name, desc)
+            for coords, name, desc in zip(_ROAD_COORDS, _ROAD_NAMES, _ROAD_DESCS)]
 
+@_from_cached_wkb
 def create_test_multilinestring():
     """创建测试多线数据"""
     test_data = []
     
-    # 复杂道路系统
-    road_systems = [
-        {
-            'name': '三环路系统',
-            'desc': '北京三环路及匝道',
-            'lines': [
-                [(116.3500, 39.8500), (116.4500, 39.8500), (116.5000, 39.9000)],  # 主路
-                [(116.4500, 39.8500), (116.4600, 39.8600)]  # 匝道
-            ]
-        }
-    ]
-    
-    for system in road_systems:
-        multiline = ogr.Geometry(ogr.wkbMultiLineString)
-        for line_coords in system['lines']:
-            line = ogr.Geometry(ogr.wkbLineString)
-            for lon, lat in line_coords:
-                line.AddPoint(lon, lat)
-            multiline.AddGeometry(line)
-        test_data.append((multiline, system['name'], system['desc']))
+    for lines, name, desc in zip(_ROAD_SYSTEM_COORDS, _ROAD_SYSTEM_NAMES, _ROAD_SYSTEM_DESCS):
+        wkb = _collection_wkb(ogr.wkbMultiLineString, [_linestring_wkb(coords) for coords in lines])
+        test_data.append((wkb, name, desc))
     
     return test_data
 
+@_from_cached_wkb
 def create_test_polygon():
     """创建测试多边形数据"""
     test_data = []
     
-    # 北京市区域
-    areas = [
-        {
-            'name': '天安门广场',
-            'desc': '世界最大的城市广场',
-            'outer': [(116.3914, 39.9031), (116.4014, 39.9031), (116.4014, 39.9131), (116.3914, 39.9131), (116.3914, 39.9031)],
-            'holes': []  # 无洞
-        },
-        {
-            'name': '故宫',
-            'desc': '紫禁城，含内廷',
-            'outer': [(116.3850, 39.9050), (116.4200, 39.9050), (116.4200, 39.9250), (116.3850, 39.9250), (116.3850, 39.9050)],
-            'holes': [[(116.4000, 39.9100), (116.4100, 39.9100), (116.4100, 39.9200), (116.4000, 39.9200), (116.4000, 39.9100)]]  # 内廷
-        }
-    ]
-    
-    for area in areas:
-        # 创建外环
-        outer_ring = ogr.Geometry(ogr.wkbLinearRing)
-        for lon, lat in area['outer']:
-            outer_ring.AddPoint(lon, lat)
-        
-        polygon = ogr.Geometry(ogr.wkbPolygon)
-        polygon.AddGeometry(outer_ring)
-        
-        # 添加洞
-        for hole_coords in area['holes']:
-            hole_ring = ogr.Geometry(ogr.wkbLinearRing)
-            for lon, lat in hole_coords:
-                hole_ring.AddPoint(lon, lat)
-            polygon.AddGeometry(hole_ring)
-        
-        test_data.append((polygon, area['name'], area['desc']))
+    for rings, name, desc in zip(_AREA_RINGS, _AREA_NAMES, _AREA_DESCS):
+        if HAS_NUMPY:
+            # 各环坐标连成一个数组，由 _wkb 一次写入预分配缓冲区
+            wkb = bytes(polygon_wkb(np.concatenate(rings), _ring_offsets(rings)))
+        else:
+            wkb = _polygon_wkb(rings)
+        test_data.append((wkb, name, desc))
     
     return test_data
 
+@_from_cached_wkb
 def create_test_multipolygon():
     """创建测试多部分面数据"""
     test_data = []
     
-    # 多部分区域（这是测试的重点）
-    multi_areas = [
-        {
-            'name': '北京大学校区',
-            'desc': '北京大学的多个校区（主校区+分校区）',
-            'polygons': [
-                # 燕园主校区
-                {
-                    'outer': [(116.2950, 39.9950), (116.3150, 39.9950), (116.3150, 40.0050), (116.2950, 40.0050), (116.2950, 39.9950)],
-                    'holes': []
-                },
-                # 医学部校区
-                {
-                    'outer': [(116.3550, 39.9850), (116.3650, 39.9850), (116.3650, 39.9950), (116.3550, 39.9950), (116.3550, 39.9850)],
-                    'holes': []
-                }
-            ]
-        },
-        {
-            'name': '朝阳公园水系',
-            'desc': '朝阳公园内的多个独立湖泊',
-            'polygons': [
-                # 主湖
-                {
-                    'outer': [(116.4800, 39.9400), (116.4900, 39.9400), (116.4900, 39.9500), (116.4800, 39.9500), (116.4800, 39.9400)],
-                    'holes': []
-                },
-                # 小湖1
-                {
-                    'outer': [(116.4850, 39.9350), (116.4880, 39.9350), (116.4880, 39.9380), (116.4850, 39.9380), (116.4850, 39.9350)],
-                    'holes': []
-                },
-                # 小湖2
-                {
-                    'outer': [(116.4920, 39.9420), (116.4950, 39.9420), (116.4950, 39.9450), (116.4920, 39.9450), (116.4920, 39.9420)],
-                    'holes': []
-                }
-            ]
-        }
-    ]
-    
-    for multi_area in multi_areas:
-        multipolygon = ogr.Geometry(ogr.wkbMultiPolygon)
-        
-        for poly_data in multi_area['polygons']:
-            # 创建外环
-            outer_ring = ogr.Geometry(ogr.wkbLinearRing)
-            for lon, lat in poly_data['outer']:
-                outer_ring.AddPoint(lon, lat)
-            
-            polygon = ogr.Geometry(ogr.wkbPolygon)
-            polygon.AddGeometry(outer_ring)
-            
-            # 添加洞（如果有）
-            for hole_coords in poly_data['holes']:
-                hole_ring = ogr.Geometry(ogr.wkbLinearRing)
-                for lon, lat in hole_coords:
-                    hole_ring.AddPoint(lon, lat)
-                polygon.AddGeometry(hole_ring)
-            
-            multipolygon.AddGeometry(polygon)
-        
-        test_data.append((multipolygon, multi_area['name'], multi_area['desc']))
+    for polygons, name, desc in zip(_MULTI_AREA_POLYGONS, _MULTI_AREA_NAMES, _MULTI_AREA_DESCS):
+        if HAS_NUMPY:
+            # 多边形的起始环号与环的起始行同理，按各多边形的环数累加
+            all_rings = [ring for rings in polygons for ring in rings]
+            wkb = bytes(multipolygon_wkb(np.concatenate(all_rings), _ring_offsets(polygons),
+                                         _ring_offsets(all_rings)))
+        else:
+            wkb = _collection_wkb(ogr.wkbMultiPolygon, [_polygon_wkb(rings) for rings in polygons])
+        test_data.append((wkb, name, desc))
     
     return test_data
 
+@_from_cached_wkb
 def create_test_geometry_collection():
     """创建测试几何集合数据（Shapefile不支持）"""
     test_data = []
     
-    # 混合几何集合
-    collection = ogr.Geometry(ogr.wkbGeometryCollection)
-    
-    # 添加点
-    point = ogr.Geometry(ogr.wkbPoint)
-    point.AddPoint(116.3974, 39.9093)
-    collection.AddGeometry(point)
-    
-    # 添加线
-    line = ogr.Geometry(ogr.wkbLineString)
-    line.AddPoint(116.3974, 39.9093)
-    line.AddPoint(116.4074, 39.9193)
-    collection.AddGeometry(line)
-    
-    test_data.append((collection, "混合几何集合", "包含点和线的集合"))
+    # 混合几何集合：一个点和一条线
+    wkb = _collection_wkb(ogr.wkbGeometryCollection, [
+        _point_wkb(116.3974, 39.9093),
+        _linestring_wkb(_coords([(116.3974, 39.9093), (116.4074, 39.9193)])),
+    ])
+    test_data.append((wkb, "混合几何集合", "包含点和线的集合"))
     
     return test_data
 
@@ -4,7 +4,9 @@
 特别验证多部分面的正确性
 """
 
+import io
 import os
+import sys
 from osgeo import gdal, ogr, osr
 
 # 明确启用异常处理
@@ -12,6 +14,27 @@ gdal.UseExceptions()
 ogr.UseExceptions()
 osr.UseExceptions()
 
+# 几何类型、字段类型名称在模块加载时查一次，验证循环中只做字典查找
+_GEOM_TYPE_NAMES = {t: ogr.GeometryTypeToName(t) for t in (
+    ogr.wkbUnknown, ogr.wkbPoint, ogr.wkbLineString, ogr.wkbPolygon,
+    ogr.wkbMultiPoint, ogr.wkbMultiLineString, ogr.wkbMultiPolygon,
+    ogr.wkbGeometryCollection, ogr.wkbPoint25D, ogr.wkbLineString25D,
+    ogr.wkbPolygon25D, ogr.wkbMultiPoint25D, ogr.wkbMultiLineString25D,
+    ogr.wkbMultiPolygon25D)}
+_FIELD_TYPE_NAMES = {t: ogr.GetFieldTypeName(t) for t in (
+    ogr.OFTInteger, ogr.OFTInteger64, ogr.OFTReal, ogr.OFTString,
+    ogr.OFTDate, ogr.OFTTime, ogr.OFTDateTime)}
+
+def _geom_type_name(geom_type):
+    """几何类型名称，未缓存的类型再回退到GDAL查询"""
+    name = _GEOM_TYPE_NAMES.get(geom_type)
+    return name if name is not None else ogr.GeometryTypeToName(geom_type)
+
+def _field_type_name(field_type):
+    """字段类型名称，未缓存的类型再回退到GDAL查询"""
+    name = _FIELD_TYPE_NAMES.get(field_type)
+    return name if name is not None else ogr.GetFieldTypeName(field_type)
+
 def verify_shapefile_content():
     """验证Shapefile内容"""
     print("验证Shapefile测试文件内容")
@@ -30,112 +53,134 @@ def verify_shapefile_content():
     ]
     
     for filename, description in files_to_verify:
-        file_path = os.path.join(test_dir, filename)
-        print(f"\n验证 {description} ({filename}):")
-        
-        if not os.path.exists(file_path):
-            print(f"  ✗ 文件不存在: {file_path}")
-            continue
-        
+        # 每个文件的输出先写入缓冲区，验证完成后一次写到标准输出
+        out = io.StringIO()
+        try:
+            _verify_file(out, os.path.join(test_dir, filename), filename, description)
+        finally:
+            sys.stdout.write(out.getvalue())
+
+def _verify_file(out, file_path, filename, description):
+    """验证单个Shapefile文件，结果写入 out"""
+    print(f"\n验证 {description} ({filename}):", file=out)
+    
+    try:
+        os.stat(file_path)
+    except OSError:
+        print(f"  ✗ 文件不存在: {file_path}", file=out)
+        return
+    
+    try:
+        # 打开数据源: Shapefile的附属文件按固定文件名直接打开，
+        # 跳过列目录以免输出目录中的其他测试文件拖慢打开
+        previous_readdir = gdal.GetConfigOption('GDAL_DISABLE_READDIR_ON_OPEN')
+        gdal.SetConfigOption('GDAL_DISABLE_READDIR_ON_OPEN', 'EMPTY_DIR')
         try:
-            # 打开数据源
             datasource = ogr.Open(file_path, 0)  # 只读模式
-            if datasource is None:
-                print(f"  ✗ 无法打开文件")
-                continue
-            
-            # 获取图层
-            layer = datasource.GetLayer(0)
-            if layer is None:
-                print(f"  ✗ 无法获取图层")
+        finally:
+            # 恢复原有配置
+            gdal.SetConfigOption('GDAL_DISABLE_READDIR_ON_OPEN', previous_readdir)
+        if datasource is None:
+            print(f"  ✗ 无法打开文件", file=out)
+            return
+        
+        # 获取图层
+        layer = datasource.GetLayer(0)
+        if layer is None:
+            print(f"  ✗ 无法获取图层", file=out)
+            return
+        
+        # 获取基本信息
+        feature_count = layer.GetFeatureCount()
+        layer_defn = layer.GetLayerDefn()
+        geom_type = layer_defn.GetGeomType()
+        geom_name = _geom_type_name(geom_type)
+        
+        print(f"  要素数量: {feature_count}", file=out)
+        print(f"  几何类型: {geom_name} (代码: {geom_type})", file=out)
+        
+        # 获取字段信息，字段定义每个文件只取一次
+        field_count = layer_defn.GetFieldCount()
+        field_defns = [layer_defn.GetFieldDefn(i) for i in range(field_count)]
+        print(f"  字段数量: {field_count}", file=out)
+        for i, field_defn in enumerate(field_defns):
+            field_name = field_defn.GetName()
+            field_type = field_defn.GetType()
+            print(f"    {i+1}. {field_name} ({_field_type_name(field_type)})", file=out)
+        
+        # 属性字段索引按文件解析一次，逐要素按索引取值
+        name_index = layer_defn.GetFieldIndex("name")
+        geom_type_index = layer_defn.GetFieldIndex("geom_type")
+        
+        # 详细验证要素内容: 只显示前3个要素，按FID直接定位读取 (Shapefile的FID从0开始)，不顺序遍历图层
+        for i in range(min(3, feature_count)):
+            feature = layer.GetFeature(i)
+            if feature is None:
                 continue
             
-            # 获取基本信息
-            feature_count = layer.GetFeatureCount()
-            layer_defn = layer.GetLayerDefn()
-            geom_type = layer_defn.GetGeomType()
-            geom_name = ogr.GeometryTypeToName(geom_type)
+            print(f"  要素 {i+1}:", file=out)
             
-            print(f"  要素数量: {feature_count}")
-            print(f"  几何类型: {geom_name} (代码: {geom_type})")
+            # 属性信息
+            name = feature.GetField(name_index)
+            geom_type_field = feature.GetField(geom_type_index)
+            print(f"    名称: {name}", file=out)
+            print(f"    类型: {geom_type_field}", file=out)
             
-            # 获取字段信息
-            field_count = layer_defn.GetFieldCount()
-            print(f"  字段数量: {field_count}")
-            for i in range(field_count):
-                field_defn = layer_defn.GetFieldDefn(i)
-                field_name = field_defn.GetName()
-                field_type = field_defn.GetType()
-                print(f"    {i+1}. {field_name} ({ogr.GetFieldTypeName(field_type)})")
-            
-            # 详细验证要素内容
-            layer.ResetReading()
-            for i, feature in enumerate(layer):
-                if i >= 3:  # 只显示前3个要素
-                    break
-                
-                print(f"  要素 {i+1}:")
+            # 几何信息
+            geom = feature.GetGeometryRef()
+            if geom:
+                geometry_name = geom.GetGeometryName()
+                print(f"    几何类型: {geometry_name}", file=out)
                 
-                # 属性信息
-                name = feature.GetField("name")
-                geom_type_field = feature.GetField("geom_type")
-                print(f"    名称: {name}")
-                print(f"    类型: {geom_type_field}")
-                
-                # 几何信息
-                geom = feature.GetGeometryRef()
-                if geom:
-                    print(f"    几何类型: {geom.GetGeometryName()}")
-                    
-                    # 特别处理多部分面
-                    if geom.GetGeometryName() == "MULTIPOLYGON":
-                        polygon_count = geom.GetGeometryCount()
-                        print(f"    包含多边形数量: {polygon_count}")
-                        
-                        total_area = geom.GetArea()
-                        print(f"    总面积: {total_area:.6f} 平方度")
-                        
-                        for j in range(polygon_count):
-                            sub_polygon = geom.GetGeometryRef(j)
-                            if sub_polygon:
-                                ring_count = sub_polygon.GetGeometryCount()
-                                area = sub_polygon.GetArea()
-                                print(f"      多边形 {j+1}: {ring_count} 个环, 面积 {area:.6f}")
+                # 特别处理多部分面
+                if geometry_name == "MULTIPOLYGON":
+                    polygon_count = geom.GetGeometryCount()
+                    print(f"    包含多边形数量: {polygon_count}", file=out)
                     
-                    elif geom.GetGeometryName() == "POLYGON":
-                        ring_count = geom.GetGeometryCount()
-                        area = geom.GetArea()
-                        print(f"    环数量: {ring_count} (外环+洞)")
-                        print(f"    面积: {area:.6f} 平方度")
+                    total_area = geom.GetArea()
+                    print(f"    总面积: {total_area:.6f} 平方度", file=out)
                     
-                    elif geom.GetGeometryName() == "MULTIPOINT":
-                        point_count = geom.GetGeometryCount()
-                        print(f"    包含点数量: {point_count}")
+                    for j in range(polygon_count):
+                        sub_polygon = geom.GetGeometryRef(j)
+                        if sub_polygon:
+                            ring_count = sub_polygon.GetGeometryCount()
+                            area = sub_polygon.GetArea()
+                            print(f"      多边形 {j+1}: {ring_count} 个环, 面积 {area:.6f}", file=out)
+                
+                elif geometry_name == "POLYGON":
+                    ring_count = geom.GetGeometryCount()
+                    area = geom.GetArea()
+                    print(f"    环数量: {ring_count} (外环+洞)", file=out)
+                    print(f"    面积: {area:.6f} 平方度", file=out)
+                
+                elif geometry_name == "MULTIPOINT":
+                    point_count = geom.GetGeometryCount()
+                    print(f"    包含点数量: {point_count}", file=out)
+                
+                elif geometry_name == "MULTILINESTRING":
+                    line_count = geom.GetGeometryCount()
+                    print(f"    包含线数量: {line_count}", file=out)
                     
-                    elif geom.GetGeometryName() == "MULTILINESTRING":
-                        line_count = geom.GetGeometryCount()
-                        print(f"    包含线数量: {line_count}")
-                        
-                        total_length = 0
-                        for j in range(line_count):
-                            sub_line = geom.GetGeometryRef(j)
-                            if sub_line:
-                                length = sub_line.Length()
-                                total_length += length
-                                print(f"      线 {j+1}: 长度 {length:.6f}")
-                        print(f"    总长度: {total_length:.6f}")
-                else:
-                    print(f"    ✗ 无几何数据")
-            
-            if feature_count > 3:
-                print(f"  ... (还有 {feature_count - 3} 个要素)")
-            
-            # 关闭数据源
-            datasource = None
-            print(f"  ✓ 验证完成")
-            
-        except Exception as e:
-            print(f"  ✗ 验证失败: {e}")
+                    total_length = 0
+                    for j in range(line_count):
+                        sub_line = geom.GetGeometryRef(j)
+                        if sub_line:
+                            length = sub_line.Length()
+                            total_length += length
+                            print(f"      线 {j+1}: 长度 {length:.6f}", file=out)
+                    print(f"    总长度: {total_length:.6f}", file=out)
+            else:
+                print(f"    ✗ 无几何数据", file=out)
+        
+        if feature_count > 3:
+            print(f"  ... (还有 {feature_count - 3} 个要素)", file=out)
+        
+        # 关闭数据源
+        datasource = None
+        print(f"  ✓ 验证完成", file=out)
+        
+    except Exception as e:
+        print(f"  ✗ 验证失败: {e}", file=out)
 
 def demonstrate_multipolygon_use_cases():
     """演示多部分面的实际用例"""
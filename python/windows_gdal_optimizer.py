@@ -4,11 +4,23 @@ Windows平台GDAL性能测试专用配置和工具
 解决Windows特有的路径、编码、权限等问题
 """
 
+import atexit
+import io
 import os
 import sys
+import json
+import hashlib
 import platform
+import random
+import shutil
+import statistics
+import subprocess
 import tempfile
 import time
+import types
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
 
 # Windows特定导入
@@ -29,35 +41,204 @@ else:
     HAS_WIN32 = False
     HAS_WINREG = False
 
+# 临时目录I/O测试参数 (仿fio: 多种块大小的顺序读写 + 4KB随机读写)
+# 默认为快速测试，每种块大小只读写2MB，总写入量约7MB；完整测试需显式开启 (--full-io-probe)
+_PROBE_BLOCK_SIZES = (4 * 1024, 64 * 1024, 256 * 1024)
+_PROBE_TOTAL_BYTES = 2 * 1024 * 1024  # 每种块大小的读写总量
+_PROBE_RANDOM_OPS = 256
+_PROBE_FULL_BLOCK_SIZES = (4 * 1024, 16 * 1024, 64 * 1024, 1024 * 1024, 16 * 1024 * 1024)
+_PROBE_FULL_TOTAL_BYTES = 128 * 1024 * 1024
+_PROBE_FULL_RANDOM_OPS = 1024
+_PROBE_SEGMENTS = 8  # 每项测试分成若干段分别计时，报告中位数以抑制抖动
+_PROBE_ALIGNMENT = 4096  # 无缓冲I/O要求缓冲区地址、读写长度和偏移按扇区对齐
+_SLOW_RANDOM_IOPS = 1000  # 4KB随机读低于此值视为机械硬盘级别
+
+# 临时目录上限: 超出任一项时从最旧的文件开始删除
+_TEMP_DIR_MAX_FILES = 32
+_TEMP_DIR_MAX_BYTES = 2 << 30
+
+# Win32 文件API常量
+_GENERIC_READ = 0x80000000
+_GENERIC_WRITE = 0x40000000
+_CREATE_ALWAYS = 2
+_FILE_BEGIN = 0
+_FILE_FLAG_NO_BUFFERING = 0x20000000
+_FILE_FLAG_WRITE_THROUGH = 0x80000000
+_FILE_ATTRIBUTE_TEMPORARY = 0x00000100
+_FILE_FLAG_DELETE_ON_CLOSE = 0x04000000
+_FILE_SHARE_READ = 0x00000001
+_FILE_SHARE_WRITE = 0x00000002
+_OPEN_EXISTING = 3
+_IOCTL_STORAGE_QUERY_PROPERTY = 0x002D1400
+_STORAGE_DEVICE_SEEK_PENALTY_PROPERTY = 7
+_PROPERTY_STANDARD_QUERY = 0
+_FILE_SUPPORTS_BLOCK_REFCOUNTING = 0x08000000  # 卷支持块克隆 (ReFS)
+
+# 按盘符列出所在物理磁盘的介质类型和总线类型 (Get-PhysicalDisk 只查一次)
+_PHYSICAL_DISK_QUERY = (
+    "$disks = Get-PhysicalDisk; "
+    "Get-Partition | Where-Object DriveLetter | ForEach-Object { "
+    "$disk = $disks | Where-Object DeviceId -eq ([string]$_.DiskNumber); "
+    "[pscustomobject]@{Letter=[string]$_.DriveLetter; "
+    "MediaType=[string]$disk.MediaType; BusType=[string]$disk.BusType} "
+    "} | ConvertTo-Json"
+)
+
+if HAS_WIN32:
+    # kernel32只加载一次并声明全部用到的函数原型 (不再经 ctypes.windll.kernel32 逐次取函数):
+    # HANDLE在64位下为指针宽度，且需要 use_last_error 取错误码
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    _kernel32.CreateFileW.argtypes = [wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+                                      wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE]
+    _kernel32.CreateFileW.restype = wintypes.HANDLE
+    _kernel32.ReadFile.argtypes = [wintypes.HANDLE, wintypes.LPVOID, wintypes.DWORD,
+                                   ctypes.POINTER(wintypes.DWORD), wintypes.LPVOID]
+    _kernel32.ReadFile.restype = wintypes.BOOL
+    _kernel32.WriteFile.argtypes = [wintypes.HANDLE, wintypes.LPVOID, wintypes.DWORD,
+                                    ctypes.POINTER(wintypes.DWORD), wintypes.LPVOID]
+    _kernel32.WriteFile.restype = wintypes.BOOL
+    _kernel32.SetFilePointerEx.argtypes = [wintypes.HANDLE, ctypes.c_longlong,
+                                           ctypes.POINTER(ctypes.c_longlong), wintypes.DWORD]
+    _kernel32.SetFilePointerEx.restype = wintypes.BOOL
+    _kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+    _kernel32.CloseHandle.restype = wintypes.BOOL
+    _kernel32.DeviceIoControl.argtypes = [wintypes.HANDLE, wintypes.DWORD, wintypes.LPVOID, wintypes.DWORD,
+                                          wintypes.LPVOID, wintypes.DWORD, ctypes.POINTER(wintypes.DWORD),
+                                          wintypes.LPVOID]
+    _kernel32.DeviceIoControl.restype = wintypes.BOOL
+    _kernel32.GetDiskFreeSpaceExW.argtypes = [wintypes.LPCWSTR, ctypes.POINTER(ctypes.c_ulonglong),
+                                              ctypes.POINTER(ctypes.c_ulonglong),
+                                              ctypes.POINTER(ctypes.c_ulonglong)]
+    _kernel32.GetDiskFreeSpaceExW.restype = wintypes.BOOL
+    _kernel32.GetLogicalDrives.argtypes = []
+    _kernel32.GetLogicalDrives.restype = wintypes.DWORD
+    _kernel32.GetVolumeInformationW.argtypes = [wintypes.LPCWSTR, wintypes.LPWSTR, wintypes.DWORD,
+                                                wintypes.LPDWORD, wintypes.LPDWORD, wintypes.LPDWORD,
+                                                wintypes.LPWSTR, wintypes.DWORD]
+    _kernel32.GetVolumeInformationW.restype = wintypes.BOOL
+    _INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+    
+    class _StoragePropertyQuery(ctypes.Structure):
+        _fields_ = [('PropertyId', wintypes.DWORD),
+                    ('QueryType', wintypes.DWORD),
+                    ('AdditionalParameters', wintypes.BYTE * 1)]
+    
+    class _DeviceSeekPenaltyDescriptor(ctypes.Structure):
+        _fields_ = [('Version', wintypes.DWORD),
+                    ('Size', wintypes.DWORD),
+                    ('IncursSeekPenalty', wintypes.BOOLEAN)]
+    
+    class _MemoryStatusEx(ctypes.Structure):
+        _fields_ = [('dwLength', wintypes.DWORD),
+                    ('dwMemoryLoad', wintypes.DWORD),
+                    ('ullTotalPhys', ctypes.c_ulonglong),
+                    ('ullAvailPhys', ctypes.c_ulonglong),
+                    ('ullTotalPageFile', ctypes.c_ulonglong),
+                    ('ullAvailPageFile', ctypes.c_ulonglong),
+                    ('ullTotalVirtual', ctypes.c_ulonglong),
+                    ('ullAvailVirtual', ctypes.c_ulonglong),
+                    ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+    
+    _kernel32.GlobalMemoryStatusEx.argtypes = [ctypes.POINTER(_MemoryStatusEx)]
+    _kernel32.GlobalMemoryStatusEx.restype = wintypes.BOOL
+
+# GDAL相关环境变量
+_GDAL_VARS = types.MappingProxyType({
+    # 必须是 EMPTY_DIR 而不是 TRUE：TRUE 时附属文件的逐个探测仍会发生，
+    # 远程数据集上请求数反而增加；EMPTY_DIR 才会把目录视为空、跳过探测
+    'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR',
+    'GDAL_MAX_DATASET_POOL_SIZE': '100',
+    'OGR_ORGANIZE_POLYGONS': 'DEFAULT',
+    'GDAL_FILENAME_IS_UTF8': 'YES',
+    'SHAPE_ENCODING': 'UTF-8',
+    # /vsicurl/ 只对这些扩展名发请求，避免打开时探测不存在的附属文件
+    'CPL_VSIL_CURL_ALLOWED_EXTENSIONS': '.tif,.tiff,.vrt,.ovr',
+    # 合并相邻区间读取、HTTP/2多路复用，减少往返次数
+    'GDAL_HTTP_MERGE_CONSECUTIVE_RANGES': 'YES',
+    'GDAL_HTTP_MULTIPLEX': 'YES',
+    # 打开时一次读入文件头 (32KB)，覆盖COG的IFD，免去后续小块读取
+    'GDAL_INGESTED_BYTES_AT_OPEN': '32768',
+    'CPL_VSIL_CURL_CHUNK_SIZE': '1048576',
+    # 虚拟文件系统读缓存 (25MB)
+    'VSI_CACHE': 'TRUE',
+    'VSI_CACHE_SIZE': '26214400'
+})
+
+def _format_block_size(block_size):
+    """块大小的显示文本，如 4KB、16MB"""
+    if block_size >= 1024 * 1024:
+        return f"{block_size // (1024 * 1024)}MB"
+    return f"{block_size // 1024}KB"
+
+@dataclass
+class DriveInfo:
+    """驱动器信息：启动时一次扫描得到，之后各检查只读取这里的结果"""
+    letter: str
+    fs_type: str
+    free_bytes: int  # 当前用户可用 (受磁盘配额限制)
+    total_bytes: int
+    total_free_bytes: int
+    is_ssd: bool
+    bus_type: str
+    supports_block_cloning: bool = False
+
 class WindowsGDALOptimizer:
     """Windows平台GDAL优化器"""
     
-    def __init__(self):
+    def __init__(self, full_io_probe=False, prefer_ssd=False):
+        # 构造时只记录版本信息和选项，不做任何探测，也不修改环境变量；探测由 prepare() 显式触发
+        self.full_io_probe = full_io_probe
+        self.prefer_ssd = prefer_ssd
         self.is_windows = platform.system() == "Windows"
+        self.windows_version = platform.win32_ver()
+        # 已执行过的步骤及其结果 {步骤名: 结果}，见 _run_once
+        self._completed_steps = {}
         if not self.is_windows:
             print("警告: 此工具专为Windows设计")
-            return
-        
-        self.windows_version = platform.win32_ver()
-        self.setup_windows_environment()
+    
+    @cached_property
+    def _drives(self):
+        """驱动器信息 (进程生命周期内不变，首次使用时扫描一次)"""
+        return self._scan_drives()
+    
+    @cached_property
+    def _temp_dir(self):
+        """最优临时目录 (首次使用时选择并创建)"""
+        return self.get_optimal_temp_dir(self.prefer_ssd)
+    
+    def _run_once(self, name, func):
+        """执行 func 并记录结果；同名步骤已执行过时不再执行，直接返回记录的结果"""
+        if name not in self._completed_steps:
+            self._completed_steps[name] = func()
+        return self._completed_steps[name]
+    
+    def prepare(self):
+        """执行环境检查和配置；各步骤只执行一次，重复调用不会再次执行"""
+        if self.is_windows:
+            self._run_once('setup_windows_environment', self.setup_windows_environment)
     
     def setup_windows_environment(self):
-        """设置Windows环境"""
-        print("Windows GDAL环境配置")
-        print("=" * 40)
-        print(f"Windows版本: {self.windows_version}")
-        
-        # 检查Windows版本
-        self.check_windows_compatibility()
-        
-        # 设置环境变量
-        self.setup_environment_variables()
-        
-        # 检查文件系统
-        self.check_file_system()
-        
-        # 优化临时目录
-        self.setup_temp_directory()
+        """设置Windows环境 (各步骤的输出先写入缓冲区，结束时一次写到标准输出)"""
+        out = io.StringIO()
+        try:
+            with redirect_stdout(out):
+                print("Windows GDAL环境配置")
+                print("=" * 40)
+                print(f"Windows版本: {self.windows_version}")
+                
+                # 检查Windows版本
+                self._run_once('check_windows_compatibility', self.check_windows_compatibility)
+                
+                # 设置环境变量
+                self._run_once('setup_environment_variables', self.setup_environment_variables)
+                
+                # 检查文件系统
+                self._run_once('check_file_system', self.check_file_system)
+                
+                # 优化临时目录
+                self._run_once('setup_temp_directory', self.setup_temp_directory)
+        finally:
+            sys.stdout.write(out.getvalue())
     
     def check_windows_compatibility(self):
         """检查Windows兼容性"""
@@ -74,67 +255,98 @@ class WindowsGDALOptimizer:
             self.long_path_support = False
     
     def check_long_path_support(self):
-        """检查长路径支持"""
-        if not HAS_WINREG:
-            return False
+        """检查长路径支持 (只检查一次，结果记录在实例上)"""
+        return self._run_once('check_long_path_support', self._query_long_path_support)
+    
+    def _query_long_path_support(self):
+        """读取注册表中的 LongPathsEnabled，无权读取时实际创建长路径判断"""
+        if HAS_WINREG:
+            try:
+                with winreg.OpenKey(
+                    winreg.HKEY_LOCAL_MACHINE,
+                    r"SYSTEM\CurrentControlSet\Control\FileSystem"
+                ) as key:
+                    value, _ = winreg.QueryValueEx(key, "LongPathsEnabled")
+                    enabled = bool(value)
+                    
+                    if enabled:
+                        print("✓ 长路径支持已启用")
+                    else:
+                        print("⚠️ 长路径支持未启用，建议启用以避免路径长度问题")
+                    
+                    return enabled
+                    
+            except FileNotFoundError:
+                print("? 无法检查长路径支持状态")
+                return False
+            except PermissionError:
+                pass
         
+        # 无权读取注册表时，直接尝试创建超长路径来判断
+        enabled = self.probe_long_path()
+        if enabled:
+            print("✓ 长路径支持已启用 (实际创建长路径检测)")
+        else:
+            print("⚠️ 长路径支持未生效 (实际创建长路径检测)，建议启用以避免路径长度问题")
+        return enabled
+    
+    def probe_long_path(self):
+        """在临时目录下创建超过MAX_PATH (260字符) 的目录，能创建即长路径支持已生效"""
+        probe_root = self._temp_dir / "long_path_probe"
+        long_path = probe_root.joinpath(*(['d' * 50] * 6))
         try:
-            with winreg.OpenKey(
-                winreg.HKEY_LOCAL_MACHINE,
-                r"SYSTEM\CurrentControlSet\Control\FileSystem"
-            ) as key:
-                value, _ = winreg.QueryValueEx(key, "LongPathsEnabled")
-                enabled = bool(value)
-                
-                if enabled:
-                    print("✓ 长路径支持已启用")
-                else:
-                    print("⚠️ 长路径支持未启用，建议启用以避免路径长度问题")
-                
-                return enabled
-                
-        except (FileNotFoundError, PermissionError):
-            print("? 无法检查长路径支持状态")
+            long_path.mkdir(parents=True, exist_ok=True)
+            return long_path.exists()
+        except OSError:
             return False
+        finally:
+            shutil.rmtree(probe_root, ignore_errors=True)
     
     def setup_environment_variables(self):
         """设置环境变量"""
-        # GDAL相关环境变量
-        gdal_vars = {
-            'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR',
-            'GDAL_MAX_DATASET_POOL_SIZE': '100',
-            'OGR_ORGANIZE_POLYGONS': 'DEFAULT',
-            'GDAL_FILENAME_IS_UTF8': 'YES',
-            'SHAPE_ENCODING': 'UTF-8'
-        }
-        
-        print("\n设置GDAL环境变量:")
-        for var, value in gdal_vars.items():
-            os.environ[var] = value
-            print(f"  {var} = {value}")
+        os.environ.update(_GDAL_VARS)
+        print("\n设置GDAL环境变量:\n" + "\n".join(f"  {var} = {value}" for var, value in _GDAL_VARS.items()))
         
         # Windows特定优化
-        os.environ['TEMP'] = str(self.get_optimal_temp_dir())
-        os.environ['TMP'] = str(self.get_optimal_temp_dir())
+        os.environ['TEMP'] = str(self._temp_dir)
+        os.environ['TMP'] = str(self._temp_dir)
     
-    def get_optimal_temp_dir(self):
-        """获取最优临时目录"""
-        # 尝试使用SSD驱动器
-        drives = self.get_available_drives()
+    def get_optimal_temp_dir(self, prefer_ssd=False):
+        """
+        获取最优临时目录
         
-        # 优先使用C盘（通常是SSD）
-        preferred_drives = ['C:', 'D:', 'E:']
+        默认直接使用系统盘 (%SystemDrive%)，只查询系统盘本身；系统盘不是SSD且 prefer_ssd 为真时，
+        从NTFS/ReFS本地卷中按 SSD > 支持块克隆的ReFS > NVMe > NTFS > 可用空间大 的顺序选择。
+        目录只在选定后创建一次。
+        """
+        system_drive = os.environ.get('SystemDrive', 'C:')
+        # 只对系统盘做一次寻道开销查询，不扫描全部驱动器；无法判断时按SSD处理 (与 is_drive_ssd 一致)
+        system_is_ssd = self.query_seek_penalty(system_drive) if HAS_WIN32 else None
+        temp_drive = system_drive if system_is_ssd is not False else None
         
-        for drive in preferred_drives:
-            if drive in drives:
-                temp_path = Path(f"{drive}\\") / "Temp" / "GDAL_Tests"
-                if self.is_drive_ssd(drive):
-                    print(f"✓ 使用SSD临时目录: {temp_path}")
-                    temp_path.mkdir(parents=True, exist_ok=True)
-                    return temp_path
+        if temp_drive is None and prefer_ssd:
+            candidates = sorted(
+                (drive for drive in self._drives.values()
+                 if drive.is_ssd and drive.fs_type in ('NTFS', 'ReFS')),
+                key=lambda drive: (
+                    not (drive.fs_type == 'ReFS' and drive.supports_block_cloning),
+                    drive.bus_type != 'NVMe',
+                    drive.fs_type != 'NTFS',
+                    -drive.free_bytes,
+                )
+            )
+            if candidates:
+                temp_drive = candidates[0].letter
         
-        # 回退到系统默认
-        return Path(tempfile.gettempdir()) / "GDAL_Tests"
+        if temp_drive is not None:
+            temp_path = Path(f"{temp_drive}\\") / "Temp" / "GDAL_Tests"
+            print(f"✓ 使用SSD临时目录: {temp_path}")
+        else:
+            # 回退到系统默认
+            temp_path = Path(tempfile.gettempdir()) / "GDAL_Tests"
+        
+        temp_path.mkdir(parents=True, exist_ok=True)
+        return temp_path
     
     def get_available_drives(self):
         """获取可用驱动器"""
@@ -142,145 +354,354 @@ class WindowsGDALOptimizer:
             return ['C:']
         
         drives = []
-        bitmask = ctypes.windll.kernel32.GetLogicalDrives()
+        bitmask = _kernel32.GetLogicalDrives()
+        
+        # 每次取出最低位的1 (第0位对应A盘)，只循环实际存在的驱动器数
+        while bitmask:
+            lowest = bitmask & -bitmask
+            drives.append(f"{chr(ord('A') + lowest.bit_length() - 1)}:")
+            bitmask ^= lowest
         
-        for letter in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
-            if bitmask & 1:
-                drives.append(f"{letter}:")
-            bitmask >>= 1
+        return drives
+    
+    def _scan_drives(self):
+        """
+        一次遍历所有驱动器，逐个查询文件系统类型、可用空间和是否SSD，返回 {盘符: DriveInfo}
         
+        SSD判断优先使用 Get-PhysicalDisk 的介质/总线类型，查不到时询问设备是否有寻道开销，
+        都无法判断时假设是SSD。
+        """
+        physical_disks = self.query_physical_disks()
+        
+        drives = {}
+        for letter in self.get_available_drives():
+            media_type, bus_type = physical_disks.get(letter, ('', ''))
+            if media_type in ('SSD', 'NVMe') or bus_type == 'NVMe':
+                is_ssd = True
+            elif media_type == 'HDD':
+                is_ssd = False
+            else:
+                is_ssd = self.query_seek_penalty(letter) if HAS_WIN32 else None
+                if is_ssd is None:
+                    is_ssd = True  # 无法判断时假设是SSD
+            
+            free_bytes, total_bytes, total_free_bytes = self.get_drive_space(letter)
+            fs_type, fs_flags = self.get_volume_info(letter)
+            drives[letter] = DriveInfo(
+                letter=letter,
+                fs_type=fs_type,
+                free_bytes=free_bytes,
+                total_bytes=total_bytes,
+                total_free_bytes=total_free_bytes,
+                is_ssd=is_ssd,
+                bus_type=bus_type,
+                supports_block_cloning=bool(fs_flags & _FILE_SUPPORTS_BLOCK_REFCOUNTING),
+            )
         return drives
     
+    def query_physical_disks(self):
+        """通过 Get-PhysicalDisk 查询各盘符所在磁盘，返回 {盘符: (介质类型, 总线类型)}；PowerShell不可用时返回空表"""
+        try:
+            completed = subprocess.run(
+                ['powershell', '-NoProfile', '-Command', _PHYSICAL_DISK_QUERY],
+                capture_output=True, text=True, timeout=30, check=True
+            )
+            records = json.loads(completed.stdout or '[]')
+        except (OSError, subprocess.SubprocessError, ValueError):
+            return {}
+        
+        # 只有一个分区时 ConvertTo-Json 输出单个对象而非数组
+        if isinstance(records, dict):
+            records = [records]
+        
+        return {f"{record['Letter']}:": (record['MediaType'], record['BusType']) for record in records}
+    
     def is_drive_ssd(self, drive_letter):
         """检查驱动器是否为SSD"""
-        if not HAS_WIN32:
-            return True  # 假设是SSD
+        drive = self._drives.get(drive_letter)
+        return drive.is_ssd if drive is not None else True
+    
+    def query_seek_penalty(self, drive_letter):
+        """用 IOCTL_STORAGE_QUERY_PROPERTY 查询卷所在设备是否无寻道开销，返回 True/False，失败返回 None"""
+        handle = _kernel32.CreateFileW(
+            f"\\\\.\\{drive_letter}", 0, _FILE_SHARE_READ | _FILE_SHARE_WRITE, None,
+            _OPEN_EXISTING, 0, None
+        )
+        if handle == _INVALID_HANDLE_VALUE:
+            return None
         
         try:
-            # 使用WMI检查驱动器类型
-            # 这里简化处理，在实际环境中可能需要更复杂的检测
-            return True  # 简化假设
-        except:
-            return True
+            query = _StoragePropertyQuery(_STORAGE_DEVICE_SEEK_PENALTY_PROPERTY, _PROPERTY_STANDARD_QUERY)
+            descriptor = _DeviceSeekPenaltyDescriptor()
+            returned = wintypes.DWORD()
+            if not _kernel32.DeviceIoControl(
+                handle, _IOCTL_STORAGE_QUERY_PROPERTY,
+                ctypes.byref(query), ctypes.sizeof(query),
+                ctypes.byref(descriptor), ctypes.sizeof(descriptor),
+                ctypes.byref(returned), None
+            ):
+                return None
+            return not descriptor.IncursSeekPenalty
+        finally:
+            _kernel32.CloseHandle(handle)
     
     def check_file_system(self):
         """检查文件系统"""
         print(f"\n文件系统信息:")
         
-        drives = self.get_available_drives()
-        for drive in drives[:3]:  # 只检查前3个驱动器
-            try:
-                if HAS_WIN32:
-                    # 获取文件系统类型
-                    buffer = ctypes.create_unicode_buffer(1024)
-                    ctypes.windll.kernel32.GetVolumeInformationW(
-                        drive + "\\", None, 0, None, None, None, buffer, 1024
-                    )
-                    fs_type = buffer.value
-                else:
-                    fs_type = "NTFS (assumed)"
-                
-                free_space = self.get_drive_free_space(drive)
-                print(f"  {drive} {fs_type} - 可用空间: {free_space/(1024**3):.1f} GB")
-                
-            except Exception as e:
-                print(f"  {drive} 信息获取失败: {e}")
+        # 只查询前3个驱动器的文件系统类型和空间，不做SSD检测；
+        # 完整的驱动器扫描 (_scan_drives) 只在 prefer_ssd 选择临时目录时进行
+        for letter in self.get_available_drives()[:3]:
+            fs_type, _ = self.get_volume_info(letter)
+            free_bytes, total_bytes, total_free_bytes = self.get_drive_space(letter)
+            print(f"  {letter} {fs_type} - 可用空间: {free_bytes/(1024**3):.1f} GB"
+                  f" / 总容量: {total_bytes/(1024**3):.1f} GB"
+                  f" (全盘空闲: {total_free_bytes/(1024**3):.1f} GB)")
     
-    def get_drive_free_space(self, drive_letter):
-        """获取驱动器可用空间"""
-        if HAS_WIN32:
-            try:
-                free_bytes = ctypes.c_ulonglong(0)
-                ctypes.windll.kernel32.GetDiskFreeSpaceExW(
-                    drive_letter + "\\",
-                    ctypes.pointer(free_bytes),
-                    None, None
-                )
-                return free_bytes.value
-            except:
-                pass
+    def get_volume_info(self, drive_letter):
+        """获取驱动器文件系统类型和文件系统特性标志，返回 (类型名, 标志位)"""
+        if not HAS_WIN32:
+            return "NTFS (assumed)", 0
         
-        # 回退方法
+        buffer = ctypes.create_unicode_buffer(1024)
+        fs_flags = wintypes.DWORD(0)
+        _kernel32.GetVolumeInformationW(
+            drive_letter + "\\", None, 0, None, None, ctypes.byref(fs_flags), buffer, 1024
+        )
+        return buffer.value, fs_flags.value
+    
+    def get_drive_space(self, drive_letter):
+        """
+        获取驱动器空间，一次调用取回三项：(当前用户可用字节, 总字节, 全盘空闲字节)
+        查询失败时输出Win32错误并返回全0
+        """
+        if not HAS_WIN32:
+            return 0, 0, 0
+        
+        free_bytes = ctypes.c_ulonglong(0)
+        total_bytes = ctypes.c_ulonglong(0)
+        total_free_bytes = ctypes.c_ulonglong(0)
         try:
-            statvfs = os.statvfs(drive_letter + "\\")
-            return statvfs.f_frsize * statvfs.f_bavail
-        except:
-            return 0
+            if not _kernel32.GetDiskFreeSpaceExW(drive_letter + "\\", ctypes.byref(free_bytes),
+                                                 ctypes.byref(total_bytes), ctypes.byref(total_free_bytes)):
+                raise ctypes.WinError(ctypes.get_last_error())
+        except OSError as e:
+            print(f"  {drive_letter} 可用空间获取失败: {e}")
+            return 0, 0, 0
+        return free_bytes.value, total_bytes.value, total_free_bytes.value
     
     def setup_temp_directory(self):
         """设置优化的临时目录"""
-        temp_dir = self.get_optimal_temp_dir()
-        temp_dir.mkdir(parents=True, exist_ok=True)
+        # 目录已由 get_optimal_temp_dir 创建
+        temp_dir = self._temp_dir
+        
+        # 退出时再清理一次本次运行留下的文件
+        atexit.register(self._prune_temp_dir)
+        
+        if not HAS_WIN32:
+            print("\n? 无法进行临时目录性能测试 (ctypes不可用)")
+            self._prune_temp_dir()
+            return
         
         # 测试读写性能
         test_file = temp_dir / "test_performance.tmp"
         
         try:
-            # 写入测试
-            start_time = time.perf_counter()
-            with open(test_file, 'wb') as f:
-                f.write(b'0' * 1024 * 1024)  # 1MB
-            write_time = time.perf_counter() - start_time
-            
-            # 读取测试
-            start_time = time.perf_counter()
-            with open(test_file, 'rb') as f:
-                _ = f.read()
-            read_time = time.perf_counter() - start_time
-            
-            # 清理
-            test_file.unlink()
+            # 测试文件在句柄关闭时由系统删除，无需单独清理
+            sequential_results, write_iops, read_iops = self.run_io_probe(test_file, self.full_io_probe)
             
-            print(f"\n临时目录性能测试:")
-            print(f"  写入速度: {1.0/write_time:.1f} MB/s")
-            print(f"  读取速度: {1.0/read_time:.1f} MB/s")
+            print(f"\n临时目录性能测试 (无缓冲I/O{', 完整' if self.full_io_probe else ', 快速'}):")
+            print(f"  {'块大小':>6s} {'顺序写入':>12s} {'顺序读取':>12s}")
+            for block_size, write_speed, read_speed in sequential_results:
+                print(f"  {_format_block_size(block_size):>8s} {write_speed:9.1f} MB/s {read_speed:9.1f} MB/s")
+            print(f"  4KB随机写入: {write_iops:.0f} IOPS")
+            print(f"  4KB随机读取: {read_iops:.0f} IOPS")
             
-            if write_time > 0.1 or read_time > 0.1:
+            if read_iops < _SLOW_RANDOM_IOPS:
                 print("  ⚠️ I/O性能较低，考虑使用SSD")
             else:
                 print("  ✓ I/O性能良好")
                 
         except Exception as e:
             print(f"  ⚠️ 性能测试失败: {e}")
+        
+        self._prune_temp_dir()
     
-    def optimize_for_large_datasets(self):
-        """针对大数据集的优化"""
-        print(f"\nWindows大数据集优化建议:")
+    def _prune_temp_dir(self, max_files=_TEMP_DIR_MAX_FILES, max_bytes=_TEMP_DIR_MAX_BYTES):
+        """按修改时间从旧到新删除临时目录中的文件，直到文件数和总大小都不超过上限"""
+        try:
+            with os.scandir(self._temp_dir) as it:
+                entries = [(entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                           for entry in it if entry.is_file(follow_symlinks=False)]
+        except OSError:
+            return
         
-        # 虚拟内存建议
-        if HAS_WIN32:
+        entries.sort()
+        file_count = len(entries)
+        total_bytes = sum(size for _, size, _ in entries)
+        
+        for _, size, path in entries:
+            if file_count <= max_files and total_bytes <= max_bytes:
+                break
             try:
-                import psutil
-                total_memory = psutil.virtual_memory().total
-                recommended_vm = total_memory * 2
-                
-                print(f"  当前物理内存: {total_memory/(1024**3):.1f} GB")
-                print(f"  建议虚拟内存: {recommended_vm/(1024**3):.1f} GB")
+                os.remove(path)
+            except OSError:
+                # 仍被其他进程占用的文件跳过
+                continue
+            file_count -= 1
+            total_bytes -= size
+    
+    def run_io_probe(self, test_file, full=False):
+        """
+        仿fio的临时目录I/O测试，以无缓冲、直写方式打开文件，测量设备本身而非系统缓存；
+        文件标记为临时文件并在句柄关闭时删除 (测试异常中断时也不会残留)
+        
+        默认只读写几MB；full 为真时按每种块大小128MB做完整测试 (机械硬盘上耗时数分钟，需要128MB可用空间)
+        
+        返回 ([(块大小, 顺序写入MB/s, 顺序读取MB/s), ...], 4KB随机写入IOPS, 4KB随机读取IOPS)
+        """
+        handle = _kernel32.CreateFileW(
+            str(test_file), _GENERIC_READ | _GENERIC_WRITE, 0, None, _CREATE_ALWAYS,
+            _FILE_ATTRIBUTE_TEMPORARY | _FILE_FLAG_DELETE_ON_CLOSE
+            | _FILE_FLAG_NO_BUFFERING | _FILE_FLAG_WRITE_THROUGH, None
+        )
+        if handle == _INVALID_HANDLE_VALUE:
+            raise ctypes.WinError(ctypes.get_last_error())
+        
+        # 多分配一个对齐单位，从对齐地址开始使用；读写都直接在这块缓冲区上进行，
+        # 不产生Python bytes对象，也不经过用户态复制
+        if full:
+            block_sizes, total_bytes, random_ops = (
+                _PROBE_FULL_BLOCK_SIZES, _PROBE_FULL_TOTAL_BYTES, _PROBE_FULL_RANDOM_OPS)
+        else:
+            block_sizes, total_bytes, random_ops = _PROBE_BLOCK_SIZES, _PROBE_TOTAL_BYTES, _PROBE_RANDOM_OPS
+        
+        raw_buffer = ctypes.create_string_buffer(max(block_sizes) + _PROBE_ALIGNMENT)
+        address = ctypes.addressof(raw_buffer)
+        buffer = ctypes.c_void_p(address + (-address % _PROBE_ALIGNMENT))
+        
+        # 填充随机数据 (在计时之外)：全相同字节会被NTFS压缩或SSD主控压缩，测出虚高的带宽
+        buffer_size = max(block_sizes)
+        ctypes.memmove(buffer, os.urandom(buffer_size), buffer_size)
+        
+        try:
+            sequential_results = []
+            for block_size in block_sizes:
+                segment_blocks = max(1, total_bytes // block_size // _PROBE_SEGMENTS)
+                segment_bytes = block_size * segment_blocks
+                write_times = self._sequential_io(handle, _kernel32.WriteFile, buffer, block_size, segment_blocks)
+                read_times = self._sequential_io(handle, _kernel32.ReadFile, buffer, block_size, segment_blocks)
+                sequential_results.append((
+                    block_size,
+                    statistics.median(segment_bytes / t for t in write_times) / 1e6,
+                    statistics.median(segment_bytes / t for t in read_times) / 1e6,
+                ))
+            
+            # 随机读写落在已写入的范围内
+            file_blocks = total_bytes // _PROBE_ALIGNMENT
+            segment_ops = random_ops // _PROBE_SEGMENTS
+            write_iops = statistics.median(segment_ops / t for t in self._random_io(
+                handle, _kernel32.WriteFile, buffer, file_blocks, random_ops))
+            read_iops = statistics.median(segment_ops / t for t in self._random_io(
+                handle, _kernel32.ReadFile, buffer, file_blocks, random_ops))
+        finally:
+            _kernel32.CloseHandle(handle)
+        
+        return sequential_results, write_iops, read_iops
+    
+    def _sequential_io(self, handle, io_func, buffer, block_size, segment_blocks):
+        """从文件开头按 block_size 连续读或写 _PROBE_SEGMENTS 段，每段 segment_blocks 块，返回各段耗时(秒)"""
+        # 参数在计时循环外准备好，循环内只剩API调用本身
+        transferred = ctypes.byref(wintypes.DWORD())
+        handle = wintypes.HANDLE(handle)
+        if not _kernel32.SetFilePointerEx(handle, 0, None, _FILE_BEGIN):
+            raise ctypes.WinError(ctypes.get_last_error())
+        
+        segment_times = []
+        for _ in range(_PROBE_SEGMENTS):
+            start_time = time.perf_counter()
+            for _ in range(segment_blocks):
+                if not io_func(handle, buffer, block_size, transferred, None):
+                    raise ctypes.WinError(ctypes.get_last_error())
+            segment_times.append(time.perf_counter() - start_time)
+        return segment_times
+    
+    def _random_io(self, handle, io_func, buffer, file_blocks, random_ops):
+        """在前 file_blocks 个4KB块中随机读或写 random_ops 次，分 _PROBE_SEGMENTS 段计时，返回各段耗时(秒)"""
+        transferred = ctypes.byref(wintypes.DWORD())
+        handle = wintypes.HANDLE(handle)
+        set_file_pointer = _kernel32.SetFilePointerEx
+        offsets = [random.randrange(file_blocks) * _PROBE_ALIGNMENT for _ in range(random_ops)]
+        
+        segment_ops = random_ops // _PROBE_SEGMENTS
+        segment_times = []
+        for segment_start in range(0, segment_ops * _PROBE_SEGMENTS, segment_ops):
+            start_time = time.perf_counter()
+            for offset in offsets[segment_start:segment_start + segment_ops]:
+                if not (set_file_pointer(handle, offset, None, _FILE_BEGIN)
+                        and io_func(handle, buffer, _PROBE_ALIGNMENT, transferred, None)):
+                    raise ctypes.WinError(ctypes.get_last_error())
+            segment_times.append(time.perf_counter() - start_time)
+        return segment_times
+    
+    def get_memory_totals(self):
+        """
+        返回 (物理内存字节, 物理内存+页面文件字节)，无法获取时返回 None
+        Windows上直接调用 GlobalMemoryStatusEx 一次取得两项，psutil只作为其他情况的回退
+        """
+        if HAS_WIN32:
+            status = _MemoryStatusEx()
+            status.dwLength = ctypes.sizeof(_MemoryStatusEx)
+            if _kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return status.ullTotalPhys, status.ullTotalPageFile
+        
+        try:
+            import psutil
+        except ImportError:
+            return None
+        total_memory = psutil.virtual_memory().total
+        return total_memory, total_memory + psutil.swap_memory().total
+    
+    def optimize_for_large_datasets(self):
+        """针对大数据集的优化 (输出先写入缓冲区，结束时一次写到标准输出)"""
+        out = io.StringIO()
+        try:
+            with redirect_stdout(out):
+                print(f"\nWindows大数据集优化建议:")
                 
-                current_vm = psutil.virtual_memory().total + psutil.swap_memory().total
-                if current_vm < recommended_vm:
-                    print(f"  ⚠️ 建议增加虚拟内存到 {recommended_vm/(1024**3):.1f} GB")
+                # 虚拟内存建议
+                memory = self.get_memory_totals()
+                if memory is None:
+                    print("  安装psutil以获得内存优化建议: pip install psutil")
                 else:
-                    print(f"  ✓ 虚拟内存配置合适")
+                    total_memory, current_vm = memory
+                    recommended_vm = total_memory * 2
+                    
+                    print(f"  当前物理内存: {total_memory/(1024**3):.1f} GB")
+                    print(f"  建议虚拟内存: {recommended_vm/(1024**3):.1f} GB")
                     
-            except ImportError:
-                print("  安装psutil以获得内存优化建议: pip install psutil")
-        
-        # 文件系统优化
-        print(f"\n  文件系统优化建议:")
-        print(f"    • 禁用文件索引以提升写入性能")
-        print(f"    • 使用NTFS压缩可节省空间但会降低性能")
-        print(f"    • 考虑使用ReFS（如果支持）以获得更好的大文件性能")
-        
-        # 防病毒软件
-        print(f"\n  防病毒软件建议:")
-        print(f"    • 将GDAL工作目录添加到防病毒软件排除列表")
-        print(f"    • 临时禁用实时扫描以获得最佳性能")
-        
-        # 电源设置
-        print(f"\n  电源设置建议:")
-        print(f"    • 使用高性能电源模式")
-        print(f"    • 禁用硬盘休眠")
+                    if current_vm < recommended_vm:
+                        print(f"  ⚠️ 建议增加虚拟内存到 {recommended_vm/(1024**3):.1f} GB")
+                    else:
+                        print(f"  ✓ 虚拟内存配置合适")
+                
+                # 文件系统优化
+                print(f"\n  文件系统优化建议:")
+                print(f"    • 禁用文件索引以提升写入性能")
+                print(f"    • 使用NTFS压缩可节省空间但会降低性能")
+                print(f"    • 考虑使用ReFS（如果支持）以获得更好的大文件性能")
+                
+                # 防病毒软件
+                print(f"\n  防病毒软件建议:")
+                print(f"    • 将GDAL工作目录添加到防病毒软件排除列表")
+                print(f"    • 临时禁用实时扫描以获得最佳性能")
+                
+                # 电源设置
+                print(f"\n  电源设置建议:")
+                print(f"    • 使用高性能电源模式")
+                print(f"    • 禁用硬盘休眠")
+        finally:
+            sys.stdout.write(out.getvalue())
 
 def create_windows_batch_script():
     """创建Windows批处理脚本"""
@@ -389,6 +810,25 @@ Read-Host "测试完成，按任意键退出..."
     
     return ps_content
 
+def _write_if_changed(path, content, encoding):
+    """
+    内容与现有文件相同时跳过写入，返回是否写入
+    按文本模式读取后比较摘要，换行符转换 (\\r\\n) 和BOM不影响比较
+    """
+    new_digest = hashlib.blake2b(content.encode(encoding), digest_size=16).digest()
+    try:
+        with open(path, 'r', encoding=encoding) as f:
+            old_digest = hashlib.blake2b(f.read().encode(encoding), digest_size=16).digest()
+    except (FileNotFoundError, UnicodeDecodeError):
+        old_digest = None
+    
+    if old_digest == new_digest:
+        return False
+    
+    with open(path, 'w', encoding=encoding) as f:
+        f.write(content)
+    return True
+
 def main():
     """主函数"""
     if platform.system() != "Windows":
@@ -396,8 +836,16 @@ def main():
         print("在其他平台请直接运行 cross_platform_performance_test.py")
         return
     
+    # 输出统一按UTF-8编码，避免中文Windows控制台的cp936逐字符替换 (与批处理中的 chcp 65001 一致)
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(encoding='utf-8', line_buffering=False)
+    
     # Windows环境优化
-    optimizer = WindowsGDALOptimizer()
+    # 完整I/O测试读写量大、耗时长，只在命令行显式指定时运行；
+    # --prefer-ssd 在系统盘不是SSD时扫描所有驱动器，另选SSD卷作为临时目录
+    optimizer = WindowsGDALOptimizer(full_io_probe='--full-io-probe' in sys.argv[1:],
+                                     prefer_ssd='--prefer-ssd' in sys.argv[1:])
+    optimizer.prepare()
     optimizer.optimize_for_large_datasets()
     
     # 创建批处理脚本
@@ -405,15 +853,19 @@ def main():
     
     # 批处理脚本
     batch_script = Path("run_gdal_test.bat")
-    with open(batch_script, 'w', encoding='gbk') as f:  # Windows批处理使用GBK编码
-        f.write(create_windows_batch_script())
-    print(f"✓ 创建批处理脚本: {batch_script}")
+    # Windows批处理使用GBK编码
+    if _write_if_changed(batch_script, create_windows_batch_script(), 'gbk'):
+        print(f"✓ 创建批处理脚本: {batch_script}")
+    else:
+        print(f"✓ 批处理脚本已是最新: {batch_script}")
     
     # PowerShell脚本
     ps_script = Path("run_gdal_test.ps1")
-    with open(ps_script, 'w', encoding='utf-8-sig') as f:  # PowerShell使用UTF-8 BOM
-        f.write(create_windows_powershell_script())
-    print(f"✓ 创建PowerShell脚本: {ps_script}")
+    # PowerShell使用UTF-8 BOM
+    if _write_if_changed(ps_script, create_windows_powershell_script(), 'utf-8-sig'):
+        print(f"✓ 创建PowerShell脚本: {ps_script}")
+    else:
+        print(f"✓ PowerShell脚本已是最新: {ps_script}")
     
     print(f"\nWindows用户可以使用以下方式运行测试:")
     print(f"  1. 双击 run_gdal_test.bat")